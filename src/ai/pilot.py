@@ -0,0 +1,47 @@
+import random
+
+import pygame
+
+from input.controls import CMD_SKILL, KeyState
+
+
+class DuelPilot:
+    """Scripted player for headless matches; install it as ``game.input_source``.
+
+    Each call looks at the game and returns the keys a simple, aggressive human
+    would hold: close in (or just into range with a gun), punch/kick in reach, jump
+    some enemy attacks and fire the laser skill when it is ready.
+    """
+
+    def __init__(self, game, rng=None, reach=50, gun_range=260, jump_chance=0.02, kick_chance=0.3):
+        self.game = game
+        self.rng = rng if rng is not None else random.Random()
+        self.reach = reach
+        self.gun_range = gun_range
+        self.jump_chance = jump_chance
+        self.kick_chance = kick_chance
+
+    def __call__(self):
+        game = self.game
+        player, enemy = game.player, game.enemy
+        dist = enemy.rect.centerx - player.rect.centerx
+        toward = pygame.K_d if dist > 0 else pygame.K_a
+        ranged = player.equipped_weapon is not None and player.equipped_weapon.ranged
+        keys = []
+
+        if ranged:
+            # hold position inside gun range (walking away would turn the shooter around)
+            if abs(dist) > self.gun_range:
+                keys.append(toward)
+            keys.append(pygame.K_v)
+        elif abs(dist) > self.reach or player.facing_right != (dist > 0):
+            # close in, or turn round on an enemy that is in reach but behind
+            keys.append(toward)
+        else:
+            keys.append(pygame.K_x if self.rng.random() < self.kick_chance else pygame.K_v)
+
+        if enemy.attacking and self.rng.random() < self.jump_chance:
+            keys.append(pygame.K_w)
+        if player.can_use_skill() and (player.facing_right == (dist > 0)) and abs(dist) < 500:
+            game.command(CMD_SKILL)
+        return KeyState(keys)
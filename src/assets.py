@@ -0,0 +1,241 @@
+"""Assets loaded once, by package-relative name, with scaled image variants cached.
+
+``ASSETS.image("images/Goku.png")`` decodes a file the first time it is asked
+for and hands out the same surface afterwards; ``ASSETS.scaled(name, ...)``
+does the same for a variant at a target size. Scaled variants are also
+written to an on-disk cache as raw RGBA pixels, so the next start blits them
+straight from those bytes without decoding the PNG or scaling it again. A
+cache file records the source's size and mtime and is ignored once the
+source changes.
+
+With a bundle mounted (``mount``, see bundle.py) images, fonts and sounds
+are read from it rather than the package directories, still decoded only
+when first asked for.
+
+Cached surfaces are shared: treat them as read-only (copy before drawing on
+one). ``stats()`` / ``report()`` give load times and cache hits.
+"""
+import os
+import re
+import struct
+import time
+
+import pygame
+from bundle import Bundle, DEFAULT_FONT
+from render import display_ready
+try:
+    import settings
+except Exception:
+    settings = None
+
+def cfg_get(name, default):
+    if settings is None:
+        return default
+    return getattr(settings, name, default)
+
+# asset names are relative to the package (src/), wherever the game is started from
+ASSET_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def _default_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "street-duel", "assets")
+
+
+# None or "" turns the disk cache off
+ASSET_CACHE_DIR = cfg_get("ASSET_CACHE_DIR", _default_cache_dir())
+# written by ``python src/bundle.py build``; main.py mounts it when present
+ASSET_BUNDLE = cfg_get("ASSET_BUNDLE", os.path.join(ASSET_ROOT, "assets.bundle"))
+
+# magic, format version, source size, source mtime in ns (CRC-32 from a bundle), width, height;
+# RGBA rows follow
+CACHE_HEADER = struct.Struct("<4sHQqII")
+CACHE_MAGIC = b"SDAC"
+CACHE_VERSION = 1
+
+
+class AssetManager:
+    """Loads package-relative images, fonts and sounds once; caches scaled images in memory and on disk."""
+
+    def __init__(self, root=ASSET_ROOT, cache_dir=ASSET_CACHE_DIR):
+        self.root = root
+        self.cache_dir = cache_dir or None
+        self.bundle = None
+        self._images = {}  # name -> surface as decoded
+        self._scaled = {}  # (name, size or height) -> surface
+        self._fonts = {}  # (name, size) -> Font
+        self._sounds = {}  # name -> Sound
+        self.loads = 0  # files decoded
+        self.load_ms = 0.0
+        self.disk_hits = 0  # variants read back from the disk cache
+        self.disk_ms = 0.0
+        self.disk_writes = 0
+        self.hits = 0  # requests answered from memory
+
+    def path(self, name):
+        return name if os.path.isabs(name) else os.path.join(self.root, name)
+
+    def mount(self, path):
+        """Read assets from the bundle at path from now on (names it lacks still come from disk)."""
+        self.unmount()
+        self.bundle = Bundle.load(path)
+        return self.bundle
+
+    def unmount(self):
+        if self.bundle is not None:
+            self.clear()
+            self.bundle.close()
+            self.bundle = None
+
+    def _open(self, name):
+        # a file object or path pygame can load name from
+        if self.bundle is not None and name in self.bundle:
+            return self.bundle.open(name)
+        return self.path(name)
+
+    def image(self, name):
+        """The image ``name`` (relative to the package) at its own size."""
+        surf = self._images.get(name)
+        if surf is not None:
+            self.hits += 1
+            return surf
+        start = time.perf_counter()
+        surf = pygame.image.load(self._open(name), name)
+        if display_ready():
+            surf = surf.convert_alpha()
+        self.load_ms += (time.perf_counter() - start) * 1000.0
+        self.loads += 1
+        self._images[name] = surf
+        return surf
+
+    def scaled(self, name, size=None, height=None):
+        """``name`` scaled to ``size`` (w, h), or to ``height`` keeping its aspect ratio."""
+        if (size is None) == (height is None):
+            raise ValueError("give exactly one of size or height")
+        key = (name, tuple(size) if size is not None else height)
+        surf = self._scaled.get(key)
+        if surf is not None:
+            self.hits += 1
+            return surf
+        surf = self._read_cache(key)
+        if surf is None:
+            base = self.image(name)
+            if size is None:
+                size = (int(base.get_width() * height / base.get_height()), height)
+            surf = base if base.get_size() == tuple(size) else pygame.transform.scale(base, size)
+            self._write_cache(key, surf)
+        self._scaled[key] = surf
+        return surf
+
+    def font(self, name=None, size=24):
+        """Font ``name`` (None: pygame's default) at size; no system font lookup."""
+        key = (name, size)
+        font = self._fonts.get(key)
+        if font is not None:
+            self.hits += 1
+            return font
+        start = time.perf_counter()
+        source = name
+        if name is None and self.bundle is not None and DEFAULT_FONT in self.bundle:
+            source = DEFAULT_FONT
+        font = pygame.font.Font(None if source is None else self._open(source), size)
+        self.load_ms += (time.perf_counter() - start) * 1000.0
+        self.loads += 1
+        self._fonts[key] = font
+        return font
+
+    def sound(self, name):
+        sound = self._sounds.get(name)
+        if sound is not None:
+            self.hits += 1
+            return sound
+        start = time.perf_counter()
+        source = self._open(name)
+        sound = pygame.mixer.Sound(file=source)
+        self.load_ms += (time.perf_counter() - start) * 1000.0
+        self.loads += 1
+        self._sounds[name] = sound
+        return sound
+
+    def clear(self):
+        """Drop the in-memory assets (the disk cache stays)."""
+        self._images.clear()
+        self._scaled.clear()
+        self._fonts.clear()
+        self._sounds.clear()
+
+    # --- disk cache of scaled variants ---
+
+    def _cache_path(self, key):
+        name, size = key
+        stem = re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
+        tag = f"{size[0]}x{size[1]}" if isinstance(size, tuple) else f"h{size}"
+        # bundle and loose copies of a file are cached apart, so switching between them does not thrash
+        origin = ".bundle" if self.bundle is not None and name in self.bundle else ""
+        return os.path.join(self.cache_dir, f"{stem}-{tag}{origin}.rgba")
+
+    def _source_id(self, name):
+        if self.bundle is not None and name in self.bundle:
+            return self.bundle.source_id(name)
+        st = os.stat(self.path(name))
+        return st.st_size, st.st_mtime_ns
+
+    def _read_cache(self, key):
+        if self.cache_dir is None:
+            return None
+        start = time.perf_counter()
+        try:
+            with open(self._cache_path(key), "rb") as f:
+                data = f.read()
+            source = self._source_id(key[0])
+        except OSError:
+            return None
+        if len(data) < CACHE_HEADER.size:
+            return None
+        magic, version, src_size, src_mtime, w, h = CACHE_HEADER.unpack_from(data)
+        if (magic, version, (src_size, src_mtime)) != (CACHE_MAGIC, CACHE_VERSION, source):
+            return None
+        if len(data) != CACHE_HEADER.size + w * h * 4:
+            return None
+        # fromstring / tostring: the bytes variants only arrived in pygame 2.1.3 (we support 2.1.0)
+        surf = pygame.image.fromstring(data[CACHE_HEADER.size:], (w, h), "RGBA")
+        if display_ready():
+            surf = surf.convert_alpha()
+        self.disk_ms += (time.perf_counter() - start) * 1000.0
+        self.disk_hits += 1
+        return surf
+
+    def _write_cache(self, key, surf):
+        if self.cache_dir is None:
+            return
+        # best effort: a read-only or full disk only costs the next start a decode
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            header = CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, *self._source_id(key[0]), *surf.get_size())
+            path = self._cache_path(key)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(header)
+                f.write(pygame.image.tostring(surf, "RGBA"))
+            os.replace(tmp, path)
+        except (OSError, pygame.error):
+            return
+        self.disk_writes += 1
+
+    def stats(self):
+        return {"files": len(self._images) + len(self._fonts) + len(self._sounds),
+                "variants": len(self._scaled), "loads": self.loads,
+                "bundle": len(self.bundle) if self.bundle is not None else None,
+                "load_ms": self.load_ms, "disk_hits": self.disk_hits, "disk_ms": self.disk_ms,
+                "disk_writes": self.disk_writes, "hits": self.hits}
+
+    def report(self):
+        s = self.stats()
+        where = f"bundle of {s['bundle']}" if s["bundle"] is not None else "package directories"
+        return (f"assets ({where}): {s['loads']} decoded in {s['load_ms']:.2f} ms, "
+                f"{s['disk_hits']} variants from disk cache in {s['disk_ms']:.2f} ms, "
+                f"{s['hits']} memory hits")
+
+
+# the game's shared asset cache
+ASSETS = AssetManager()
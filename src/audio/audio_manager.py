@@ -1,10 +1,16 @@
+import pygame
+
+from assets import ASSETS
+
+
 class AudioManager:
     def __init__(self):
         self.sounds = {}
         self.music = None
 
     def load_sound(self, name, file_path):
-        self.sounds[name] = pygame.mixer.Sound(file_path)
+        # package-relative, loaded once and shared (from the asset bundle when one is mounted)
+        self.sounds[name] = ASSETS.sound(file_path)
 
     def play_sound(self, name):
         if name in self.sounds:
@@ -0,0 +1,239 @@
+"""Batch AI-vs-AI balance sweeps over weapon and settings overrides.
+
+Every combination of the ``--grid`` values is played ``--matches`` times by a
+scripted DuelPilot against the Enemy in headless Games spread over a process
+pool, and summarised per combination into a CSV. Run from the repository root::
+
+    python src/balance.py --weapon katana,flail --grid Katana.melee_bonus=10,18,30 \\
+        --grid LASER_DAMAGE=10,20 --matches 200 --out balance.csv
+
+Grid keys are ``Class.attr`` for a weapon's tunables (``melee_bonus``,
+``cooldown``, ``duration``) on Gun, Katana, Flail or MidnightBlade, or a
+settings constant: ``game.NAME`` / ``player.NAME`` (entities.player), or a
+bare NAME when only one of those modules has it (LASER_DAMAGE, ...). Names
+gameplay does not read while a match runs are rejected rather than ignored.
+Match i of every combination uses seed ``--seed + i``, so results are
+reproducible and combinations are compared on the same random streams.
+"""
+import argparse
+import ast
+import csv
+import inspect
+import itertools
+import multiprocessing
+import os
+import random
+import sys
+import time
+from contextlib import contextmanager
+
+# headless matches never need a window or audio device
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import game
+from ai.pilot import DuelPilot
+import entities.player
+from entities.flail import Flail
+from entities.katana import Katana
+from entities.midnightblade import MidnightBlade
+
+WEAPONS = {"none": None, "gun": game.Gun, "katana": Katana, "flail": Flail, "midnight": MidnightBlade}
+OVERRIDE_CLASSES = {"Gun": game.Gun, "Katana": Katana, "Flail": Flail, "MidnightBlade": MidnightBlade}
+# weapon attributes a match reads (price and name are shop / HUD only)
+WEAPON_TUNABLES = ("melee_bonus", "cooldown", "duration")
+OVERRIDE_MODULES = {"game": game, "player": entities.player}
+
+SUMMARY_FIELDS = ("weapon", "overrides", "matches", "wins", "losses", "draws", "win_rate",
+                  "mean_ttk_s", "mean_dps", "mean_damage_taken", "mean_coins")
+
+
+def parse_value(text):
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
+
+def parse_grid(specs):
+    """['Katana.melee_bonus=10,18', 'LASER_DAMAGE=10'] -> [(key, [values...]), ...]"""
+    grid = []
+    for spec in specs:
+        key, sep, values = spec.partition("=")
+        if not sep or not values:
+            raise ValueError(f"grid entry {spec!r} is not KEY=V1,V2,...")
+        resolve_target(key.strip())
+        grid.append((key.strip(), [parse_value(v.strip()) for v in values.split(",")]))
+    return grid
+
+
+def runtime_constants(module):
+    """Settings constants (``NAME = cfg_get(...)``) that module's functions read when called.
+
+    Constants only used at import time (to derive another constant, or as a
+    default argument) are left out: overriding them later would change nothing.
+    """
+    tree = ast.parse(inspect.getsource(module))
+    declared = {target.id for node in tree.body if isinstance(node, ast.Assign)
+                and isinstance(node.value, ast.Call) and getattr(node.value.func, "id", None) == "cfg_get"
+                for target in node.targets if isinstance(target, ast.Name)}
+    read = {node.id for fn in ast.walk(tree) if isinstance(fn, (ast.FunctionDef, ast.AsyncFunctionDef))
+            for node in ast.walk(fn) if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load)}
+    return declared & read
+
+
+_RUNTIME_CONSTANTS = {}
+
+
+def _module_constants(name):
+    if name not in _RUNTIME_CONSTANTS:
+        _RUNTIME_CONSTANTS[name] = runtime_constants(OVERRIDE_MODULES[name])
+    return _RUNTIME_CONSTANTS[name]
+
+
+def resolve_target(key):
+    """Return (object, attribute) an override key refers to."""
+    owner, dot, attr = key.rpartition(".")
+    if dot and owner in OVERRIDE_CLASSES:
+        if attr not in WEAPON_TUNABLES or not hasattr(OVERRIDE_CLASSES[owner], attr):
+            raise ValueError(f"{owner} has no tunable {attr!r} (tunables: {', '.join(WEAPON_TUNABLES)})")
+        return OVERRIDE_CLASSES[owner], attr
+    if dot:
+        if owner not in OVERRIDE_MODULES:
+            raise ValueError(f"unknown class or module {owner!r} in override {key!r}")
+        if attr not in _module_constants(owner):
+            raise ValueError(f"{key!r} is not a settings constant {owner} reads during a match")
+        return OVERRIDE_MODULES[owner], attr
+    owners = [name for name in OVERRIDE_MODULES if attr in _module_constants(name)]
+    if not owners:
+        raise ValueError(f"unknown override {key!r}")
+    if len(owners) > 1:
+        # e.g. PUNCH_COOLDOWN: the Enemy's in game, the Player's in entities.player
+        raise ValueError(f"{key!r} is read from several modules; use one of "
+                         + ", ".join(f"{name}.{attr}" for name in owners))
+    return OVERRIDE_MODULES[owners[0]], attr
+
+
+@contextmanager
+def overrides_applied(overrides):
+    # pool workers are reused between tasks, so always put the old values back
+    saved = []
+    try:
+        for key, value in overrides:
+            target, attr = resolve_target(key)
+            saved.append((target, attr, getattr(target, attr)))
+            setattr(target, attr, value)
+        yield
+    finally:
+        for target, attr, value in reversed(saved):
+            setattr(target, attr, value)
+
+
+def play_match(task):
+    """Run one headless match; returns a result dict (executed in pool workers)."""
+    combo, overrides, weapon, seed, max_seconds, world_size = task
+    with overrides_applied(overrides):
+        match = game.Game(None, world_size=world_size, seed=seed)
+        if WEAPONS[weapon] is not None:
+            match.player.equip(WEAPONS[weapon]())
+        match.input_source = DuelPilot(match, rng=random.Random(seed ^ 0x5EED))
+        max_ticks = int(max_seconds * match.timestep.hz)
+        while match.sim_ticks < max_ticks and match.state == "running" and not match.kills:
+            match.tick(match.timestep.tick_ms)
+        seconds = match.clock.get_ticks() / 1000.0
+        outcome = "win" if match.kills else ("loss" if match.state != "running" else "draw")
+    return {"combo": combo, "seed": seed, "outcome": outcome, "seconds": seconds,
+            "damage_dealt": match.damage_dealt, "damage_taken": match.damage_taken,
+            "coins": match.coins}
+
+
+def summarise(weapon, overrides, results):
+    n = len(results)
+    wins = [r for r in results if r["outcome"] == "win"]
+    losses = sum(r["outcome"] == "loss" for r in results)
+    seconds = sum(r["seconds"] for r in results)
+    return {
+        "weapon": weapon,
+        "overrides": ";".join(f"{k}={v}" for k, v in overrides),
+        "matches": n,
+        "wins": len(wins),
+        "losses": losses,
+        "draws": n - len(wins) - losses,
+        "win_rate": round(len(wins) / n, 4) if n else 0.0,
+        "mean_ttk_s": round(sum(r["seconds"] for r in wins) / len(wins), 3) if wins else "",
+        "mean_dps": round(sum(r["damage_dealt"] for r in results) / seconds, 3) if seconds else 0.0,
+        "mean_damage_taken": round(sum(r["damage_taken"] for r in results) / n, 2) if n else 0.0,
+        "mean_coins": round(sum(r["coins"] for r in results) / n, 2) if n else 0.0,
+    }
+
+
+def run_sweep(weapons, grid, matches, seed=0, workers=None, max_seconds=120.0, world_size=(900, 520)):
+    """Play every (weapon, grid combination) ``matches`` times; returns summary rows."""
+    keys = [key for key, _ in grid]
+    combos = []
+    for weapon in weapons:
+        for values in itertools.product(*[vals for _, vals in grid]):
+            combos.append((weapon, list(zip(keys, values))))
+    tasks = [(ci, overrides, weapon, seed + m, max_seconds, tuple(world_size))
+             for ci, (weapon, overrides) in enumerate(combos) for m in range(matches)]
+
+    results = [[] for _ in combos]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for task in tasks:
+            r = play_match(task)
+            results[r["combo"]].append(r)
+    else:
+        chunk = max(1, len(tasks) // (workers * 8))
+        with multiprocessing.Pool(workers) as pool:
+            for r in pool.imap_unordered(play_match, tasks, chunksize=chunk):
+                results[r["combo"]].append(r)
+    rows = []
+    for (weapon, overrides), combo_results in zip(combos, results):
+        # completion order depends on scheduling; sort so the summary is reproducible
+        combo_results.sort(key=lambda r: r["seed"])
+        rows.append(summarise(weapon, overrides, combo_results))
+    return rows
+
+
+def write_csv(rows, out):
+    writer = csv.DictWriter(out, fieldnames=SUMMARY_FIELDS)
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--grid", action="append", default=[], help="KEY=V1,V2,... (repeatable)")
+    parser.add_argument("--weapon", default="none", help=f"comma list of {', '.join(WEAPONS)}")
+    parser.add_argument("--matches", type=int, default=50, help="matches per combination")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first match")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--max-seconds", type=float, default=120.0, help="simulated time limit per match")
+    parser.add_argument("--out", default=None, help="summary CSV path (default: stdout)")
+    args = parser.parse_args(argv)
+
+    weapons = [w.strip() for w in args.weapon.split(",")]
+    for w in weapons:
+        if w not in WEAPONS:
+            parser.error(f"unknown weapon {w!r}")
+    try:
+        grid = parse_grid(args.grid)
+    except ValueError as e:
+        parser.error(str(e))
+
+    start = time.perf_counter()
+    rows = run_sweep(weapons, grid, args.matches, args.seed, args.workers, args.max_seconds)
+    elapsed = time.perf_counter() - start
+    if args.out:
+        with open(args.out, "w", newline="") as f:
+            write_csv(rows, f)
+    else:
+        write_csv(rows, sys.stdout)
+    total = sum(r["matches"] for r in rows)
+    print(f"{total} matches in {elapsed:.2f}s ({total / elapsed:.1f} matches/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,720 @@
+"""Micro-benchmarks for rendering and simulation hot paths.
+
+Run from the repository root, for example::
+
+    python src/bench.py smoke
+    python src/bench.py --list
+"""
+import argparse
+import os
+import sys
+import time
+
+# benchmarks never need a real window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+try:
+    import settings
+    SCREEN_WIDTH = getattr(settings, "SCREEN_WIDTH", 900)
+    SCREEN_HEIGHT = getattr(settings, "SCREEN_HEIGHT", 520)
+except Exception:
+    SCREEN_WIDTH, SCREEN_HEIGHT = 900, 520
+
+BENCHES = {}
+
+
+def bench(name):
+    def register(fn):
+        BENCHES[name] = fn
+        return fn
+    return register
+
+
+def timeit(fn, repeat=200):
+    """Return the mean wall time of fn() in milliseconds."""
+    fn()  # warm caches
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000.0 / repeat
+
+
+def report(label, value, unit="ms"):
+    print(f"{label:<40} {value:10.4f} {unit}")
+
+
+def init_display(size=(SCREEN_WIDTH, SCREEN_HEIGHT)):
+    pygame.init()
+    return pygame.display.set_mode(size)
+
+
+@bench("smoke")
+def bench_smoke(args):
+    """Smoke plumes: old copy-and-multiply renderer vs pre-blurred sprites."""
+    import numpy as np
+    from render.smoke import SmokeRenderer, draw_reference
+
+    screen = init_display()
+    w, h = screen.get_size()
+    seed = 1234
+    renderer = SmokeRenderer()
+    ref = pygame.Surface((w, h)).convert()
+    new = pygame.Surface((w, h)).convert()
+
+    # reference-image comparison at fixed timestamps
+    for t in (0.0, 1.5, 7.5, 30.0):
+        ref.fill((120, 90, 70))
+        new.fill((120, 90, 70))
+        draw_reference(ref, w, h, t, seed)
+        renderer.draw(new, w, h, t, seed)
+        diff = np.abs(pygame.surfarray.array3d(ref).astype(np.int16)
+                      - pygame.surfarray.array3d(new).astype(np.int16))
+        report(f"parity t={t:<5} mean abs diff", float(diff.mean()), "/255")
+        report(f"parity t={t:<5} max abs diff", float(diff.max()), "/255")
+        if args.out:
+            os.makedirs(args.out, exist_ok=True)
+            pygame.image.save(ref, os.path.join(args.out, f"smoke_ref_{t}.png"))
+            pygame.image.save(new, os.path.join(args.out, f"smoke_new_{t}.png"))
+
+    state = {"t": 0.0}
+
+    def frame(draw, target):
+        def run():
+            state["t"] += 1 / 60
+            draw(target, w, h, state["t"], seed)
+        return run
+
+    before = timeit(frame(draw_reference, ref), args.repeat)
+    after = timeit(frame(renderer.draw, new), args.repeat)
+    report("smoke frame (reference)", before)
+    report("smoke frame (sprites)", after)
+    report("speed-up", before / after, "x")
+
+
+@bench("embers")
+def bench_embers(args):
+    """Background embers: per-ember draw.circle loop vs one batch of pre-rendered stamps."""
+    import numpy as np
+    from render.embers import Embers, draw_reference
+
+    screen = init_display()
+    w, h = screen.get_size()
+    seed = 1234
+    embers = Embers()
+    ref = pygame.Surface((w, h)).convert()
+    new = pygame.Surface((w, h)).convert()
+    for t in (0.0, 1.5, 7.5, 30.0):
+        ref.fill((0, 0, 0))
+        new.fill((0, 0, 0))
+        draw_reference(ref, w, h, t, seed)
+        embers.draw(new, w, h, t, seed)
+        diff = np.abs(pygame.surfarray.array3d(ref).astype(np.int16)
+                      - pygame.surfarray.array3d(new).astype(np.int16))
+        report(f"parity t={t:<5} mean abs diff", float(diff.mean()), "/255")
+
+    state = {"t": 0.0}
+
+    def frame(draw, target):
+        def run():
+            state["t"] += 1 / 60
+            draw(target, w, h, state["t"], seed)
+        return run
+
+    before = timeit(frame(draw_reference, ref), args.repeat)
+    after = timeit(frame(embers.draw, new), args.repeat)
+    report("embers frame (reference)", before)
+    report("embers frame (stamps)", after)
+    report("speed-up", before / after, "x")
+
+
+@bench("particles")
+def bench_particles(args):
+    """Particle system update + draw cost at increasing particle counts."""
+    import numpy as np
+    from render.particles import ParticleSystem
+
+    screen = init_display()
+    w, h = screen.get_size()
+    rng = np.random.default_rng(0)
+    for n in (100, 1000, 5000):
+        ps = ParticleSystem(capacity=n, gravity=900.0, drag=2.0)
+
+        def frame():
+            # keep the buffer full so every frame updates and draws n particles
+            ps.burst(n - ps.count, w / 2, h / 2, life=(0.5, 2.0), size=(1.0, 4.0),
+                     color=(255, 180, 80, 230), rng=rng)
+            ps.update(1 / 60)
+            ps.draw(screen)
+
+        report(f"update+draw {n:>5} particles", timeit(frame, args.repeat))
+
+
+@bench("lasers")
+def bench_lasers(args):
+    """Laser spawn cost: per-projectile glow rendering vs shared sprite cache."""
+    init_display()
+    import game
+
+    def spawn_uncached():
+        # what Laser.__init__ used to do: render a fresh glow image every time
+        spr = pygame.sprite.Sprite()
+        spr.image = game._build_laser_image(tuple(game.LASER_SIZE), tuple(game.LASER_COLOR[:3]), 1)
+        spr.rect = spr.image.get_rect(center=(100, 100))
+
+    def spawn_cached():
+        game.Laser((100, 100), 1)
+
+    group = pygame.sprite.Group()
+    pool = game.SpritePool(game.Laser, (group,), size=4)
+
+    def spawn_pooled():
+        pool.spawn((100, 100), 1).kill()
+
+    game.LASER_SPRITES.clear()
+    before = timeit(spawn_uncached, args.repeat)
+    after = timeit(spawn_cached, args.repeat)
+    pooled = timeit(spawn_pooled, args.repeat)
+    report("laser spawn (render per shot)", before * 1000.0, "us")
+    report("laser spawn (sprite cache)", after * 1000.0, "us")
+    report("laser spawn+kill (pooled)", pooled * 1000.0, "us")
+    report("speed-up (sprite cache)", before / after, "x")
+    report("pool instances created", pool.created, "")
+    stats = game.LASER_SPRITES.stats()
+    report("cache hits", stats["hits"], "")
+    report("cache misses", stats["misses"], "")
+
+
+@bench("hud")
+def bench_hud(args):
+    """HUD text: font.render every frame vs cached TextWidgets."""
+    init_display()
+    from render.text import TextCache, TextWidget
+
+    font = pygame.font.SysFont(None, 24)
+    white = (255, 255, 255)
+    state = {"frame": 0}
+
+    def values():
+        # coins change now and then, the cooldown every few frames, hp rarely
+        f = state["frame"] = state["frame"] + 1
+        return (f // 30) * 10, "Gun", f"{(f // 6) % 5}.{f % 10}s", (1000 - f // 60, 1000), (1000, 1000)
+
+    def uncached():
+        coins, weapon, cd, hp1, hp2 = values()
+        font.render(f"Coins: {coins}", True, (255, 215, 0))
+        font.render(f"Weapon: {weapon}", True, white)
+        font.render(f"Skill (SPACE): Laser - {cd}", True, white)
+        font.render("{}/{}".format(*hp1), True, white)
+        font.render("{}/{}".format(*hp2), True, white)
+
+    cache = TextCache()
+    widgets = [TextWidget(font, (255, 215, 0), "Coins: {}", cache=cache),
+               TextWidget(font, white, "Weapon: {}", cache=cache),
+               TextWidget(font, white, "Skill (SPACE): Laser - {}", cache=cache),
+               TextWidget(font, white, "{}/{}", cache=cache),
+               TextWidget(font, white, "{}/{}", cache=cache)]
+
+    def cached():
+        cache.begin_frame()
+        for widget, value in zip(widgets, values()):
+            widget.render(value)
+
+    before = timeit(uncached, args.repeat)
+    state["frame"] = 0
+    after = timeit(cached, args.repeat)
+    report("hud text (font.render per frame)", before * 1000.0, "us")
+    report("hud text (widgets + cache)", after * 1000.0, "us")
+    report("speed-up", before / after, "x")
+    report("glyphs rendered per frame (mean)", cache.glyphs / (args.repeat + 1), "")
+
+
+@bench("headless")
+def bench_headless(args):
+    """Headless match throughput in simulated ticks per second."""
+    from game import Game
+    from input.controls import KeyState
+
+    game = Game(None, world_size=(SCREEN_WIDTH, SCREEN_HEIGHT))
+    # a player that walks at the enemy and punches keeps melee, AI and pickups busy
+    game.input_source = lambda: KeyState((pygame.K_d, pygame.K_v))
+    ticks = max(args.repeat, 1) * 100
+    start = time.perf_counter()
+    done = 0
+    while done < ticks:
+        if game.state != "running":
+            game.restart()
+        before = game.sim_ticks
+        game.run_ticks(min(1000, ticks - done))
+        done += game.sim_ticks - before
+    elapsed = time.perf_counter() - start
+    report("simulated ticks", done, "")
+    report("simulated time", game.clock.get_ticks() / 1000.0, "s")
+    report("throughput", done / elapsed, "ticks/s")
+    report("speed vs real time", done / elapsed / game.timestep.hz, "x")
+
+
+@bench("snapshot")
+def bench_snapshot(args):
+    """Game.snapshot / restore cost against the get_state / set_state dicts."""
+    from game import Game, Gun
+
+    game = Game(None, world_size=(SCREEN_WIDTH, SCREEN_HEIGHT), seed=1)
+    game.player.equip(Gun())
+    game.run_ticks(600)
+    # a mid-fight state with lasers and a medkit in flight
+    for direction in (1, -1, 1, -1):
+        game.spawn_laser(direction)
+    game.spawn_medkit()
+    snap = game.snapshot()
+
+    take = timeit(lambda: game.snapshot(snap), args.repeat)
+    put = timeit(lambda: game.restore(snap), args.repeat)
+    both = timeit(lambda: (game.snapshot(snap), game.restore(snap)), args.repeat)
+
+    def across_draw():
+        # rng drawn between snapshot and restore: the slow path that re-packs the rng
+        game.snapshot(snap)
+        game.rng.random()
+        game.restore(snap)
+
+    drawn = timeit(across_draw, args.repeat)
+    objects = timeit(lambda: game.set_state(game.get_state()), max(args.repeat // 10, 1))
+    report("snapshot bytes", snap.size, "")
+    report(f"snapshot ({len(game.projectiles)} lasers, {len(game.items)} medkits)", take * 1000.0, "us")
+    report("restore", put * 1000.0, "us")
+    report("snapshot + restore", both * 1000.0, "us")
+    report("snapshot + restore across an rng draw", drawn * 1000.0, "us")
+    report("get_state + set_state (object graph)", objects * 1000.0, "us")
+
+
+
+@bench("collisions")
+def bench_collisions(args):
+    """Collision queries: testing every pair vs the spatial-hash broadphase."""
+    import random
+    from spatial import SpatialHash
+    import game
+
+    rng = random.Random(0)
+
+    def scatter(n, size, width):
+        sprites = []
+        for _ in range(n):
+            spr = pygame.sprite.Sprite()
+            spr.rect = pygame.Rect((rng.randrange(width - size[0]), rng.randrange(SCREEN_HEIGHT - size[1])), size)
+            sprites.append(spr)
+        return sprites
+
+    for n in (10, 100, 1000):
+        # n lasers and n pickups against n enemy-sized targets; past 100 of each the
+        # level widens so the crowd is as dense as 100 of each on one screen
+        width = SCREEN_WIDTH * max(n // 100, 1)
+        lasers = scatter(n, game.LASER_SIZE, width)
+        items = scatter(n, game.MEDKIT_SIZE, width)
+        targets = scatter(n, game.ENEMY_SIZE, width)
+        movers = lasers + items
+
+        def pairs():
+            return sum(1 for t in targets for s in movers if s.rect.colliderect(t.rect))
+
+        def collidelist():
+            rects = [s.rect for s in movers]
+            return sum(len(t.rect.collidelistall(rects)) for t in targets)
+
+        grid = SpatialHash(game.COLLISION_CELL, linear_max=0)
+        fallback = SpatialHash(game.COLLISION_CELL)
+
+        def linear_below_max():
+            fallback.rebuild(movers)
+            return sum(len(fallback.query(t.rect)) for t in targets)
+
+        def hashed():
+            grid.rebuild(movers)
+            return sum(len(grid.query(t.rect)) for t in targets)
+
+        if not pairs() == collidelist() == hashed() == linear_below_max():
+            raise AssertionError("broadphase disagrees with the pairwise test")
+        repeat = max(args.repeat // max(n // 10, 1), 3)
+        grid.reset_stats()
+        report(f"{n:>4} targets x {2 * n:>4} lasers+pickups (pairs)", timeit(pairs, repeat))
+        report(f"{n:>4} (Rect.collidelistall)", timeit(collidelist, repeat))
+        after = timeit(hashed, repeat)
+        report(f"{n:>4} (spatial hash, incl. rebuild)", after)
+        report(f"{n:>4} rect tests per query", grid.tests / max(grid.queries, 1), "")
+        report(f"{n:>4} (SpatialHash, linear_max={fallback.linear_max})", timeit(linear_below_max, repeat))
+
+
+
+@bench("horde")
+def bench_horde(args):
+    """Wave-mode grunts: one Enemy object each vs the NumPy horde store."""
+    import numpy as np
+    screen = init_display()
+    import game
+    from entities.horde import Horde
+    from physics import Physics
+    from timestep import SimClock
+
+    ground_y = SCREEN_HEIGHT - game.GROUND_Y_OFFSET
+    dt = 1000.0 / game.SIM_HZ
+    for n in (50, 200, 500):
+        xs = [(i * 37) % SCREEN_WIDTH for i in range(n)]
+        clock = SimClock()
+        world = screen.get_rect()
+        enemies = [game.Enemy((x, ground_y), clock=clock, world=world) for x in xs]
+        target = pygame.Rect(SCREEN_WIDTH // 2, ground_y - 80, 40, 80)
+        physics = Physics(world, game.GRAVITY, game.GROUND_Y_OFFSET, game.PHYSICS_MAX_STEP_MS,
+                          game.PHYSICS_VECTOR_MIN)
+        for e in enemies:
+            physics.add(e)
+
+        def objects():
+            # what n duel Enemies would cost: per-object update, attack test and draw
+            for _ in range(2):  # two 120 Hz ticks per 60 FPS frame
+                clock.advance(dt)
+                for e in enemies:
+                    e.update(dt, player_rect=target)
+                physics.step(dt)
+                for e in enemies:
+                    er = e.get_attack_rect()
+                    if er:
+                        er.colliderect(target)
+            for e in enemies:
+                e.draw(screen)
+
+        horde = Horde(n, seed=1)
+        horde.spawn(xs, ground_y, 0)
+        horde_clock = SimClock()
+        horde_physics = Physics(world, game.GRAVITY, game.GROUND_Y_OFFSET, game.PHYSICS_MAX_STEP_MS)
+        horde_physics.add_batch(horde)
+
+        def batched():
+            for _ in range(2):
+                horde_clock.advance(dt)
+                now = horde_clock.get_ticks()
+                horde.update(now, target.centerx)
+                horde_physics.step(dt)
+                horde.strike_damage(target, now)
+                horde.overlapping(target)
+            horde.draw(screen)
+
+        repeat = max(args.repeat // max(n // 50, 1), 5)
+        before = timeit(objects, repeat)
+        after = timeit(batched, repeat)
+        report(f"{n:>3} enemies, 2 ticks + draw (objects)", before)
+        report(f"{n:>3} grunts, 2 ticks + draw (horde)", after)
+        report(f"{n:>3} speed-up", before / after, "x")
+
+    wave = game.Game(None, world_size=(SCREEN_WIDTH, SCREEN_HEIGHT), seed=1, waves=True)
+    wave.player.hp = wave.player.max_hp = 10 ** 9  # keep the match going
+    while wave.wave < 8:
+        wave.horde.hp[:wave.horde.count] = 0  # skip ahead to a big wave
+        wave.run_ticks(1)
+    wave.run_ticks(600)  # let it walk on screen
+    report(f"wave {wave.wave} headless tick ({wave.horde.count} grunts)", timeit(lambda: wave.run_ticks(1), args.repeat))
+
+    # a volley of lasers against that crowd: one overlap pass per laser vs one lasers x grunts pass
+    crowd = wave.horde
+    ground = int(crowd.y[:crowd.count].mean()) + crowd.height // 2
+    shots = [pygame.Rect(i * SCREEN_WIDTH // 40, ground - 6 + (i % 2) * 12, 80, 8) for i in range(40)]
+    vxs = [12 if i % 2 else -12 for i in range(40)]
+
+    def per_laser():
+        for rect, vx in zip(shots, vxs):
+            hit = crowd.overlapping(rect)
+            if hit.size:
+                x = crowd.x[hit]
+                hit[[int(np.argmin(x) if vx > 0 else np.argmax(x))]]
+
+    report(f"40 lasers vs {crowd.count} grunts (per-laser passes)", timeit(per_laser, args.repeat))
+    report(f"40 lasers vs {crowd.count} grunts (first_hits)", timeit(lambda: crowd.first_hits(shots, vxs), args.repeat))
+
+
+
+@bench("entities")
+def bench_entities(args):
+    """Python memory per entity instance and hot-path attribute access."""
+    import tracemalloc
+    init_display()
+    import game
+    from entities.player import Player
+    from physics import Physics
+    from timestep import SimClock
+
+    clock = SimClock()
+    world = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+    n = 1000
+    makers = {
+        "Laser": lambda: game.Laser((100, 100), 1, clock=clock, world=world),
+        "MedKit": lambda: game.MedKit(100, world=world),
+        "Enemy": lambda: game.Enemy((100, 400), clock=clock, world=world),
+        "Player": lambda: Player((100, 400), clock=clock, world=world, headless=True),
+        "Katana": game.Katana,
+    }
+    made = {}
+    for name, make in makers.items():
+        make()  # warm caches shared by every instance (laser sprites, fonts)
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        made[name] = [make() for _ in range(n)]
+        used = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        report(f"{name} (Python bytes per instance)", used / n, "B")
+
+    lasers, enemies = made["Laser"], made["Enemy"]
+    dt = 1000.0 / game.SIM_HZ
+    laser_physics = Physics(world, game.GRAVITY, game.GROUND_Y_OFFSET, game.PHYSICS_MAX_STEP_MS, n + 1)
+    enemy_physics = Physics(world, game.GRAVITY, game.GROUND_Y_OFFSET, game.PHYSICS_MAX_STEP_MS, n + 1)
+    for s in lasers:
+        laser_physics.add(s)
+    for e in enemies:
+        enemy_physics.add(e)
+
+    def read_lasers():
+        for s in lasers:
+            s.vx, s.sub_x, s.life, s.spawn_time, s.damage
+
+    def update_lasers():
+        for s in lasers:
+            s.rect.x = 100  # keep them on screen
+        laser_physics.step(dt)
+        for s in lasers:
+            s.update(dt)
+
+    def update_enemies():
+        clock.advance(dt)
+        for e in enemies:
+            e.update(dt, player_rect=world)
+        enemy_physics.step(dt)
+
+    report(f"read 5 attributes x {n} lasers", timeit(read_lasers, args.repeat) * 1000.0, "us")
+    report(f"Laser.update + physics x {n}", timeit(update_lasers, args.repeat) * 1000.0, "us")
+    report(f"Enemy.update + physics x {n}", timeit(update_enemies, args.repeat) * 1000.0, "us")
+
+
+@bench("physics")
+def bench_physics(args):
+    """physics.Physics step cost (loop vs arrays) and laser tunnelling at low tick rates."""
+    init_display()
+    import game
+    from physics import Physics
+    from timestep import SimClock
+
+    clock = SimClock()
+    world = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+    dt = 1000.0 / game.SIM_HZ
+    for n in (10, 100, 1000):
+        def bodies():
+            # a laser / medkit mix strung across the screen
+            made = []
+            for i in range(n):
+                x, y = (i * 37) % SCREEN_WIDTH, 40 + (i * 53) % (SCREEN_HEIGHT // 2)
+                made.append(game.Laser((x, y), 1 if i % 2 else -1, clock=clock, world=world) if i % 4
+                            else game.MedKit(x, y, world=world))
+            return made
+        for substeps in (1, 4):
+            step = dt * substeps
+            timings = {}
+            moved = {}
+            for name, vector_min in (("loop", n + 1), ("arrays", 0)):
+                physics = Physics(world, game.GRAVITY, game.GROUND_Y_OFFSET, dt, vector_min, vector_substeps=1)
+                for body in bodies():
+                    physics.add(body)
+                timings[name] = timeit(lambda: physics.step(step), args.repeat)
+                fresh = Physics(world, game.GRAVITY, game.GROUND_Y_OFFSET, dt, vector_min, vector_substeps=1)
+                for body in bodies():
+                    fresh.add(body)
+                for _ in range(30):
+                    fresh.step(step)
+                moved[name] = [(tuple(b.rect), b.sub_x if b.MOVES_X else b.sub_y) for b in fresh._bodies]
+            label = f"{n:>4} bodies, {substeps} sub-step{'s' if substeps > 1 else ''}"
+            report(f"{label} (loop)", timings["loop"] * 1000.0, "us")
+            report(f"{label} (arrays)", timings["arrays"] * 1000.0, "us")
+            if moved["loop"] != moved["arrays"]:
+                print("  !! loop and array steps disagree")
+
+    # a laser crossing an Enemy-sized target: at low tick rates one step jumps
+    # further than laser + target are wide, so end-of-step rects can miss
+    target = pygame.Rect(400, 300, *game.ENEMY_SIZE)
+    for hz in (120, 10, 6, 4):
+        step = 1000.0 / hz
+        hits = {"rect": 0, "swept": 0}
+        shots = 64
+        for start in range(shots):  # start points spread over more than a step
+            laser = game.Laser((target.left - 400 + start * 200 // shots, target.centery), 1, clock=clock, world=world)
+            physics = Physics(world, game.GRAVITY, game.GROUND_Y_OFFSET, game.PHYSICS_MAX_STEP_MS)
+            physics.add(laser)
+            seen = set()
+            while laser.rect.left <= target.right:
+                physics.step(step)
+                if laser.rect.colliderect(target):
+                    seen.add("rect")
+                if laser.swept.colliderect(target):
+                    seen.add("swept")
+            for key in seen:
+                hits[key] += 1
+        report(f"{hz:>3} Hz: shots hitting (end-of-step rect)", 100.0 * hits["rect"] / shots, "%")
+        report(f"{hz:>3} Hz: shots hitting (swept rect)", 100.0 * hits["swept"] / shots, "%")
+
+
+@bench("scratch")
+def bench_scratch(args):
+    """Scratch render targets: the Midnight slash on a full-screen vs a bounded surface, frame allocations."""
+    screen = init_display()
+    import game
+    from entities.midnightblade import MidnightBlade
+    from entities.state import MIDNIGHT
+    from render.scratch import SCRATCH
+
+    w, h = screen.get_size()
+    extent = pygame.Rect(0, 0, 2 * 112 + 12, 2 * 112 + 12)  # the slash at full reach
+
+    def full_screen():
+        tmp = pygame.Surface((w, h), pygame.SRCALPHA)
+        screen.blit(tmp, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
+
+    def bounded():
+        tmp = SCRATCH.get(extent.size)
+        screen.blit(tmp, (300, 200), special_flags=pygame.BLEND_RGBA_ADD)
+        SCRATCH.end_frame()
+
+    report("slash target, new full-screen surface", timeit(full_screen, args.repeat))
+    report("slash target, bounded scratch surface", timeit(bounded, args.repeat))
+
+    # a match frame with every scratch user on screen: explosion glows, the
+    # blade tip glow, the slash, and (second half) the game-over overlay
+    match = game.Game(screen, seed=1)
+    match.player.equip(MidnightBlade())
+
+    def play(frames):
+        created = 0
+        for i in range(frames):
+            if i % 30 == 0 and match.state == "running":
+                match.player.start_attack(MIDNIGHT)
+            if i == frames // 2:
+                match.state = "gameover"
+            match.run_ticks(2)
+            match.draw()
+            created += SCRATCH.last_frame_allocations
+        match.restart()
+        match.player.equip(MidnightBlade())
+        return created
+
+    # long enough for the pulsing glows to pass through every size
+    warm = play(1200)
+    frames = max(args.repeat, 60)
+    start = time.perf_counter()
+    steady = play(frames)
+    report("match frame (2 ticks + draw)", (time.perf_counter() - start) * 1000.0 / frames)
+    report("scratch surfaces + views created, warm-up", warm, "")
+    report(f"scratch surfaces + views created, next {frames} frames", steady, "")
+    print(f"  {SCRATCH.stats()}")
+
+
+@bench("weapons")
+def bench_weapons(args):
+    """Weapon drawing: procedural primitives every frame vs pre-rendered sprites."""
+    screen = init_display()
+    from render.weapons import PAINTERS, WEAPON_SPRITES, draw_tip_glow
+
+    hands = [(100 + (i * 97) % (SCREEN_WIDTH - 200), 150 + (i * 53) % (SCREEN_HEIGHT - 300)) for i in range(50)]
+    for name, paint in PAINTERS.items():
+        def procedural():
+            for i, (x, y) in enumerate(hands):
+                facing = bool(i % 2)
+                tip = paint(screen, x, y, facing)
+                if tip is not None:
+                    draw_tip_glow(screen, (x + tip[0], y + tip[1]), facing)
+
+        def baked():
+            for i, hand in enumerate(hands):
+                WEAPON_SPRITES.get(name, bool(i % 2)).draw(screen, hand)
+
+        before = timeit(procedural, args.repeat) * 1000.0 / len(hands)
+        after = timeit(baked, args.repeat) * 1000.0 / len(hands)
+        report(f"{name}, per draw (primitives)", before, "us")
+        report(f"{name}, per draw (sprite)", after, "us")
+    print(f"  {WEAPON_SPRITES.stats()}")
+
+
+@bench("poses")
+def bench_poses(args):
+    """Duel Enemy drawing: stick figure primitives every frame vs one blit from the pose atlas."""
+    screen = init_display()
+    import game
+    from render.poses import ENEMY_POSES, paint_stickman
+    from render.weapons import WEAPON_SPRITES
+
+    size = tuple(game.ENEMY_SIZE)
+    spots = [(100 + (i * 97) % (SCREEN_WIDTH - 200), 100 + (i * 53) % (SCREEN_HEIGHT - 250)) for i in range(50)]
+    for weapon in (None, "Katana", "Flail"):
+        def primitives():
+            for i, (x, y) in enumerate(spots):
+                facing, attacking = bool(i % 2), bool(i % 3 == 0)
+                baked = WEAPON_SPRITES.get(weapon, facing) if weapon else None
+                color = game.ENEMY_ATTACK_COLOR if attacking else game.ENEMY_COLOR
+                paint_stickman(screen, x + size[0] // 2, y, size, color, facing, attacking, weapon=baked)
+
+        def atlas():
+            for i, spot in enumerate(spots):
+                ENEMY_POSES.get(size, game.ENEMY_COLOR, game.ENEMY_ATTACK_COLOR,
+                                bool(i % 2), bool(i % 3 == 0), weapon).draw(screen, spot)
+
+        before = timeit(primitives, args.repeat) * 1000.0 / len(spots)
+        after = timeit(atlas, args.repeat) * 1000.0 / len(spots)
+        report(f"{weapon or 'unarmed'}, per enemy (primitives)", before, "us")
+        report(f"{weapon or 'unarmed'}, per enemy (atlas)", after, "us")
+    print(f"  {ENEMY_POSES.stats()}")
+
+
+@bench("startup")
+def bench_startup(args):
+    """Time to first frame of main.py (fresh processes), with and without the asset bundle."""
+    import statistics
+    import subprocess
+    from assets import ASSET_BUNDLE
+    from startup import STARTUP_BUDGET_MS
+
+    main_py = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+    runs = max(min(args.repeat, 15), 3)
+    variants = [("package directories", ["--no-bundle"])]
+    if os.path.exists(ASSET_BUNDLE):
+        variants.append(("bundle", []))
+    else:
+        print(f"  (no {ASSET_BUNDLE}; run python src/bundle.py build to compare)")
+    for name, extra in variants:
+        first, wall = [], []
+        for _ in range(runs):
+            start = time.perf_counter()
+            out = subprocess.run([sys.executable, main_py, "--startup-profile", *extra],
+                                 capture_output=True, text=True, check=True).stdout
+            wall.append((time.perf_counter() - start) * 1000.0)
+            first.extend(float(line.split()[0]) for line in out.splitlines() if line.endswith(" first frame"))
+        report(f"first frame, {name}", statistics.median(first))
+        report(f"process wall time, {name}", statistics.median(wall))
+    report("budget (STARTUP_BUDGET_MS)", STARTUP_BUDGET_MS)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("name", nargs="?", help="benchmark to run")
+    parser.add_argument("--list", action="store_true", help="list benchmarks")
+    parser.add_argument("--repeat", type=int, default=200, help="iterations per timing")
+    parser.add_argument("--out", default=None, help="directory for reference images")
+    args = parser.parse_args(argv)
+    if args.list or not args.name:
+        for name, fn in BENCHES.items():
+            print(f"{name:<16} {(fn.__doc__ or '').strip()}")
+        return 0
+    if args.name not in BENCHES:
+        parser.error(f"unknown benchmark {args.name!r}")
+    BENCHES[args.name](args)
+    pygame.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
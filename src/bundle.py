@@ -0,0 +1,150 @@
+"""Pack the game's images, fonts and sounds into one indexed file.
+
+A bundle is read through mmap: opening one parses only the header and the
+index, and an asset's bytes are handed to pygame (still PNG / TTF / WAV)
+only when the game first asks for it, so launch cost does not grow with the
+amount of content::
+
+    python src/bundle.py build            # writes src/assets.bundle
+    python src/bundle.py list src/assets.bundle
+
+main.py mounts ASSET_BUNDLE on the shared asset manager (assets.ASSETS) when
+the file exists; without it assets load from the package directories.
+
+File layout: header, the files' bytes back to back, then the index the
+header points to (per file: offset, size, CRC-32 and name).
+"""
+import argparse
+import io
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+MAGIC = b"SDAB"
+VERSION = 1
+# magic, version, file count, index offset
+HEADER = struct.Struct("<4sHIQ")
+# offset, size, crc32, name length; the UTF-8 name follows
+INDEX_ENTRY = struct.Struct("<QQIH")
+
+# package directories packed by ``build``, and what counts as an asset in them
+ASSET_DIRS = ("images", "fonts", "sounds")
+ASSET_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".ttf", ".otf", ".wav", ".ogg", ".mp3")
+# pygame's built-in font (what Font(None, size) uses) is packed under this name
+DEFAULT_FONT = "fonts/default.ttf"
+
+
+class Bundle:
+    """Read-only view of a bundle file; ``open(name)`` gives a file object over an asset's bytes."""
+
+    def __init__(self, data):
+        self._data = data
+        magic, version, count, index_offset = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not a Street Duel asset bundle")
+        if version != VERSION:
+            raise ValueError(f"unsupported bundle version {version}")
+        self.index = {}
+        offset = index_offset
+        for _ in range(count):
+            start, size, crc, name_len = INDEX_ENTRY.unpack_from(data, offset)
+            offset += INDEX_ENTRY.size
+            name = bytes(data[offset:offset + name_len]).decode("utf-8")
+            offset += name_len
+            self.index[name] = (start, size, crc)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
+    def read(self, name):
+        start, size, _ = self.index[name]
+        return self._data[start:start + size]
+
+    def open(self, name):
+        return io.BytesIO(self.read(name))
+
+    def source_id(self, name):
+        """(size, crc) of an asset: changes whenever its bytes do."""
+        _, size, crc = self.index[name]
+        return size, crc
+
+
+def collect(root):
+    """{bundle name: file path} of every asset under root's ASSET_DIRS, plus pygame's default font."""
+    files = {}
+    for sub in ASSET_DIRS:
+        top = os.path.join(root, sub)
+        for dirpath, dirnames, filenames in os.walk(top):
+            dirnames.sort()
+            for fn in sorted(filenames):
+                if fn.lower().endswith(ASSET_EXTENSIONS):
+                    path = os.path.join(dirpath, fn)
+                    files[os.path.relpath(path, root).replace(os.sep, "/")] = path
+    import pygame
+    font = os.path.join(os.path.dirname(pygame.__file__), pygame.font.get_default_font())
+    if os.path.exists(font):
+        files[DEFAULT_FONT] = font
+    return files
+
+
+def build(files, path):
+    """Write {name: file path} to a bundle at path; returns the number of bytes written."""
+    entries = []
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as out:
+        out.write(HEADER.pack(MAGIC, VERSION, 0, 0))
+        for name, src in files.items():
+            with open(src, "rb") as f:
+                data = f.read()
+            entries.append((name, out.tell(), len(data), zlib.crc32(data)))
+            out.write(data)
+        index_offset = out.tell()
+        for name, start, size, crc in entries:
+            encoded = name.encode("utf-8")
+            out.write(INDEX_ENTRY.pack(start, size, crc, len(encoded)))
+            out.write(encoded)
+        total = out.tell()
+        out.seek(0)
+        out.write(HEADER.pack(MAGIC, VERSION, len(entries), index_offset))
+    os.replace(tmp, path)
+    return total
+
+
+def main(argv=None):
+    from assets import ASSET_ROOT, ASSET_BUNDLE
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("build", help="pack the package's assets")
+    p.add_argument("--out", default=ASSET_BUNDLE, help="bundle to write")
+    p = sub.add_parser("list", help="show a bundle's index")
+    p.add_argument("path", nargs="?", default=ASSET_BUNDLE)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        files = collect(ASSET_ROOT)
+        total = build(files, args.out)
+        print(f"packed {len(files)} files, {total} bytes, into {args.out}")
+    else:
+        bundle = Bundle.load(args.path)
+        for name, (start, size, crc) in bundle.index.items():
+            print(f"{start:>10} {size:>10} {crc:08x}  {name}")
+        bundle.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
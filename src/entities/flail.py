@@ -1,5 +1,6 @@
 from .weapon import Weapon
 class Flail(Weapon):
+    __slots__ = ()
     name = "Flail"
     price = 140
     melee_bonus = 10
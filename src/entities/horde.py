@@ -0,0 +1,280 @@
+import numpy as np
+import pygame
+from .state import NO_ATTACK, PUNCH, KICK
+from render import display_ready
+from render.poses import paint_stickman
+try:
+    import settings
+except Exception:
+    settings = None
+
+def cfg_get(name, default):
+    if settings is None:
+        return default
+    return getattr(settings, name, default)
+ENEMY_SIZE = cfg_get("ENEMY_SIZE", (40, 80))
+GRUNT_COLOR = cfg_get("GRUNT_COLOR", (170, 100, 70))
+GRUNT_ATTACK_COLOR = cfg_get("GRUNT_ATTACK_COLOR", (255, 170, 130))
+GRUNT_HP = cfg_get("GRUNT_HP", 60)
+GRUNT_SPEED = cfg_get("GRUNT_SPEED", 2)
+# per 60 Hz frame of a connecting attack, like the Enemy's 6 / 10 but a crowd's worth lighter
+GRUNT_PUNCH_DAMAGE = cfg_get("GRUNT_PUNCH_DAMAGE", 1)
+GRUNT_KICK_DAMAGE = cfg_get("GRUNT_KICK_DAMAGE", 2)
+
+ATTACK_TIME = 220  # ms an attack lasts, as for the duel Enemy
+HIT_WINDOW = 80  # ms after it starts that an attack connects
+ARM_REACH = 30  # px the attacking arm reaches past the body centre
+
+_POSE_KEY = (255, 0, 255)
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+
+
+def _mix(seed, serial, now):
+    """splitmix64 of (seed, enemy serial, time): per-enemy dice with no rng state."""
+    with np.errstate(over="ignore"):
+        z = (serial + np.uint64(seed)) * _GOLDEN + np.uint64(now)
+        z = (z ^ (z >> np.uint64(30))) * _MIX1
+        z = (z ^ (z >> np.uint64(27))) * _MIX2
+        return z ^ (z >> np.uint64(31))
+
+
+class Horde:
+    """Struct-of-arrays store for wave-mode grunts, updated in NumPy passes.
+
+    Live grunts occupy the first ``count`` slots of every array (like
+    render.particles.ParticleSystem); dead ones are compacted out by
+    ``remove_dead``. Positions are rect top-lefts in pixels, velocities in
+    pixels per 60 Hz frame, timers absolute SimClock milliseconds. A grunt's
+    decisions are hashed from the horde seed, its spawn serial and the time,
+    so a horde is deterministic without a random stream of its own.
+    """
+
+    FIELDS = ("x", "y", "vx", "vy", "hp", "facing", "attack", "attack_end", "next_action", "serial")
+
+    def __init__(self, capacity=512, seed=0):
+        self.capacity = capacity
+        self.seed = seed & 0xFFFFFFFF
+        self.width, self.height = ENEMY_SIZE
+        self.count = 0
+        self.spawned = 0
+        self.x = np.zeros(capacity, dtype=np.float64)
+        self.y = np.zeros(capacity, dtype=np.float64)
+        self.vx = np.zeros(capacity, dtype=np.float64)
+        self.vy = np.zeros(capacity, dtype=np.float64)
+        self.hp = np.zeros(capacity, dtype=np.float64)
+        self.facing = np.ones(capacity, dtype=np.int8)  # +1 right, -1 left
+        self.attack = np.zeros(capacity, dtype=np.int8)
+        self.attack_end = np.zeros(capacity, dtype=np.int64)
+        self.next_action = np.zeros(capacity, dtype=np.int64)
+        self.serial = np.zeros(capacity, dtype=np.uint64)
+        self._poses = None
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def spawn(self, xs, ground_y, now):
+        """Add grunts standing on the ground at centre x positions xs; returns how many fit."""
+        xs = np.asarray(xs, dtype=np.float64)
+        start = self.count
+        n = min(len(xs), self.capacity - start)
+        if n <= 0:
+            return 0
+        end = start + n
+        serial = np.arange(self.spawned, self.spawned + n, dtype=np.uint64)
+        self.x[start:end] = xs[:n] - self.width / 2
+        self.y[start:end] = ground_y - self.height
+        self.vx[start:end] = 0.0
+        self.vy[start:end] = 0.0
+        self.hp[start:end] = GRUNT_HP
+        self.facing[start:end] = 1
+        self.attack[start:end] = NO_ATTACK
+        self.attack_end[start:end] = 0
+        self.next_action[start:end] = now + 400 + (_mix(self.seed, serial, now) % np.uint64(800)).astype(np.int64)
+        self.serial[start:end] = serial
+        self.spawned += n
+        self.count = end
+        return n
+
+    def update(self, now, target_x):
+        """Chase target_x and attack: the duel Enemy's AI, for every grunt at once.
+
+        Only velocities change here; physics.Physics moves and lands the horde
+        (x, y, vx, vy and height are what it reads).
+        """
+        n = self.count
+        if not n:
+            return
+        x, vx = self.x[:n], self.vx[:n]
+        facing, attack = self.facing[:n], self.attack[:n]
+        serial = self.serial[:n]
+
+        # stop at a per-grunt distance so a crowd fans out instead of stacking up
+        reach = 60 + (serial % np.uint64(48)).astype(np.float64)
+        dx = target_x - (x + self.width / 2)
+        np.copyto(vx, np.where(np.abs(dx) > reach, np.sign(dx) * GRUNT_SPEED, 0.0))
+        np.copyto(facing, np.sign(vx).astype(np.int8), where=vx != 0)
+
+        attack[self.attack_end[:n] < now] = NO_ATTACK
+        due = np.flatnonzero(self.next_action[:n] < now)
+        if due.size:
+            dice = _mix(self.seed, serial[due], now)
+            self.next_action[due] = now + 700 + (dice % np.uint64(900)).astype(np.int64)
+            # like Enemy: 60% of decisions are an attack, punch or kick at even odds
+            strike = (dice >> np.uint64(16)) % np.uint64(1000) < 600
+            hits = due[strike]
+            attack[hits] = np.where((dice[strike] >> np.uint64(40)) & np.uint64(1), KICK, PUNCH)
+            self.attack_end[hits] = now + ATTACK_TIME
+
+    def overlapping(self, rect):
+        """Indices of grunts whose body overlaps rect."""
+        n = self.count
+        if not n:
+            return np.empty(0, dtype=np.intp)
+        x, y = self.x[:n], self.y[:n]
+        return np.flatnonzero((x < rect.right) & (x + self.width > rect.left)
+                              & (y < rect.bottom) & (y + self.height > rect.top))
+
+    def first_hits(self, rects, vxs):
+        """For each shot (rect, vx), the grunt it meets first, or -1: one lasers x grunts pass.
+
+        A shot moving right meets the leftmost grunt its rect overlaps, one
+        moving left (or standing) the rightmost; ties go to the lowest index.
+        """
+        m = len(rects)
+        n = self.count
+        if not n or not m:
+            return np.full(m, -1, dtype=np.intp)
+        r = np.array([(q.left, q.top, q.right, q.bottom) for q in rects], dtype=np.float64)
+        x, y = self.x[:n], self.y[:n]
+        hit = ((x < r[:, 2:3]) & (x + self.width > r[:, 0:1])
+               & (y < r[:, 3:4]) & (y + self.height > r[:, 1:2]))
+        ahead = np.where(np.asarray(vxs)[:, None] > 0, x, -x)
+        first = np.argmin(np.where(hit, ahead, np.inf), axis=1)
+        return np.where(hit.any(axis=1), first, -1)
+
+    def strike_damage(self, rect, now):
+        """Damage of the grunt attacks connecting with rect this tick (per 60 Hz frame)."""
+        n = self.count
+        if not n:
+            return 0
+        attack = self.attack[:n]
+        live = (attack != NO_ATTACK) & (now - (self.attack_end[:n] - ATTACK_TIME) < HIT_WINDOW)
+        if not live.any():
+            return 0
+        # the duel Enemy's attack boxes: 24 (punch) / 40 (kick) wide, 20 high, at the facing side
+        w = np.where(attack == KICK, 40, 24)
+        left = np.where(self.facing[:n] > 0, self.x[:n] + self.width, self.x[:n] - w)
+        top = self.y[:n] + self.height / 2 - 10
+        hit = live & (left < rect.right) & (left + w > rect.left) & (top < rect.bottom) & (top + 20 > rect.top)
+        return int(np.where(attack[hit] == KICK, GRUNT_KICK_DAMAGE, GRUNT_PUNCH_DAMAGE).sum())
+
+    def hurt(self, idx, dmg):
+        """Take dmg off each grunt in idx; returns the damage actually dealt."""
+        hp = self.hp[idx]
+        dealt = np.minimum(hp, dmg)
+        self.hp[idx] = hp - dealt
+        total = float(dealt.sum())
+        return int(total) if total.is_integer() else total
+
+    def remove_dead(self):
+        """Compact out grunts at 0 hp; returns how many died."""
+        n = self.count
+        alive = self.hp[:n] > 0
+        k = int(np.count_nonzero(alive))
+        if k != n:
+            for name in self.FIELDS:
+                arr = getattr(self, name)
+                arr[:k] = arr[:n][alive]
+            self.count = k
+        return n - k
+
+    def get_state(self):
+        n = self.count
+        state = {name: getattr(self, name)[:n].tolist() for name in self.FIELDS}
+        state["spawned"] = self.spawned
+        return state
+
+    def set_state(self, state):
+        n = len(state["x"])
+        if n > self.capacity:
+            raise ValueError(f"{n} grunts do not fit a horde of {self.capacity}")
+        for name in self.FIELDS:
+            getattr(self, name)[:n] = state[name]
+        self.spawned = state["spawned"]
+        self.count = n
+
+    def tobytes(self):
+        n = self.count
+        return b"".join(getattr(self, name)[:n].tobytes() for name in self.FIELDS)
+
+    @property
+    def row_size(self):
+        return sum(getattr(self, name).itemsize for name in self.FIELDS)
+
+    def pack_into(self, buf, offset):
+        """Write the live rows field by field at offset; returns the end offset."""
+        n = self.count
+        for name in self.FIELDS:
+            arr = getattr(self, name)
+            size = n * arr.itemsize
+            buf[offset:offset + size] = arr[:n].tobytes()
+            offset += size
+        return offset
+
+    def unpack_from(self, buf, offset, count):
+        for name in self.FIELDS:
+            arr = getattr(self, name)
+            arr[:count] = np.frombuffer(buf, dtype=arr.dtype, count=count, offset=offset)
+            offset += count * arr.itemsize
+        self.count = count
+        return offset
+
+    # --- drawing: four pre-rendered poses, blitted in one batch ---
+
+    def _build_pose(self, facing, attacking):
+        # the duel Enemy's stick figure (no weapon), centred on a body-sized box with arm room
+        w, h = self.width, self.height
+        pad = ARM_REACH
+        surf = pygame.Surface((w + 2 * pad, h))
+        surf.fill(_POSE_KEY)
+        color = GRUNT_ATTACK_COLOR if attacking else GRUNT_COLOR
+        paint_stickman(surf, pad + w // 2, 0, (w, h), color, facing > 0, attacking, ARM_REACH)
+        if display_ready():
+            surf = surf.convert()
+        # hard-edged figures: an RLE colour key blits several times faster than per-pixel alpha
+        surf.set_colorkey(_POSE_KEY, pygame.RLEACCEL)
+        return surf
+
+    def poses(self):
+        """Pose surfaces indexed by (facing > 0) * 2 + attacking."""
+        if self._poses is None:
+            self._poses = [self._build_pose(facing, attacking)
+                           for facing in (-1, 1) for attacking in (False, True)]
+        return self._poses
+
+    def bounds(self):
+        """Rect covering every drawn grunt, or None when empty."""
+        n = self.count
+        if not n:
+            return None
+        x0 = int(self.x[:n].min()) - ARM_REACH
+        x1 = int(self.x[:n].max()) + self.width + ARM_REACH + 1
+        y0 = int(self.y[:n].min())
+        y1 = int(self.y[:n].max()) + self.height + 1
+        return pygame.Rect(x0, y0, x1 - x0, y1 - y0)
+
+    def draw(self, surf):
+        n = self.count
+        if not n:
+            return
+        poses = self.poses()
+        pose = ((self.facing[:n] > 0) * 2 + (self.attack[:n] != NO_ATTACK)).tolist()
+        xs = (self.x[:n] - ARM_REACH).astype(np.int64).tolist()
+        ys = self.y[:n].astype(np.int64).tolist()
+        surf.blits([(poses[i], (px, py)) for i, px, py in zip(pose, xs, ys)], doreturn=False)
@@ -1,6 +1,7 @@
 from .weapon import Weapon
 class Katana(Weapon):
       
+    __slots__ = ()
     name = "Katana"
     price = 120
     melee_bonus = 18
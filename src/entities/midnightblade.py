@@ -1,18 +1,18 @@
 from .weapon import Weapon
+from .state import MIDNIGHT
 class MidnightBlade(Weapon):
+    __slots__ = ()
     name = "Midnight Blade"
     price = 300
     melee_bonus = 45
     cooldown = 250
     ranged = False
+    duration = 320
     def on_use(self, player, game):
-        now = pygame.time.get_ticks()
-        if now - getattr(player, "last_weapon_time", 0) < self.cooldown:
+        now = player.clock.get_ticks()
+        if now - player.last_weapon_time < self.cooldown:
             return False
-        player.attacking = True
-        player.attack_type = "midnight"
-        player.attack_duration = 320
-        player.attack_start = now
+        player.start_attack(MIDNIGHT, self.duration)
         player.last_weapon_time = now
         return True
 
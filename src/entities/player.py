@@ -2,7 +2,16 @@ import pygame
 from .flail import Flail
 from .katana import Katana
 import math
+import numpy as np
 from .midnightblade import MidnightBlade
+from render.particles import ParticleSystem
+from .sprite import CompactSprite
+from .state import StateMixin, NO_ATTACK, PUNCH, KICK, MIDNIGHT, IDLE, RUN, JUMP, ATTACK
+from render.sprite_cache import SpriteCache
+from render.scratch import SCRATCH
+from render.weapons import WEAPON_SPRITES
+from assets import ASSETS
+from timestep import WALL_CLOCK
 try:
     import settings
 except Exception:
@@ -12,8 +21,6 @@ def cfg_get(name, default):
     if settings is None:
         return default
     return getattr(settings, name, default)
-GRAVITY = cfg_get("GRAVITY", 0.6)
-GROUND_Y_OFFSET = cfg_get("GROUND_Y_OFFSET", 40)
 PLAYER_SIZE = cfg_get("PLAYER_SIZE", (40, 80))
 PLAYER_COLOR = cfg_get("PLAYER_COLOR", (50, 160, 255))
 PLAYER_HIT_COLOR = cfg_get("PLAYER_HIT_COLOR", (255, 80, 80))
@@ -22,14 +29,55 @@ KICK_COOLDOWN = cfg_get("KICK_COOLDOWN", 350)
 KICK_DURATION = cfg_get("KICK_DURATION", 220)
 PUNCH_COOLDOWN = cfg_get("PUNCH_COOLDOWN",300)
 PUNCH_DURATION =cfg_get("PUNCH_DURATION",180)
+SLASH_SPARKS = 6
+# furthest a drawn weapon reaches from the hand (midnight blade + pommel / glow)
+WEAPON_REACH = 100
+# attack tilt is snapped to this many degrees so rotated poses can be cached
+POSE_TILT_STEP = cfg_get("POSE_TILT_STEP", 1)
+POSE_CACHE_SIZE = cfg_get("POSE_CACHE_SIZE", 64)
+GOKU_IMAGE = cfg_get("GOKU_IMAGE", "images/Goku.png")  # relative to the package
 
 # set laser damage to 10 as requested
 
 
+def _build_pose(height, facing_right, tilt):
+    img = ASSETS.scaled(GOKU_IMAGE, height=height)
+    if not facing_right:
+        img = pygame.transform.flip(img, True, False)
+    if tilt != 0:
+        img = pygame.transform.rotate(img, tilt)
+    return img
+
+
 # --- Player with better stickman animation & weapon support ---
-class Player(pygame.sprite.Sprite):
-    def __init__(self, pos):
+class Player(StateMixin, CompactSprite):
+    __slots__ = ("clock", "world", "input", "width", "height", "image", "rect", "vx", "vy", "on_ground",
+                 "facing_right", "sub_x", "sub_y", "max_hp", "hp", "attacking", "attack_type",
+                 "attack_duration", "attack_start", "last_attack_time", "last_skill_time",
+                 "last_weapon_time", "has_knife", "equipped_weapon", "attack_width_multiplier",
+                 "anim_state", "draw_rect", "goku_img")
+    # everything the simulation reads besides rect and the equipped weapon (restart
+    # keeps the attack width of the dropped weapon, so it is saved separately)
+    STATE_FIELDS = ("vx", "vy", "sub_x", "sub_y", "on_ground", "facing_right", "hp", "attacking",
+                    "attack_type", "attack_duration", "attack_start", "last_attack_time",
+                    "last_skill_time", "last_weapon_time", "has_knife", "attack_width_multiplier",
+                    "anim_state")
+    # moved by physics.Physics
+    MOVES_X = MOVES_Y = LANDS = True
+    GRAVITY_SCALE = 1.0
+    SWEPT = False
+    # shared by every Player: poses depend only on (height, facing_right, tilt),
+    # and the slash sparks are placed and drawn within one draw()
+    pose_cache = SpriteCache(_build_pose, max_entries=POSE_CACHE_SIZE)
+    slash_sparks = ParticleSystem(capacity=SLASH_SPARKS, fade=False)
+
+    def __init__(self, pos, clock=None, world=None, headless=False):
         super().__init__()
+        # gameplay timers read self.clock; world bounds default to the display surface
+        self.clock = clock if clock is not None else WALL_CLOCK
+        self.world = world
+        # callable returning an indexable key state; None reads the keyboard
+        self.input = None
         self.width, self.height = PLAYER_SIZE
         self.image = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
         self.rect = self.image.get_rect(midbottom=pos)
@@ -37,30 +85,30 @@ class Player(pygame.sprite.Sprite):
         self.vy = 0
         self.on_ground = True
         self.facing_right = True
+        # sub-pixel movement carried between simulation ticks
+        self.sub_x = 0.0
+        self.sub_y = 0.0
         self.max_hp = 1000
         self.hp = self.max_hp
         self.attacking = False
-        self.attack_type = None
+        self.attack_type = NO_ATTACK
         self.attack_duration = 0
         self.attack_start = 0
         self.last_attack_time = 0
         self.last_skill_time = -SKILL_COOLDOWN
+        self.last_weapon_time = 0
         self.has_knife = False
 
         # weapon system
         self.equipped_weapon = None
         self.attack_width_multiplier = 1.0
-        self.anim_state = "idle"
-        self.goku_img = pygame.image.load("Stickman fight/street-duel/src/images/Goku.png").convert_alpha()
-        self.goku_base = self.goku_img
-
-        # scale theo kích thước player
-        h = self.rect.height
-        scale_factor = h / self.goku_img.get_height()
-        w = int(self.goku_img.get_width() * scale_factor)
-        self.goku_img = pygame.transform.scale(self.goku_img, (w, h))
-
-
+        self.anim_state = IDLE
+        # screen area touched by the last draw(), used by the dirty-rect renderer
+        self.draw_rect = self.rect.copy()
+        self.goku_img = None
+        if not headless:
+            # scale theo kích thước player (loaded and scaled once, shared by every Player)
+            self.goku_img = ASSETS.scaled(GOKU_IMAGE, height=self.rect.height)
 
     def equip(self, weapon):
         self.equipped_weapon = weapon
@@ -74,19 +122,17 @@ class Player(pygame.sprite.Sprite):
             self.attack_width_multiplier = 1.0
 
     def can_use_skill(self):
-        return pygame.time.get_ticks() - self.last_skill_time >= SKILL_COOLDOWN
+        return self.clock.get_ticks() - self.last_skill_time >= SKILL_COOLDOWN
 
     def use_skill(self):
-        self.last_skill_time = pygame.time.get_ticks()
+        self.last_skill_time = self.clock.get_ticks()
 
-    def start_attack(self, kind):
-        now = pygame.time.get_ticks()
-        if kind == "punch":
-            dur = PUNCH_DURATION
-        elif kind == "kick":
+    def start_attack(self, kind, duration=None):
+        now = self.clock.get_ticks()
+        if duration is not None:
+            dur = duration
+        elif kind == KICK:
             dur = KICK_DURATION
-        elif kind == "midnight":
-            dur = getattr(self, "attack_duration", 300)
         else:
             dur = PUNCH_DURATION
         self.attacking = True
@@ -94,66 +140,62 @@ class Player(pygame.sprite.Sprite):
         self.attack_duration = dur
         self.attack_start = now
         self.last_attack_time = now
-        self.anim_state = "attack"
+        self.anim_state = ATTACK
+
+    def melee_cooldown(self):
+        """ms between V presses: the held melee weapon's cooldown, else PUNCH_COOLDOWN."""
+        weapon = self.equipped_weapon
+        if weapon is None or weapon.ranged:
+            return PUNCH_COOLDOWN
+        return weapon.cooldown
 
     def update(self, dt, game=None):
-        keys = pygame.key.get_pressed()
+        keys = self.input() if self.input is not None else pygame.key.get_pressed()
         self.vx = 0
         if keys[pygame.K_a]:
             self.vx = -4
             self.facing_right = False
             if self.on_ground:
-                self.anim_state = "run"
+                self.anim_state = RUN
         elif keys[pygame.K_d]:
             self.vx = 4
             self.facing_right = True
             if self.on_ground:
-                self.anim_state = "run"
+                self.anim_state = RUN
         else:
             if self.on_ground and not self.attacking:
-                self.anim_state = "idle"
+                self.anim_state = IDLE
 
         if keys[pygame.K_w] and self.on_ground:
             self.vy = -12
             self.on_ground = False
-            self.anim_state = "jump"
+            self.anim_state = JUMP
 
-        now = pygame.time.get_ticks()
+        now = self.clock.get_ticks()
 
-        # weapon fire / melee mapping: V triggers weapon or punch
-        if keys[pygame.K_v] and now - self.last_attack_time > PUNCH_COOLDOWN:
-            if self.equipped_weapon and getattr(self.equipped_weapon, "ranged", False):
-                used = self.equipped_weapon.on_use(self, game)
-                if used:
-                    self.anim_state = "attack"
-            else:
-                self.start_attack("punch")
+        # weapon fire / melee mapping: V uses the weapon (Gun shot, Midnight slash) or punches
+        if keys[pygame.K_v] and now - self.last_attack_time > self.melee_cooldown():
+            weapon = self.equipped_weapon
+            if weapon and weapon.on_use(self, game):
+                self.anim_state = ATTACK
+            elif not (weapon and weapon.ranged):
+                self.start_attack(PUNCH)
 
         if keys[pygame.K_x] and now - self.last_attack_time > KICK_COOLDOWN:
-            self.start_attack("kick")
+            self.start_attack(KICK)
 
         # finish attack by duration
         if self.attacking and now - self.attack_start > self.attack_duration:
             self.attacking = False
-            self.attack_type = None
-            if self.anim_state == "attack":
-                self.anim_state = "idle"
-
-        # physics
-        self.rect.x += int(self.vx)
-        self.vy += GRAVITY
-        self.rect.y += int(self.vy)
-        ground_y = pygame.display.get_surface().get_height() - GROUND_Y_OFFSET
-        if self.rect.bottom >= ground_y:
-            self.rect.bottom = ground_y
-            self.vy = 0
-            self.on_ground = True
+            self.attack_type = NO_ATTACK
+            if self.anim_state == ATTACK:
+                self.anim_state = IDLE
 
     def get_attack_rect(self):
         if not self.attacking:
             return None
-        w = int((24 if self.attack_type == "punch" else 40) * self.attack_width_multiplier)
-        if self.attack_type == "midnight":
+        w = int((24 if self.attack_type == PUNCH else 40) * self.attack_width_multiplier)
+        if self.attack_type == MIDNIGHT:
             w = int(80 * self.attack_width_multiplier)
             h = 36
         else:
@@ -166,118 +208,13 @@ class Player(pygame.sprite.Sprite):
         return pygame.Rect(ax, ay, w, h)
 
     def draw_weapon(self, surf, hand_pos):
-        # draw weapon shape near hand_pos depending on equipped_weapon
+        # pre-rendered weapon sprite held at hand_pos (see render/weapons.py)
         if not self.equipped_weapon:
             return
-        name = self.equipped_weapon.name
-        x, y = hand_pos
-        color = (200, 200, 200)
-
-        def _draw_midnight_blade(surf, hx, hy, facing_right=True, size=1.0, animated=True):
-            flip = 1 if facing_right else -1
-            s = float(size)
-            blade_len = int(78 * s)
-            blade_w = max(6, int(12 * s))
-            base_x = hx
-            tip_x = hx + flip * blade_len
-
-            # build tapered blade polygon (upper edge then lower)
-            segments = 8
-            upper = []
-            lower = []
-            for i in range(segments + 1):
-                t = i / segments
-                bx = int(hx + flip * (t * blade_len))
-                # gentle taper and slight concave profile
-                taper = int((1 - t) * (blade_w // 2))
-                curve = int(math.sin(t * math.pi) * 2 * s)
-                uy = int(hy - taper - curve - t * int(6 * s))
-                ly = int(hy + taper + curve + t * int(6 * s))
-                upper.append((bx, uy))
-                lower.append((bx, ly))
-            blade_poly = upper + lower[::-1]
-
-            # core
-            pygame.draw.polygon(surf, (60, 60, 70), blade_poly)
-            # bevel highlight along upper edge
-            if len(upper) >= 2:
-                pygame.draw.lines(surf, (200, 200, 220), False, upper, max(1, int(2 * s)))
-            # thin dark edge near lower side
-            if len(lower) >= 2:
-                pygame.draw.lines(surf, (30,30,36), False, lower, max(1, int(1 * s)))
-
-            # fuller (central groove)
-            fpts = []
-            for i in range(4):
-                tt = i / 3
-                fx = int(hx + flip * (tt * (blade_len - 12 * s)))
-                fy = int(hy + math.sin(tt * math.pi) * int(2 * s))
-                fpts.append((fx, fy))
-            pygame.draw.lines(surf, (30,30,40), False, fpts, max(1, int(2 * s)))
-            pygame.draw.lines(surf, (120,120,140), False, fpts, max(1, int(1 * s)))
-
-            # ornate guard (tsuba)
-            guard_w = int(14 * s)
-            guard_h = int(6 * s)
-            pygame.draw.ellipse(surf, (80,60,55), (hx - guard_w//2, hy - guard_h//2, guard_w, guard_h))
-            pygame.draw.ellipse(surf, (140,110,90), (hx - guard_w//4, hy - guard_h//4, guard_w//2, guard_h//2))
-
-            # handle
-            handle_len = int(20 * s)
-            handle_w = int(8 * s)
-            handle_rect = pygame.Rect(0,0, handle_w, handle_len)
-            handle_rect.center = (int(hx - flip * (handle_w//2 + 2)), int(hy + handle_len/2))
-            pygame.draw.rect(surf, (30,30,36), handle_rect)
-            pygame.draw.rect(surf, (90,60,40), handle_rect, max(1, int(1*s)))
-            # wrap texture
-            step = int(5 * s)
-            for off in range(-step*2, handle_len + step*2, step):
-                sx = handle_rect.left + (off if facing_right else (handle_rect.width - off))
-                pygame.draw.line(surf, (20,20,24), (sx, handle_rect.top + off), (sx + flip * step, handle_rect.bottom + off), max(1, int(1*s)))
-
-            # pommel
-            pom_x = int(handle_rect.centerx - flip * (handle_w//2 + 2))
-            pom_y = int(handle_rect.bottom + int(3 * s))
-            pygame.draw.circle(surf, (120,100,80), (pom_x, pom_y), max(3, int(3 * s)))
-            pygame.draw.circle(surf, (200,180,150), (pom_x, pom_y), max(1, int(1 * s)))
-
-            # subtle purple veins and tip glow
-            vein_col = (160, 60, 180)
-            vx1 = int(hx + flip * int(14 * s))
-            vx2 = int(tip_x - flip * int(18 * s))
-            pygame.draw.aaline(surf, vein_col, (vx1, hy - int(2*s)), (vx2, hy + int(2*s)))
-            if animated:
-                pulse = 0.5 + 0.5 * abs(math.sin(pygame.time.get_ticks() * 0.006))
-            else:
-                pulse = 0.6
-            glow_r = int(6 * s * pulse)
-            glow = pygame.Surface((glow_r*4, glow_r*2), pygame.SRCALPHA)
-            pygame.draw.ellipse(glow, (180,70,200,int(100 * pulse)), (0,0, glow.get_width(), glow.get_height()))
-            surf.blit(glow, (tip_x - glow.get_width()//2 + (-4 if facing_right else 4), hy - glow.get_height()//2), special_flags=pygame.BLEND_RGBA_ADD)
-
-        # existing weapon drawings
-        if name == "Gun":
-            # barrel and grip
-            barrel = pygame.Rect(0, 0, 34, 8)
-            barrel.center = (x + (18 if self.facing_right else -18), y)
-            grip = pygame.Rect(0, 0, 8, 12)
-            grip.center = (x + (6 if self.facing_right else -6), y + 8)
-            pygame.draw.rect(surf, (30,30,30), barrel)
-            pygame.draw.rect(surf, (60,60,60), grip)
-            pygame.draw.rect(surf, (200,200,40), barrel.inflate(-10,-2), 0)
-        elif name == "Katana":
-            # long thin blade
-            blade_len = 60
-            bx = x + (blade_len//2 if self.facing_right else -blade_len//2)
-            pygame.draw.line(surf, (220,220,255), (x, y), (bx, y-6), 4)
-            pygame.draw.rect(surf, (80,40,20), (x - 6, y - 4, 12, 8))
-        elif name == "Flail":
-            # chain + ball
-            bx = x + (22 if self.facing_right else -22)
-            pygame.draw.line(surf, (120,120,120), (x, y), (bx, y+6), 3)
-            pygame.draw.circle(surf, (40,40,40), (int(bx), int(y+8)), 10)
-        elif name == "Midnight Blade":
-            _draw_midnight_blade(surf, x + (8 if self.facing_right else -8), y, self.facing_right, size=1.0, animated=True)
+        baked = WEAPON_SPRITES.get(self.equipped_weapon.name, self.facing_right)
+        if baked is not None:
+            baked.draw(surf, hand_pos)
+
     def draw(self, surf):
         # ------------------------------------------------------
         # Basic info
@@ -287,7 +224,7 @@ class Player(pygame.sprite.Sprite):
         top = self.rect.top
         bottom = self.rect.bottom
 
-        now = pygame.time.get_ticks()
+        now = self.clock.get_ticks()
         atk_prog = 0.0
         if self.attacking:
             atk_prog = min(1.0, (now - self.attack_start) / max(1, self.attack_duration))
@@ -296,27 +233,14 @@ class Player(pygame.sprite.Sprite):
         # 1. DRAW GOKU SPRITE
         # ------------------------------------------------------
 
-        # scale image to player hitbox height
-        # (chỉ scale 1 lần trong __init__, nhưng an toàn thêm guard)
-        scale_h = self.rect.height
-        if self.goku_img.get_height() != scale_h:
-            scale_factor = scale_h / self.goku_base.get_height()
-            scale_w = int(self.goku_base.get_width() * scale_factor)
-            self.goku_img = pygame.transform.scale(self.goku_base, (scale_w, scale_h))
-
-        # hướng xoay theo facing_right
-        if self.facing_right:
-            img = self.goku_img
-        else:
-            img = pygame.transform.flip(self.goku_img, True, False)
-
         # tilt khi attack cho cảm giác xoay người
         tilt = 0
         if self.attacking:
             tilt = int(6 * atk_prog) if self.facing_right else int(-6 * atk_prog)
+        tilt = int(round(tilt / POSE_TILT_STEP)) * POSE_TILT_STEP
 
-        if tilt != 0:
-            img = pygame.transform.rotate(img, tilt)
+        # scaled / flipped / rotated pose comes from the cache (no per-frame transforms)
+        img = self.pose_cache.get(self.rect.height, self.facing_right, tilt)
 
         # blit center theo hitbox
         img_rect = img.get_rect(center=(x, y))
@@ -339,17 +263,18 @@ class Player(pygame.sprite.Sprite):
 
         # Vẽ weapon
         self.draw_weapon(surf, hand_pos)
+        self.draw_rect = img_rect.copy()
+        if self.equipped_weapon:
+            self.draw_rect.union_ip(pygame.Rect(hand_pos[0] - WEAPON_REACH, hand_pos[1] - WEAPON_REACH // 2,
+                                                WEAPON_REACH * 2, WEAPON_REACH))
 
         # ------------------------------------------------------
         # 3. MIDNIGHT SLASH EFFECT (GIỮ NGUYÊN CODE CỦA BẠN)
         # ------------------------------------------------------
-        if self.attack_type == "midnight" and atk_prog > 0:
+        if self.attack_type == MIDNIGHT and atk_prog > 0:
 
-            tmp = pygame.Surface(surf.get_size(), pygame.SRCALPHA)
             shoulder = hand_pos  # slash xuất phát từ tay
 
-            import math
-
             angle_center = 0.0 if self.facing_right else math.pi
             sweep_half = math.radians(60)
             start_angle = angle_center - sweep_half - math.radians(10)
@@ -376,6 +301,15 @@ class Player(pygame.sprite.Sprite):
 
             poly = [shoulder] + outer_pts + inner_pts[::-1]
 
+            # a scratch target covering just the slash (its arc, streaks and sparks stay
+            # within radius + 6 of the shoulder), drawn in its own coordinates
+            extent = pygame.Rect(shoulder[0] - radius - 6, shoulder[1] - radius - 6,
+                                 radius * 2 + 12, radius * 2 + 12)
+            ox, oy = extent.topleft
+            tmp = SCRATCH.get(extent.size)
+            poly = [(px - ox, py - oy) for px, py in poly]
+            outer_pts = [(px - ox, py - oy) for px, py in outer_pts]
+
             pygame.draw.polygon(tmp, (160, 60, 200, int(80 * (1 - atk_prog * 0.2))), poly)
             pygame.draw.polygon(tmp, (220, 140, 255, int(120 * atk_prog)), poly)
 
@@ -384,15 +318,17 @@ class Player(pygame.sprite.Sprite):
                 alpha = int(200 * (1 - i / len(outer_pts)))
                 pygame.draw.circle(tmp, (255, 220, 255, alpha), p, max(3, int(4 * (1 - i / len(outer_pts)))))
 
-            # sparks
-            sparks = 6
-            for sidx in range(sparks):
-                t = (sidx / sparks + atk_prog * 0.8) % 1.0
-                ang = start_angle + (current_angle - start_angle) * t
-                sx = int(shoulder[0] + math.cos(ang) * (radius * (0.9 - 0.3 * t)))
-                sy = int(shoulder[1] + math.sin(ang) * (radius * (0.9 - 0.3 * t)))
-                rad = max(1, int(2 + 2 * (1 - t)))
-                col = (255, int(220 * (1 - t)), int(180 * (1 - t)), 220)
-                pygame.draw.circle(tmp, col, (sx, sy), rad)
-
-            surf.blit(tmp, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
+            # sparks (one vectorized pass, drawn as a stamp batch)
+            t = (np.arange(SLASH_SPARKS) / SLASH_SPARKS + atk_prog * 0.8) % 1.0
+            ang = start_angle + (current_angle - start_angle) * t
+            reach = radius * (0.9 - 0.3 * t)
+            sx = np.trunc(shoulder[0] + np.cos(ang) * reach) - ox
+            sy = np.trunc(shoulder[1] + np.sin(ang) * reach) - oy
+            rad = np.maximum(1, np.trunc(2 + 2 * (1 - t)))
+            col = np.stack([np.full(SLASH_SPARKS, 255.0), 220 * (1 - t), 180 * (1 - t),
+                            np.full(SLASH_SPARKS, 220.0)], axis=1)
+            self.slash_sparks.place(sx, sy, rad, col.astype(np.uint8))
+            self.slash_sparks.draw(tmp)
+
+            surf.blit(tmp, extent, special_flags=pygame.BLEND_RGBA_ADD)
+            self.draw_rect.union_ip(extent)
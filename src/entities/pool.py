@@ -0,0 +1,87 @@
+from .sprite import CompactSprite
+
+
+class PooledSprite(CompactSprite):
+    """Sprite that returns itself to its pool when killed.
+
+    Subclasses put their per-spawn initialisation in ``reset``; ``__init__`` only
+    runs when the pool grows.
+    """
+
+    __slots__ = ("pool",)
+
+    def __init__(self, *groups):
+        super().__init__(*groups)
+        self.pool = None
+
+    def reset(self, *args, **kwargs):
+        pass
+
+    def kill(self):
+        was_alive = self.alive()
+        super().kill()
+        if was_alive and self.pool is not None:
+            self.pool.release(self)
+
+
+class SpritePool:
+    """Pre-allocated free list of PooledSprite instances.
+
+    ``spawn`` re-initialises a free instance and adds it to the pool's groups;
+    killing the sprite (directly, via ``despawn`` or ``spritecollide(dokill=True)``)
+    puts it back. The pool grows when exhausted and records its high-water mark.
+    """
+
+    def __init__(self, factory, groups=(), size=0, name=None):
+        self.factory = factory
+        self.groups = tuple(groups)
+        self.name = name or getattr(factory, "__name__", "pool")
+        self._free = []
+        self._live = set()
+        self.created = 0
+        self.spawned = 0
+        self.high_water = 0
+        self.reserve(size)
+
+    def __len__(self):
+        return len(self._live)
+
+    @property
+    def free(self):
+        return len(self._free)
+
+    def reserve(self, size):
+        while len(self._free) + len(self._live) < size:
+            self._free.append(self._create())
+
+    def _create(self):
+        obj = self.factory()
+        obj.pool = self
+        self.created += 1
+        return obj
+
+    def spawn(self, *args, **kwargs):
+        obj = self._free.pop() if self._free else self._create()
+        obj.reset(*args, **kwargs)
+        obj.add(*self.groups)
+        self._live.add(obj)
+        self.spawned += 1
+        if len(self._live) > self.high_water:
+            self.high_water = len(self._live)
+        return obj
+
+    def despawn(self, obj):
+        obj.kill()
+
+    def despawn_all(self):
+        for obj in list(self._live):
+            obj.kill()
+
+    def release(self, obj):
+        if obj in self._live:
+            self._live.discard(obj)
+            self._free.append(obj)
+
+    def stats(self):
+        return {"live": len(self._live), "free": len(self._free), "created": self.created,
+                "spawned": self.spawned, "high_water": self.high_water}
@@ -0,0 +1,63 @@
+import pygame
+
+
+class CompactSprite(pygame.sprite.Sprite):
+    """pygame Sprite keeping its attributes in slots and its groups in a tuple.
+
+    Subclasses declare their attributes in ``__slots__``. pygame's Sprite has
+    no ``__slots__`` itself, so instances still carry a ``__dict__`` pointer
+    (and a stray attribute assignment still works); the dict is only created
+    when something lands in it, and with every attribute slotted nothing does.
+    Group membership is a tuple in a slot rather than Sprite's per-instance
+    set (a dict in older pygame): a sprite sits in one or two groups, and an
+    empty set alone is 216 bytes. It is still a pygame.sprite.Sprite, so
+    Groups take it as usual: they only call add_internal / remove_internal on
+    it (LayeredUpdates also sets ``_layer``, which lands in the ``__dict__``).
+    tests/test_sprite.py pins this against Group, RenderUpdates and
+    LayeredUpdates.
+    """
+
+    __slots__ = ("_groups",)
+
+    def __init__(self, *groups):
+        self._groups = ()
+        if groups:
+            self.add(*groups)
+
+    def add(self, *groups):
+        for group in groups:
+            if hasattr(group, "_spritegroup"):
+                if group not in self._groups:
+                    group.add_internal(self)
+                    self.add_internal(group)
+            else:
+                self.add(*group)
+
+    def remove(self, *groups):
+        for group in groups:
+            if hasattr(group, "_spritegroup"):
+                if group in self._groups:
+                    group.remove_internal(self)
+                    self.remove_internal(group)
+            else:
+                self.remove(*group)
+
+    def add_internal(self, group):
+        self._groups += (group,)
+
+    def remove_internal(self, group):
+        self._groups = tuple(g for g in self._groups if g is not group)
+
+    def kill(self):
+        for group in self._groups:
+            group.remove_internal(self)
+        self._groups = ()
+
+    def groups(self):
+        return list(self._groups)
+
+    def alive(self):
+        return bool(self._groups)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} Sprite(in {len(self._groups)} groups)>"
@@ -0,0 +1,26 @@
+# attack and animation states are small ints; the names are for display and wire formats
+NO_ATTACK, PUNCH, KICK, MIDNIGHT = 0, 1, 2, 3
+ATTACK_NAMES = (None, "punch", "kick", "midnight")
+IDLE, RUN, JUMP, ATTACK = 0, 1, 2, 3
+ANIM_NAMES = ("idle", "run", "jump", "attack")
+
+
+class StateMixin:
+    """Plain-value save / load of a sprite's simulation state.
+
+    ``STATE_FIELDS`` names the attributes that, together with ``rect``, fully
+    determine how the sprite simulates; ``get_state`` returns them as a list of
+    ints / floats / strings / bools (JSON-safe), ``set_state`` puts them back.
+    Images, caches and other derived data are not part of the state.
+    """
+
+    __slots__ = ()
+    STATE_FIELDS = ()
+
+    def get_state(self):
+        return [tuple(self.rect)] + [getattr(self, name) for name in self.STATE_FIELDS]
+
+    def set_state(self, state):
+        self.rect.update(state[0])
+        for name, value in zip(self.STATE_FIELDS, state[1:]):
+            setattr(self, name, value)
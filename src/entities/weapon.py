@@ -1,4 +1,6 @@
 class Weapon:
+    # weapons carry no per-instance state
+    __slots__ = ()
     name = "Fist"
     price = 0
     melee_bonus = 0
@@ -3,11 +3,33 @@ import random
 import time
 import sys
 import math
+import hashlib
+from functools import partial
 from entities.player import Player 
 from entities.flail import Flail
 from entities.katana import Katana
 from entities.midnightblade import MidnightBlade
 from entities.weapon import Weapon
+from entities.pool import PooledSprite, SpritePool
+from entities.sprite import CompactSprite
+from entities.state import StateMixin, NO_ATTACK, PUNCH, KICK
+from entities.horde import Horde
+import snapshot
+from render.background import BackgroundLayers
+from render.smoke import SmokeRenderer, SMOKE_LAYERS
+from render.embers import Embers
+from render.particles import ParticleSystem
+from render.sprite_cache import SpriteCache
+from render.text import TEXT_CACHE, TextWidget
+from render.scratch import SCRATCH
+from render.poses import ENEMY_POSES
+from render.dirty import DirtyRects
+from spatial import SpatialHash
+from physics import Physics
+from assets import ASSETS
+from timestep import FixedStep, SimClock, WALL_CLOCK
+from input.controls import (NO_KEYS, KEYSTATES, KEY_COMMANDS, keys_to_mask, CMD_UNEQUIP, CMD_GUN,
+                            CMD_KATANA, CMD_FLAIL, CMD_MIDNIGHT, CMD_SKILL, CMD_RESTART)
 # safe import of project settings (use defaults if a name is missing)
 try:
     import settings
@@ -26,6 +48,7 @@ PLAYER_COLOR = cfg_get("PLAYER_COLOR", (50, 160, 255))
 PLAYER_HIT_COLOR = cfg_get("PLAYER_HIT_COLOR", (255, 80, 80))
 ENEMY_SIZE = cfg_get("ENEMY_SIZE", (40, 80))
 ENEMY_COLOR = cfg_get("ENEMY_COLOR", (200, 60, 60))
+ENEMY_ATTACK_COLOR = cfg_get("ENEMY_ATTACK_COLOR", (255, 140, 140))
 GROUND_Y_OFFSET = cfg_get("GROUND_Y_OFFSET", 40)
 GRAVITY = cfg_get("GRAVITY", 0.6)
 
@@ -41,16 +64,52 @@ LASER_SPEED = cfg_get("LASER_SPEED", 12)
 LASER_COLOR = cfg_get("LASER_COLOR", (255, 60, 200))
 LASER_SIZE = cfg_get("LASER_SIZE", (20, 6))
 
+# lasers sharing size, colour and damage tier share one pre-rendered image
+LASER_TIER_STEP = cfg_get("LASER_TIER_STEP", 10)
+LASER_SPRITE_CACHE = cfg_get("LASER_SPRITE_CACHE", 32)
+
 MEDKIT_SIZE = cfg_get("MEDKIT_SIZE", (24, 14))
 MEDKIT_COLOR = cfg_get("MEDKIT_COLOR", (180, 255, 180))
 MEDKIT_FALL_MULTIPLIER = cfg_get("MEDKIT_FALL_MULTIPLIER", 0.5)
 MEDKIT_HEAL = cfg_get("MEDKIT_HEAL", 80)
 
+# instances pre-allocated per pool; pools grow past this and report their high-water mark
+LASER_POOL_SIZE = cfg_get("LASER_POOL_SIZE", 32)
+MEDKIT_POOL_SIZE = cfg_get("MEDKIT_POOL_SIZE", 4)
+
 HEALTH_BG = cfg_get("HEALTH_BG", (60, 60, 60))
 HEALTH_FG = cfg_get("HEALTH_FG", (80, 220, 100))
 
+HIT_SPARK_CAPACITY = cfg_get("HIT_SPARK_CAPACITY", 4096)
+# second word of the hit sparks' seed, keeping their stream apart from the gameplay one
+SPARK_STREAM = 0x5BA2C
+
+# "full" flips the whole screen each frame, "dirty" pushes only changed rects (F2 toggles)
+RENDER_MODE = cfg_get("RENDER_MODE", "full")
+# in dirty mode, push the animated background bands only every Nth frame
+# (cheaper on fill-rate bound machines, at the cost of a choppier background)
+BACKGROUND_BAND_INTERVAL = cfg_get("BACKGROUND_BAND_INTERVAL", 1)
+
+# fixed-rate simulation: ticks per second and the most ticks run to catch up in one frame
+SIM_HZ = cfg_get("SIM_HZ", 120)
+MAX_CATCHUP_TICKS = cfg_get("MAX_CATCHUP_TICKS", 8)
+
+# wave mode: grunts in the first wave, extra grunts per wave and the most alive at once
+WAVE_START = cfg_get("WAVE_START", 24)
+WAVE_GROWTH = cfg_get("WAVE_GROWTH", 24)
+HORDE_CAPACITY = cfg_get("HORDE_CAPACITY", 512)
+WAVE_SPACING = cfg_get("WAVE_SPACING", 18)  # px between grunts entering from one side
+
+# grid square (px) of the collision broadphase; about the size of a fighter's reach
+COLLISION_CELL = cfg_get("COLLISION_CELL", 64)
+# longest physics sub-step (ms): lower tick rates integrate in several steps of at most this
+PHYSICS_MAX_STEP_MS = cfg_get("PHYSICS_MAX_STEP_MS", 1000.0 / 120)
+# bodies from which a physics step switches from a Python loop to NumPy arrays
+PHYSICS_VECTOR_MIN = cfg_get("PHYSICS_VECTOR_MIN", 32)
+
 
 class Gun(Weapon):
+    __slots__ = ()
     name = "Gun"
     price = 100
     melee_bonus = 0
@@ -58,120 +117,195 @@ class Gun(Weapon):
     ranged = True
     def on_use(self, shooter, game):
         """Shoots from the shooter (player or enemy)."""
-        now = pygame.time.get_ticks()
-        if now - getattr(shooter, "last_weapon_time", 0) < self.cooldown:
+        now = game.clock.get_ticks()
+        if now - shooter.last_weapon_time < self.cooldown:
             return False
         dir = 1 if getattr(shooter, "facing_right", True) else -1
         # fire two quick lasers with slight vertical offset; use LASER_DAMAGE (10)
         for i in (-6, 6):
             pos = (shooter.rect.centerx + (shooter.width//2 + 6) * dir, shooter.rect.centery + i)
-            l = Laser(pos, dir, damage=LASER_DAMAGE)
-            game.projectiles.add(l)
-            game.all_sprites.add(l)
+            game.laser_pool.spawn(pos, dir, damage=LASER_DAMAGE)
         shooter.last_weapon_time = now
         return True
 
 
+# equipped weapons are saved by name (weapons themselves are stateless)
+WEAPON_TYPES = {cls.name: cls for cls in (Gun, Katana, Flail, MidnightBlade)}
+
+
+def weapon_name(weapon):
+    return weapon.name if weapon is not None else None
+
+
+def weapon_from_name(name):
+    return WEAPON_TYPES[name]() if name is not None else None
+
+
 # --- Projectile / Entities ---
-class Laser(pygame.sprite.Sprite):
-    def __init__(self, pos, direction, damage=LASER_DAMAGE):
+def laser_tier(damage):
+    return max(1, int(damage) // LASER_TIER_STEP)
+
+
+def _build_laser_image(size, color, tier):
+    w, h = size
+    w = max(w, 18)
+    h = max(h, 4)
+    # create a glow / beam image; higher damage tiers get a wider halo
+    surf = pygame.Surface((w*3 + (tier - 1) * 8, h*6 + (tier - 1) * 4), pygame.SRCALPHA)
+    center = (surf.get_width() // 2, surf.get_height() // 2)
+    base_color = color
+    # layered glow (fixed center-y typo)
+    for i, alpha in enumerate((40, 90, 160, 230), start=4):
+        radius_x = int((w/2 + i*3 + (tier - 1) * 3))
+        radius_y = int((h/2 + i*1.6 + (tier - 1) * 1.5))
+        col = (*base_color[:3], max(6, alpha//i))
+        pygame.draw.ellipse(surf, col, (center[0]-radius_x, center[1]-radius_y, radius_x*2, radius_y*2))
+    # bright core
+    core_rect = pygame.Rect(0,0,w, h)
+    core_rect.center = center
+    pygame.draw.rect(surf, base_color, core_rect)
+    # thin white edge
+    pygame.draw.rect(surf, (255,255,255), core_rect.inflate(-2,-1), 1)
+    return surf
+
+
+# keyed by (size, rgb, damage tier); the beam is symmetric so direction is not part of the key
+LASER_SPRITES = SpriteCache(_build_laser_image, max_entries=LASER_SPRITE_CACHE)
+
+
+class Laser(StateMixin, PooledSprite):
+    __slots__ = ("clock", "world", "rect", "swept", "image", "damage", "vx", "sub_x", "life", "spawn_time")
+    STATE_FIELDS = ("vx", "sub_x", "life", "spawn_time", "damage")
+    # moved by physics.Physics; swept covers the last step, which is what collisions test
+    MOVES_X, MOVES_Y, LANDS, SWEPT = True, False, False, True
+    GRAVITY_SCALE = 0.0
+
+    def __init__(self, pos=(0, 0), direction=1, damage=LASER_DAMAGE, clock=None, world=None):
         super().__init__()
-        w, h = LASER_SIZE
-        w = max(w, 18)
-        h = max(h, 4)
-        # create a glow / beam image
-        surf = pygame.Surface((w*3, h*6), pygame.SRCALPHA)
-        center = (surf.get_width() // 2, surf.get_height() // 2)
-        base_color = LASER_COLOR
-        # layered glow (fixed center-y typo)
-        for i, alpha in enumerate((40, 90, 160, 230), start=4):
-            radius_x = int((w/2 + i*3))
-            radius_y = int((h/2 + i*1.6))
-            col = (*base_color[:3], max(6, alpha//i))
-            pygame.draw.ellipse(surf, col, (center[0]-radius_x, center[1]-radius_y, radius_x*2, radius_y*2))
-        # bright core
-        core_rect = pygame.Rect(0,0,w, h)
-        core_rect.center = center
-        pygame.draw.rect(surf, base_color, core_rect)
-        # thin white edge
-        pygame.draw.rect(surf, (255,255,255), core_rect.inflate(-2,-1), 1)
-
-        self.image = surf
-        # place rect so center aligns with pos
-        self.rect = self.image.get_rect(center=pos)
+        self.clock = clock if clock is not None else WALL_CLOCK
+        self.world = world
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.swept = pygame.Rect(0, 0, 0, 0)
+        self.reset(pos, direction, damage)
+
+    def reset(self, pos, direction, damage=LASER_DAMAGE):
+        self.damage = damage
+        self.refresh_image()
+        # place rect so center aligns with pos (rect is reused across spawns)
+        self.rect.size = self.image.get_size()
+        self.rect.center = pos
+        self.swept.update(self.rect)
         self.vx = LASER_SPEED * direction
+        self.sub_x = 0.0
         self.life = 1200  # ms
-        self.spawn_time = pygame.time.get_ticks()
-        self.damage = damage
+        self.spawn_time = self.clock.get_ticks()
+
+    def refresh_image(self):
+        self.image = LASER_SPRITES.get(tuple(LASER_SIZE), tuple(LASER_COLOR[:3]), laser_tier(self.damage))
+
+    def set_state(self, state):
+        super().set_state(state)
+        self.refresh_image()
 
     def update(self, dt):
-        self.rect.x += int(self.vx)
-        if pygame.time.get_ticks() - self.spawn_time > self.life:
+        if self.clock.get_ticks() - self.spawn_time > self.life:
             self.kill()
-        sw = pygame.display.get_surface().get_width()
+        sw = (self.world or pygame.display.get_surface().get_rect()).width
         if self.rect.right < 0 or self.rect.left > sw:
             self.kill()
 
 
 # --- Enemy stickman remains procedural as before ---
-class Enemy(pygame.sprite.Sprite):
-    def __init__(self, pos):
+class Enemy(StateMixin, CompactSprite):
+    __slots__ = ("clock", "rng", "world", "width", "height", "image", "rect", "vx", "vy", "sub_x", "sub_y",
+                 "on_ground", "facing_right", "max_hp", "hp", "attacking", "attack_type", "last_action_time",
+                 "next_action_delay", "attack_end_timer", "equipped_weapon")
+    STATE_FIELDS = ("vx", "vy", "sub_x", "sub_y", "on_ground", "facing_right", "hp", "attacking",
+                    "attack_type", "last_action_time", "next_action_delay", "attack_end_timer")
+    # moved by physics.Physics
+    MOVES_X = MOVES_Y = LANDS = True
+    GRAVITY_SCALE = 1.0
+    SWEPT = False
+
+    def __init__(self, pos, clock=None, world=None, rng=None):
         super().__init__()
+        self.clock = clock if clock is not None else WALL_CLOCK
+        self.rng = rng if rng is not None else random
+        self.world = world
         self.width, self.height = ENEMY_SIZE
         self.image = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
         self.rect = self.image.get_rect(midbottom=pos)
         self.vx = 0
         self.vy = 0
+        self.sub_x = 0.0
+        self.sub_y = 0.0
         self.on_ground = True
         self.facing_right = False
         self.max_hp = 1000
         self.hp = self.max_hp
         self.attacking = False
-        self.attack_type = None
-        self.last_action_time = pygame.time.get_ticks()
-        self.next_action_delay = random.randint(600, 1400)
+        self.attack_type = NO_ATTACK
+        self.last_action_time = self.clock.get_ticks()
+        self.next_action_delay = self.rng.randint(600, 1400)
         self.attack_end_timer = None
         # enemy may randomly equip a weapon visually (not functional)
-        self.equipped_weapon = random.choice([None, Katana(), Flail(), None, None])
-
-    def update(self, dt, player_rect=None):
-        now = pygame.time.get_ticks()
-        if player_rect:
+        self.equipped_weapon = self.rng.choice([None, Katana(), Flail(), None, None])
+
+    def update(self, dt, player_rect=None, keys=None):
+        """keys (a KeyState) hands control to a second player instead of the AI."""
+        now = self.clock.get_ticks()
+        if keys is not None:
+            self._steer(keys, now)
+        elif player_rect:
             if abs(self.rect.centerx - player_rect.centerx) > 60:
                 self.vx = 2 if player_rect.centerx > self.rect.centerx else -2
                 self.facing_right = self.vx > 0
             else:
                 self.vx = 0
 
-        self.rect.x += self.vx
-        self.vy += GRAVITY
-        self.rect.y += int(self.vy)
-        ground_y = pygame.display.get_surface().get_height() - GROUND_Y_OFFSET
-        if self.rect.bottom >= ground_y:
-            self.rect.bottom = ground_y
-            self.vy = 0
-            self.on_ground = True
-
-        if now - self.last_action_time > self.next_action_delay:
+        if keys is None and now - self.last_action_time > self.next_action_delay:
             self.last_action_time = now
-            self.next_action_delay = random.randint(700, 1600)
-            if random.random() < 0.6:
-                self.attacking = True
-                self.attack_type = random.choice(["punch", "kick"])
-                self.attack_end_timer = now + 220
+            self.next_action_delay = self.rng.randint(700, 1600)
+            if self.rng.random() < 0.6:
+                self.start_attack(self.rng.choice([PUNCH, KICK]), now)
 
         if self.attack_end_timer and now > self.attack_end_timer:
             self.finish_attack()
             self.attack_end_timer = None
 
+    def _steer(self, keys, now):
+        # the Player's bindings and speed: A/D move, W jumps, V punches, X kicks
+        self.vx = 0
+        if keys[pygame.K_a]:
+            self.vx = -4
+            self.facing_right = False
+        elif keys[pygame.K_d]:
+            self.vx = 4
+            self.facing_right = True
+        if keys[pygame.K_w] and self.on_ground:
+            self.vy = -12
+            self.on_ground = False
+        if not self.attacking:
+            if keys[pygame.K_v] and now - self.last_action_time > PUNCH_COOLDOWN:
+                self.last_action_time = now
+                self.start_attack(PUNCH, now)
+            elif keys[pygame.K_x] and now - self.last_action_time > KICK_COOLDOWN:
+                self.last_action_time = now
+                self.start_attack(KICK, now)
+
+    def start_attack(self, kind, now):
+        self.attacking = True
+        self.attack_type = kind
+        self.attack_end_timer = now + 220
+
     def finish_attack(self):
         self.attacking = False
-        self.attack_type = None
+        self.attack_type = NO_ATTACK
 
     def get_attack_rect(self):
         if not self.attacking:
             return None
-        w = 24 if self.attack_type == "punch" else 40
+        w = 24 if self.attack_type == PUNCH else 40
         h = 20
         if self.facing_right:
             ax = self.rect.right
@@ -180,95 +314,184 @@ class Enemy(pygame.sprite.Sprite):
         ay = self.rect.centery - h // 2
         return pygame.Rect(ax, ay, w, h)
 
+    def draw_bounds(self):
+        # arms reach 30px and weapons ~60px past the body centre
+        return self.rect.inflate(128, 24)
+
     def draw(self, surf):
-        x = self.rect.centerx
-        top = self.rect.top
-        bottom = self.rect.bottom
-        body_color = ENEMY_COLOR if not self.attacking else (255, 140, 140)
-        head_r = int(self.width * 0.18)
-        head_center = (x, top + head_r + 2)
-        neck_y = head_center[1] + head_r
-        hip_y = bottom - int(self.height * 0.2)
-        pygame.draw.circle(surf, body_color, head_center, head_r, 0)
-        pygame.draw.line(surf, body_color, (x, neck_y), (x, hip_y), 4)
-        # arms
-        if self.attacking:
-            if self.facing_right:
-                pygame.draw.line(surf, body_color, (x, neck_y), (x + 30, neck_y + 10), 4)
-            else:
-                pygame.draw.line(surf, body_color, (x, neck_y), (x - 30, neck_y + 10), 4)
-        else:
-            pygame.draw.line(surf, body_color, (x, neck_y), (x - 12, neck_y + 18), 4)
-            pygame.draw.line(surf, body_color, (x, neck_y), (x + 12, neck_y + 18), 4)
-        # draw enemy weapon if present
-        if self.equipped_weapon:
-            # simple katana/flail visuals
-            hand = (x + (18 if self.facing_right else -18), neck_y + 10)
-            name = self.equipped_weapon.name
-            if name == "Katana":
-                bx = hand[0] + (34 if self.facing_right else -34)
-                pygame.draw.line(surf, (220,220,255), hand, (bx, hand[1]-6), 4)
-            elif name == "Flail":
-                bx = hand[0] + (22 if self.facing_right else -22)
-                pygame.draw.line(surf, (120,120,120), hand, (bx, hand[1]+6), 3)
-                pygame.draw.circle(surf, (40,40,40), (int(bx), int(hand[1]+8)), 8)
-        # legs
-        pygame.draw.line(surf, body_color, (x, hip_y), (x - 10, bottom), 4)
-        pygame.draw.line(surf, body_color, (x, hip_y), (x + 10, bottom), 4)
-
-class MedKit(pygame.sprite.Sprite):
-    def __init__(self, x, top_y=-10):
+        # one blit from the pose atlas (render.poses), rebuilt if ENEMY_SIZE / ENEMY_COLOR change
+        weapon = self.equipped_weapon.name if self.equipped_weapon else None
+        pose = ENEMY_POSES.get((self.width, self.height), ENEMY_COLOR, ENEMY_ATTACK_COLOR,
+                               self.facing_right, self.attacking, weapon)
+        pose.draw(surf, self.rect.topleft)
+
+class MedKit(StateMixin, PooledSprite):
+    __slots__ = ("world", "image", "rect", "vy", "sub_y")
+    STATE_FIELDS = ("vy", "sub_y")
+    # moved by physics.Physics
+    MOVES_X, MOVES_Y, LANDS, SWEPT = False, True, False, False
+    GRAVITY_SCALE = MEDKIT_FALL_MULTIPLIER
+
+    def __init__(self, x=0, top_y=-10, world=None):
         super().__init__()
+        self.world = world
         self.image = pygame.Surface(MEDKIT_SIZE)
         self.image.fill(MEDKIT_COLOR)
-        self.rect = self.image.get_rect(midtop=(x, top_y))
+        self.rect = self.image.get_rect()
+        self.reset(x, top_y)
+
+    def reset(self, x, top_y=-10):
+        self.rect.midtop = (x, top_y)
         self.vy = 0
+        self.sub_y = 0.0
 
     def update(self, dt):
-        self.vy += GRAVITY * MEDKIT_FALL_MULTIPLIER
-        self.rect.y += int(self.vy)
-        screen_h = pygame.display.get_surface().get_height()
+        screen_h = (self.world or pygame.display.get_surface().get_rect()).height
         if self.rect.top > screen_h:
             self.kill()
 
 # --- Game manager simplified: no shop, number-bar equips weapons ---
 class Game:
-    def __init__(self, screen):
+    def __init__(self, screen, world_size=None, seed=None, waves=False):
+        """screen=None runs headless: world_size (w, h) is required, nothing is drawn
+        or loaded, and the player reads no keyboard (set input_source to drive it).
+        waves=True adds wave mode: ever larger waves of grunts (entities.horde)
+        join the enemy.
+
+        All gameplay randomness comes from ``self.rng`` seeded with ``seed``; with
+        a ``recorder`` (replay.InputRecorder) set, every tick's input is recorded."""
         self.screen = screen
-        self.screen_rect = screen.get_rect()
+        self.headless = screen is None
+        # world bounds; entities share this rect, so it is updated in place on resize
+        self.screen_rect = pygame.Rect((0, 0), world_size) if world_size else screen.get_rect()
         self.bg_color = SCREEN_BG
+        # simulation time, advanced by tick() (gameplay timers never read the wall clock)
+        self.clock = SimClock()
+        self.seed = seed if seed is not None else random.randrange(1 << 31)
+        self.rng = snapshot.TrackedRandom(self.seed)
+        self.recorder = None
+        self.replay = None
+        # per-tick player input: input_source() (None reads the keyboard) is sampled
+        # once per tick into self._keys, which is what the player sees
+        self.input_source = (lambda: NO_KEYS) if screen is None else None
+        self._keys = NO_KEYS
+        # a second player (netplay) drives the Enemy through enemy_source; None is the AI
+        self.enemy_source = None
+        self._enemy_keys = None
+        self._queued = []
         self.all_sprites = pygame.sprite.Group()  # pickups & projectiles included here
         ground_y = self.screen_rect.height - GROUND_Y_OFFSET
-        self.player = Player((100, ground_y))
-        self.enemy = Enemy((self.screen_rect.width - 100, ground_y))
+        self.player = Player((100, ground_y), clock=self.clock, world=self.screen_rect, headless=self.headless)
+        self.player.input = lambda: self._keys
+        self.enemy = Enemy((self.screen_rect.width - 100, ground_y), clock=self.clock, world=self.screen_rect,
+                           rng=self.rng)
         self.all_sprites.add(self.enemy)  # enemy remains in sprites for collisions if needed
-        self.font = pygame.font.SysFont(None, 24)
+        self.horde = Horde(HORDE_CAPACITY, seed=self.seed) if waves else None
+        self.wave = 0
+        if not self.headless:
+            # the default font straight from pygame / the bundle (SysFont scans system fonts first)
+            self.font = ASSETS.font(None, 24)
+            # HUD labels re-render only when their value changes
+            self._coin_label = TextWidget(self.font, (255, 215, 0), "Coins: {}")
+            self._weapon_label = TextWidget(self.font, (255, 255, 255), "Weapon: {}  (1:Gun 2:Katana 3:Flail 4:Midnight 0:None)")
+            self._skill_label = TextWidget(self.font, (255, 255, 255), "Skill (SPACE): Laser - {}")
+            self._hp_labels = (TextWidget(self.font, (255, 255, 255), "{}/{}"),
+                               TextWidget(self.font, (255, 255, 255), "{}/{}"))
+            self._wave_label = TextWidget(self.font, (255, 180, 120), "Wave {} - {} left")
 
         self.items = pygame.sprite.Group()
-        self.last_medkit_time = pygame.time.get_ticks()
-        self.next_medkit_delay = random.randint(5000, 12000)
+        self.last_medkit_time = self.clock.get_ticks()
+        self.next_medkit_delay = self.rng.randint(5000, 12000)
 
         self.projectiles = pygame.sprite.Group()
 
+        # recycled projectiles / pickups; killing one returns it to its pool
+        self.laser_pool = SpritePool(partial(Laser, clock=self.clock, world=self.screen_rect),
+                                     (self.projectiles, self.all_sprites), LASER_POOL_SIZE, name="Laser")
+        self.medkit_pool = SpritePool(partial(MedKit, world=self.screen_rect),
+                                      (self.items, self.all_sprites), MEDKIT_POOL_SIZE, name="MedKit")
+        # every body moves in one physics step per tick
+        self.physics = Physics(self.screen_rect, GRAVITY, GROUND_Y_OFFSET, PHYSICS_MAX_STEP_MS, PHYSICS_VECTOR_MIN)
+        self.physics.add(self.player)
+        self.physics.add(self.enemy)
+        self.physics.add_group(self.items)
+        self.physics.add_group(self.projectiles)
+        if self.horde is not None:
+            self.physics.add_batch(self.horde)
+        # collision broadphase, refilled every tick after movement; lasers file their swept rect
+        self.laser_grid = SpatialHash(COLLISION_CELL, rect_attr="swept")
+        self.item_grid = SpatialHash(COLLISION_CELL)
+        self.target_grid = SpatialHash(COLLISION_CELL)
+
         self.coins = 0
+        # match statistics (balance sweeps, soak tests)
+        self.kills = 0
+        self.damage_dealt = 0
+        self.damage_taken = 0
         self.state = "running"  # only running or gameover
 
         # animated fire background params
         self.fire_height = 160
-        self._fire_seed = random.randint(0, 9999)
+        self._fire_seed = self.rng.randint(0, 9999)
+        # static background layers, baked once per screen size / seed
+        self._bg_layers = BackgroundLayers()
+        self.dirty = DirtyRects(self.screen_rect, RENDER_MODE)
+        self.timestep = FixedStep(SIM_HZ, MAX_CATCHUP_TICKS)
+        self.sim_ticks = 0
+        self._prev_pos = {}
+        self._drawn_state = None
+        self._smoke = SmokeRenderer()
+        self._embers = Embers()
+        # impact effects (laser and melee hits), simulated in pixels / second; off when
+        # headless and while netplay resimulates ticks it already showed. Their generator is
+        # seeded from the match seed, not drawn from self.rng, so sparks never shift gameplay
+        self.sparks = ParticleSystem(capacity=HIT_SPARK_CAPACITY, gravity=900.0, drag=2.0,
+                                     seed=(self.seed, SPARK_STREAM))
+        self.effects = not self.headless
 
     def spawn_medkit(self):
-        x = random.randint(40, self.screen_rect.width - 40)
-        med = MedKit(x)
-        self.items.add(med)
-        self.all_sprites.add(med)
+        x = self.rng.randint(40, self.screen_rect.width - 40)
+        return self.medkit_pool.spawn(x)
 
-    def spawn_laser(self, direction, damage=LASER_DAMAGE):
+    def spawn_wave(self):
+        """Send in the next wave of grunts, half from each side of the screen."""
+        self.wave += 1
+        n = WAVE_START + WAVE_GROWTH * (self.wave - 1)
+        w = self.screen_rect.width
+        xs = [-20 - (i // 2) * WAVE_SPACING if i % 2 == 0 else w + 20 + (i // 2) * WAVE_SPACING
+              for i in range(n)]
+        return self.horde.spawn(xs, self.screen_rect.height - GROUND_Y_OFFSET, self.clock.get_ticks())
+
+    def spawn_laser(self, direction, damage=None):
+        # read LASER_DAMAGE at call time so balance overrides apply
+        if damage is None:
+            damage = LASER_DAMAGE
         pos = (self.player.rect.centerx + (self.player.width//2 + 6) * (1 if direction>0 else -1),
                self.player.rect.centery)
-        l = Laser(pos, direction, damage=damage)
-        self.projectiles.add(l)
-        self.all_sprites.add(l)
+        return self.laser_pool.spawn(pos, direction, damage=damage)
+
+    def use_skill(self):
+        """Fire the laser skill if it is off cooldown (SPACE, or an AI pilot)."""
+        if not self.player.can_use_skill():
+            return False
+        dir = 1 if self.player.facing_right else -1
+        self.spawn_laser(dir)
+        self.player.use_skill()
+        return True
+
+    def _hurt_enemy(self, dmg, enemy=None):
+        enemy = enemy or self.enemy
+        dealt = min(enemy.hp, dmg)
+        enemy.hp -= dealt
+        self.damage_dealt += dealt
+
+    def _hurt_player(self, dmg):
+        taken = min(self.player.hp, dmg)
+        self.player.hp -= taken
+        self.damage_taken += taken
+
+    def pool_stats(self):
+        return {pool.name: pool.stats() for pool in (self.laser_pool, self.medkit_pool)}
 
     def restart(self):
         ground_y = self.screen_rect.height - GROUND_Y_OFFSET
@@ -278,93 +501,350 @@ class Game:
         self.player.equipped_weapon = None
         self.enemy.rect.midbottom = (self.screen_rect.width - 100, ground_y)
         self.enemy.hp = self.enemy.max_hp
+        self.laser_pool.despawn_all()
+        self.medkit_pool.despawn_all()
+        # pools hold references to these groups, so empty them in place
         self.items.empty()
         self.projectiles.empty()
-        self.all_sprites = pygame.sprite.Group(self.enemy)
+        self.all_sprites.empty()
+        self.all_sprites.add(self.enemy)
+        if self.horde is not None:
+            self.horde.clear()
+            self.wave = 0
+        self.sparks.clear()
+        self._bg_layers.invalidate()
+        self.dirty.invalidate()
+        self.timestep.reset()
+        self._prev_pos = {}
         self.state = "running"
 
     def update(self, dt, events):
         # handle inputs: numbers 1-4 equip weapons instantly while running
         for ev in events:
-            if ev.type == pygame.KEYDOWN:
-                if self.state == "gameover":
-                    if ev.key == pygame.K_r:
-                        self.restart()
-                else:
-                    # choose weapons with number bar:
-                    if ev.key == pygame.K_1:
-                        self.player.equip(Gun())
-                    elif ev.key == pygame.K_2:
-                        self.player.equip(Katana())
-                    elif ev.key == pygame.K_3:
-                        self.player.equip(Flail())
-                    elif ev.key == pygame.K_4:
-                        self.player.equip(MidnightBlade())
-                    elif ev.key == pygame.K_0:
-                        self.player.equip(None)
-                    elif ev.key == pygame.K_SPACE and self.player.can_use_skill():
-                        dir = 1 if self.player.facing_right else -1
-                        self.spawn_laser(dir)
-                        self.player.use_skill()
+            if ev.type == pygame.VIDEORESIZE and not self.headless:
+                self.screen_rect.size = self.screen.get_size()
+                self._bg_layers.invalidate()
+                self.dirty.resize(self.screen_rect)
+            elif ev.type == pygame.KEYDOWN and ev.key == pygame.K_F2:
+                self.dirty.toggle()
+            elif ev.type == pygame.KEYDOWN and ev.key in KEY_COMMANDS:
+                self.command(KEY_COMMANDS[ev.key])
 
         if self.state != "running":
+            self.timestep.reset()
+            return
+
+        # fixed-rate ticks; rendering interpolates with timestep.alpha
+        for _ in range(self.timestep.advance(dt)):
+            self._record_previous()
+            self.tick(self.timestep.tick_ms)
+            if self.state != "running":
+                break
+
+    def set_tick_rate(self, hz):
+        """Switch the fixed step to hz ticks per second (servers shed load this way).
+
+        Timers, movement and per-60 Hz-frame damage all scale with the tick
+        length, so a match plays the same in real time, only more coarsely.
+        """
+        if hz != self.timestep.hz:
+            self.timestep = FixedStep(hz, MAX_CATCHUP_TICKS)
+
+    def run_ticks(self, n):
+        """Simulate n fixed ticks back to back (headless soak tests, replays)."""
+        for _ in range(n):
+            if self.state != "running":
+                break
+            self.tick(self.timestep.tick_ms)
+
+    def command(self, code):
+        """Submit a discrete command (input.controls.CMD_*).
+
+        While running, commands are queued and applied at the start of the next
+        tick; otherwise (game over) they apply immediately. Either way the
+        recorder sees them at the point they take effect, so replays match.
+        """
+        if self.replay is not None:
             return
+        if self.state == "running":
+            self._queued.append(code)
+        else:
+            if self.recorder is not None:
+                self.recorder.command(code, pre=True)
+            self.apply_command(code)
 
+    def apply_command(self, code):
+        if self.state == "gameover":
+            # only restart is accepted on the game-over screen
+            if code == CMD_RESTART:
+                self.restart()
+        # choose weapons with number bar:
+        elif code == CMD_GUN:
+            self.player.equip(Gun())
+        elif code == CMD_KATANA:
+            self.player.equip(Katana())
+        elif code == CMD_FLAIL:
+            self.player.equip(Flail())
+        elif code == CMD_MIDNIGHT:
+            self.player.equip(MidnightBlade())
+        elif code == CMD_UNEQUIP:
+            self.player.equip(None)
+        elif code == CMD_SKILL:
+            self.use_skill()
+
+    def _sample_input(self):
+        if self.replay is not None:
+            for code in self.replay.tick_commands(self.sim_ticks):
+                self.apply_command(code)
+            mask = self.replay.mask(self.sim_ticks)
+        else:
+            if self._queued:
+                queued, self._queued = self._queued, []
+                for code in queued:
+                    if self.recorder is not None:
+                        self.recorder.command(code)
+                    self.apply_command(code)
+            source = self.input_source
+            mask = keys_to_mask(source() if source is not None else pygame.key.get_pressed())
+        if self.recorder is not None:
+            self.recorder.tick(mask)
+        self._keys = KEYSTATES[mask]
+        enemy_source = self.enemy_source
+        self._enemy_keys = enemy_source() if enemy_source is not None else None
+
+    def get_state(self):
+        """Full simulation state as plain JSON-safe values (replay keyframes).
+
+        Taken between ticks; ``set_state`` on a Game of the same settings makes it
+        continue exactly as this one would. Render-only state is not included.
+        """
+        return {
+            "tick": self.sim_ticks,
+            "clock": self.clock.ms,
+            "world": list(self.screen_rect.size),
+            "state": self.state,
+            "coins": self.coins,
+            "kills": self.kills,
+            "damage_dealt": self.damage_dealt,
+            "damage_taken": self.damage_taken,
+            "last_medkit_time": self.last_medkit_time,
+            "next_medkit_delay": self.next_medkit_delay,
+            "fire_seed": self._fire_seed,
+            "rng": self.rng.getstate(),
+            "player": self.player.get_state(),
+            "player_weapon": weapon_name(self.player.equipped_weapon),
+            "enemy": self.enemy.get_state(),
+            "enemy_weapon": weapon_name(self.enemy.equipped_weapon),
+            # group order is collision order, so it is kept
+            "lasers": [laser.get_state() for laser in self.projectiles],
+            "medkits": [kit.get_state() for kit in self.items],
+            "wave": self.wave,
+            "horde": self.horde.get_state() if self.horde is not None else None,
+        }
+
+    def set_state(self, state):
+        self.sim_ticks = state["tick"]
+        self.clock.ms = state["clock"]
+        self.screen_rect.size = state["world"]
+        self.state = state["state"]
+        self.coins = state["coins"]
+        self.kills = state["kills"]
+        self.damage_dealt = state["damage_dealt"]
+        self.damage_taken = state["damage_taken"]
+        self.last_medkit_time = state["last_medkit_time"]
+        self.next_medkit_delay = state["next_medkit_delay"]
+        self._fire_seed = state["fire_seed"]
+        version, internal, gauss = state["rng"]
+        self.rng.setstate((version, tuple(internal), gauss))
+        # equip first: it resets attack_width_multiplier, which the saved state overrides
+        self.player.equip(weapon_from_name(state["player_weapon"]))
+        self.player.set_state(state["player"])
+        self.enemy.equipped_weapon = weapon_from_name(state["enemy_weapon"])
+        self.enemy.set_state(state["enemy"])
+        self.laser_pool.despawn_all()
+        self.medkit_pool.despawn_all()
+        for s in state["lasers"]:
+            self.laser_pool.spawn((0, 0), 1).set_state(s)
+        for s in state["medkits"]:
+            self.medkit_pool.spawn(0).set_state(s)
+        # keyframes carry the mode: a wave-mode state turns wave mode on
+        self.wave = state.get("wave", 0)
+        if state.get("horde") is None:
+            if self.horde is not None:
+                self.physics.remove_batch(self.horde)
+            self.horde = None
+        else:
+            if self.horde is None:
+                self.horde = Horde(HORDE_CAPACITY, seed=self.seed)
+                self.physics.add_batch(self.horde)
+            self.horde.set_state(state["horde"])
+        self._queued = []
+        self.sparks.clear()
+        self._bg_layers.invalidate()
+        self.dirty.invalidate()
+        self.timestep.reset()
+        self._prev_pos = {}
+
+    def snapshot(self, snap=None):
+        """Pack the simulation state into ``snap`` (a snapshot.Snapshot, reused) or a new one."""
+        if snap is None:
+            snap = snapshot.Snapshot(LASER_POOL_SIZE, MEDKIT_POOL_SIZE)
+        return snapshot.pack(self, snap)
+
+    def restore(self, snap):
+        """Return the simulation to a snapshot taken from this Game."""
+        snapshot.unpack(self, snap, weapon_from_name)
+
+    def digest(self):
+        """Hash of the simulation state, for checking replays and determinism."""
+        p, e = self.player, self.enemy
+        state = (self.sim_ticks, self.clock.get_ticks(), self.state, self.coins, self.kills,
+                 self.damage_dealt, self.damage_taken, tuple(p.rect), float(p.vy), p.hp, p.attack_type,
+                 p.attack_start, tuple(e.rect), float(e.vy), e.hp, e.attack_type, e.last_action_time,
+                 tuple(tuple(s.rect) for s in self.projectiles), tuple(tuple(s.rect) for s in self.items),
+                 self.rng.getstate())
+        if self.horde is not None:
+            state += (self.wave, self.horde.tobytes())
+        return int.from_bytes(hashlib.blake2b(repr(state).encode(), digest_size=8).digest(), "little")
+
+    def tick(self, dt):
+        """Advance the simulation by one fixed step of dt milliseconds."""
+        self.sim_ticks += 1
+        self.clock.advance(dt)
+        self._sample_input()
+        # melee / contact damage is tuned per 60 Hz frame; apply it at that cadence
+        frames = self.timestep.base_frames(self.sim_ticks)
+
+        now = self.clock.get_ticks()
+        horde = self.horde
+        # controls and AI set velocities, then everything moves in one physics step
         self.player.update(dt, game=self)
-        self.enemy.update(dt, player_rect=self.player.rect)
+        self.enemy.update(dt, player_rect=self.player.rect, keys=self._enemy_keys)
+        if horde is not None:
+            horde.update(now, self.player.rect.centerx)
+        self.physics.step(dt)
         self.items.update(dt)
         self.projectiles.update(dt)
+        self.sparks.update(dt / 1000.0)
 
-        now = pygame.time.get_ticks()
         if now - self.last_medkit_time > self.next_medkit_delay:
             self.last_medkit_time = now
-            self.next_medkit_delay = random.randint(8000, 15000)
+            self.next_medkit_delay = self.rng.randint(8000, 15000)
             self.spawn_medkit()
 
+        self.laser_grid.rebuild(self.projectiles.sprites())
+        self.item_grid.rebuild(self.items.sprites())
+        targets = (self.enemy,)
+        self.target_grid.rebuild(targets)
+
         # player melee collision
         pr = self.player.get_attack_rect()
-        if pr and pr.colliderect(self.enemy.rect) and pygame.time.get_ticks() - self.player.last_attack_time < 300:
-            base = 10 if self.player.attack_type == "punch" else 12
+        if frames and pr and now - self.player.last_attack_time < 300:
+            base = 10 if self.player.attack_type == PUNCH else 12
             if self.player.equipped_weapon:
                 dmg = self.player.equipped_weapon.melee_damage(base)
             elif self.player.has_knife:
                 dmg = base * 2
             else:
                 dmg = base
-            self.enemy.hp = max(0, self.enemy.hp - dmg)
-            self.coins += 10
-            if self.player.facing_right:
-                self.enemy.rect.x += 10
-            else:
-                self.enemy.rect.x -= 10
-
-        # enemy attack hurts player
+            for enemy in self.target_grid.query(pr):
+                self._hurt_enemy(dmg * frames, enemy)
+                self.coins += 10 * frames
+                hit_x = enemy.rect.left if self.player.facing_right else enemy.rect.right
+                self._spark_burst(6, hit_x, pr.centery, speed=(80.0, 260.0), life=(0.15, 0.35),
+                                  size=(1.0, 2.5), color=(255, 210, 120, 230))
+                if self.player.facing_right:
+                    enemy.rect.x += 10 * frames
+                else:
+                    enemy.rect.x -= 10 * frames
+            if horde is not None:
+                hit = horde.overlapping(pr)
+                if hit.size:
+                    self.damage_dealt += horde.hurt(hit, dmg * frames)
+                    self.coins += 10 * frames * hit.size
+                    horde.x[hit] += (10 if self.player.facing_right else -10) * frames
+                    self._spark_burst(6, pr.centerx, pr.centery, speed=(80.0, 260.0), life=(0.15, 0.35),
+                                      size=(1.0, 2.5), color=(255, 210, 120, 230))
+
+        # enemy attack hurts player (one target, so no broadphase)
         er = self.enemy.get_attack_rect()
-        if er and er.colliderect(self.player.rect) and self.enemy.attack_end_timer and pygame.time.get_ticks() - (self.enemy.attack_end_timer - 220) < 80:
-            self.player.hp = max(0, self.player.hp - (10 if self.enemy.attack_type == "kick" else 6))
-
-        # projectiles vs enemy
-        for laser in list(self.projectiles):
-            if laser.rect.colliderect(self.enemy.rect):
-                self.enemy.hp = max(0, self.enemy.hp - laser.damage)
+        if frames and er and er.colliderect(self.player.rect) and self.enemy.attack_end_timer and now - (self.enemy.attack_end_timer - 220) < 80:
+            self._hurt_player((10 if self.enemy.attack_type == KICK else 6) * frames)
+        if frames and horde is not None:
+            dmg = horde.strike_damage(self.player.rect, now)
+            if dmg:
+                self._hurt_player(dmg * frames)
+
+        # projectiles vs enemies; a laser is spent on the first enemy it hits
+        for enemy in targets:
+            for laser in self.laser_grid.query(enemy.rect):
+                if not laser.alive():
+                    continue
+                self._hurt_enemy(laser.damage, enemy)
+                self._spark_burst(14, laser.rect.centerx, laser.rect.centery, speed=(120.0, 360.0),
+                                  life=(0.2, 0.5), size=(1.0, 3.0), color=(*LASER_COLOR[:3], 240))
                 laser.kill()
                 self.coins += 20
+        if horde is not None and horde.count and self.projectiles:
+            # hits only depend on positions, so every laser is tested against every grunt at once
+            lasers = self.projectiles.sprites()
+            firsts = horde.first_hits([laser.swept for laser in lasers], [laser.vx for laser in lasers])
+            for laser, first in zip(lasers, firsts.tolist()):
+                if first >= 0:
+                    self.damage_dealt += horde.hurt([first], laser.damage)
+                    self._spark_burst(14, laser.rect.centerx, laser.rect.centery, speed=(120.0, 360.0),
+                                      life=(0.2, 0.5), size=(1.0, 3.0), color=(*LASER_COLOR[:3], 240))
+                    laser.kill()
+                    self.coins += 20
 
         # pickups
-        picked = pygame.sprite.spritecollide(self.player, self.items, dokill=True)
-        if picked:
-            for _ in picked:
-                self.player.hp = min(self.player.max_hp, self.player.hp + MEDKIT_HEAL)
+        for medkit in self.item_grid.query(self.player.rect):
+            medkit.kill()
+            self.player.hp = min(self.player.max_hp, self.player.hp + MEDKIT_HEAL)
 
         if self.player.hp <= 0:
             self.state = "gameover"
 
         if self.enemy.hp <= 0:
+            self.kills += 1
             self.coins += 50
             self.enemy.hp = self.enemy.max_hp
             ground_y = self.screen_rect.height - GROUND_Y_OFFSET
             self.enemy.rect.midbottom = (self.screen_rect.width - 100, ground_y)
 
+        if horde is not None:
+            dead = horde.remove_dead()
+            self.kills += dead
+            self.coins += 50 * dead
+            if not horde.count and self.state == "running":
+                self.spawn_wave()
+
+        if self.recorder is not None:
+            self.recorder.end_tick(self)
+
+    def _spark_burst(self, n, x, y, **kwargs):
+        # purely visual (own random stream), so skipping it never changes the simulation
+        if self.effects:
+            self.sparks.burst(n, x, y, **kwargs)
+
+    def _record_previous(self):
+        self._prev_pos = {spr: spr.rect.topleft for spr in (self.player, self.enemy, *self.all_sprites)}
+
+    def _interpolate(self):
+        """Move rects to their interpolated render positions; returns what to restore."""
+        alpha = self.timestep.alpha
+        saved = []
+        for spr, (px, py) in self._prev_pos.items():
+            if not (spr is self.player or spr.alive()):
+                continue
+            x, y = spr.rect.topleft
+            # skip teleports (respawn, restart) so they do not smear across the screen
+            if abs(x - px) > 64 or abs(y - py) > 64:
+                continue
+            saved.append((spr, (x, y)))
+            spr.rect.topleft = (round(px + (x - px) * alpha), round(py + (y - py) * alpha))
+        return saved
+
     def _draw_fire_background(self):
         """Draw a war-themed animated background: smoky sky, distant explosions, ruins silhouette and embers."""
         w = self.screen_rect.width
@@ -372,86 +852,51 @@ class Game:
         t = pygame.time.get_ticks() * 0.0015
         base_y = h
 
-        # 1) dark gradient sky (reddish/orange near horizon -> dark smoky above)
-        sky = pygame.Surface((w, h), pygame.SRCALPHA)
-        for y in range(h):
-            # blend from deep orange near horizon to near-black
-            p = y / h
-            r = int(20 + (220 - 20) * (1 - p) * 0.8)
-            g = int(12 + (80 - 12) * (1 - p) * 0.6)
-            b = int(18 + (40 - 18) * (1 - p) * 0.3)
-            a = int(200 * (1 - p))
-            sky.fill((r, g, b, a), rect=pygame.Rect(0, y, w, 1))
-        self.screen.blit(sky, (0, 0))
+        layers = self._bg_layers.ensure(w, h, self._fire_seed)
+
+        # 1) dark gradient sky (pre-baked)
+        self.screen.blit(layers.sky, (0, 0))
 
         # 2) distant explosions / glows (pulsing orange spots)
         for i, posx in enumerate(range(80, w, 220)):
             phase = (t * (0.6 + (i % 3) * 0.15) + (i * 0.7) + (self._fire_seed % 37)) % (2 * math.pi)
             intensity = 0.5 + 0.5 * math.sin(phase)
             glow_r = int(60 + 40 * intensity)
-            glow_surf = pygame.Surface((glow_r * 2, glow_r * 2), pygame.SRCALPHA)
+            glow_surf = SCRATCH.get((glow_r * 2, glow_r * 2))
             gx = posx + (math.sin(t * 0.8 + i) * 60)
             gy = int(h * 0.72 - abs(math.cos(t * 0.6 + i)) * 30)
             color = (255, int(120 + 80 * intensity), 30, int(80 + 140 * intensity))
             pygame.draw.ellipse(glow_surf, color, (0, 0, glow_r * 2, glow_r * 2))
             self.screen.blit(glow_surf, (gx - glow_r, gy - glow_r), special_flags=0)
+            SCRATCH.release(glow_surf)
 
-        # 3) ruined city silhouette (solid dark shapes with slight flicker)
-        silhouette = pygame.Surface((w, int(h * 0.45)), pygame.SRCALPHA)
-        sil_h = silhouette.get_height()
-        # build skyline with rectangles of varying height
-        x = 0
-        rng = int(self._fire_seed % 97)
-        while x < w:
-            bw = 30 + ((x + rng) % 90)
-            bh = int(sil_h * (0.35 + ((x * 13 + rng) % 60) / 100))
-            color_dark = (18, 18, 20, 255)
-            rect = pygame.Rect(x, sil_h - bh, bw, bh)
-            pygame.draw.rect(silhouette, color_dark, rect)
-            # occasional broken tower tops
-            if ((x + rng) % 130) < 20:
-                pygame.draw.rect(silhouette, (34, 20, 20, 255), (x + bw//4, sil_h - bh - 6, bw//2, 6))
-            x += bw + 6
+        # 3) ruined city silhouette (pre-baked, slight flicker)
         # slight horizontal jitter to simulate heat/smoke distortion
         jitter_x = int(math.sin(t * 0.9 + self._fire_seed) * 2)
-        self.screen.blit(silhouette, (jitter_x, int(h * 0.45)), special_flags=0)
-
-        # 4) layered smoke plumes (soft semi-transparent clouds rising)
-        smoke_layers = 3
-        for layer in range(smoke_layers):
-            layer_surf = pygame.Surface((w, int(h * 0.35)), pygame.SRCALPHA)
-            base_y_off = int(h * 0.35 * layer * 0.25)
-            for i in range(12):
-                px = int(((i * 97 + self._fire_seed * 3) % (w + 200)) - 100 + math.sin(t * (0.3 + layer * 0.15) + i) * 80)
-                py = int(base_y_off + (i % 5) * 18 + math.cos(t * 0.4 + i * 0.6 + layer) * 12)
-                rad = int(40 + 30 * layer + (i % 4) * 6)
-                col = (40, 40, 48, max(12, 60 - layer * 8))
-                pygame.draw.ellipse(layer_surf, col, (px % w, py, rad, int(rad * 0.7)))
-            # blur effect by drawing offset copies
-            for ox, oy, a in ((0, 0, 140), (6, -4, 40), (-6, 3, 30)):
-                tmp = layer_surf.copy()
-                tmp.fill((255, 255, 255, a), special_flags=pygame.BLEND_RGBA_MULT)
-                self.screen.blit(tmp, (ox, int(h * 0.36) - base_y_off//2 + oy), special_flags=0)
-
-        # 5) embers rising (small bright particles)
-        ember_count = 42
-        for i in range(ember_count):
-            phase = (i * 0.37 + t * (0.8 + (i % 5) * 0.05) + (self._fire_seed % 13)) 
-            ex = int((w * ((i * 23 + 17) % 97)) / 100 + math.sin(phase) * 90) % w
-            ey = int(h * 0.8 - ( (math.fmod(phase * 10, 300)) ) * 0.6)
-            size = max(1, int(2 + (math.sin(phase * 3 + i) + 1) * 2))
-            ember_col = (255, 200 - (i % 6) * 20, 60, 220)
-            pygame.draw.circle(self.screen, ember_col, (ex, ey), size)
-
-        # 6) ground glow / scorched earth strip
-        glow_h = int(h * 0.12)
-        ground_glow = pygame.Surface((w, glow_h), pygame.SRCALPHA)
-        for y in range(glow_h):
-            a = int(190 * (1 - (y / glow_h)) )
-            ground_glow.fill((100 + int(120 * (1 - y/glow_h)), 40, 15, a), rect=pygame.Rect(0, y, w, 1))
-        self.screen.blit(ground_glow, (0, h - glow_h))
+        self.screen.blit(layers.silhouette, (jitter_x, int(h * 0.45)), special_flags=0)
+
+        # 4) layered smoke plumes (pre-blurred sprites, see render/smoke.py)
+        self._smoke.draw(self.screen, w, h, t, self._fire_seed)
+
+        # 5) embers rising (stamp batch, see render/embers.py)
+        self._embers.draw(self.screen, w, h, t, self._fire_seed)
+
+        # 6) ground glow / scorched earth strip (pre-baked)
+        self.screen.blit(layers.ground_glow, (0, h - layers.ground_glow.get_height()))
 
     def draw(self):
+        if self.headless:
+            return
+        saved = self._interpolate() if self.state == "running" else ()
+        try:
+            self._draw_frame()
+        finally:
+            SCRATCH.end_frame()
+            for spr, pos in saved:
+                spr.rect.topleft = pos
+
+    def _draw_frame(self):
+        TEXT_CACHE.begin_frame()
         # draw animated fire background first
         try:
             self._draw_fire_background()
@@ -467,7 +912,10 @@ class Game:
 
         # draw enemy and player procedurally
         self.enemy.draw(self.screen)
+        if self.horde is not None:
+            self.horde.draw(self.screen)
         self.player.draw(self.screen)
+        self.sparks.draw(self.screen)
 
         # debug: draw attack rects
         ar = self.player.get_attack_rect()
@@ -478,30 +926,73 @@ class Game:
             pygame.draw.rect(self.screen, (255, 200, 50), er, 2)
 
         # HUD: coins, weapon, skill cd
-        self._draw_health_bar(self.player.hp, self.player.max_hp, 20, 20, 300, 20)
-        self._draw_health_bar(self.enemy.hp, self.enemy.max_hp, self.screen_rect.width - 320, 20, 300, 20)
-        coin_txt = self.font.render(f"Coins: {self.coins}", True, (255, 215, 0))
-        self.screen.blit(coin_txt, (20, 50))
+        self._draw_health_bar(self.player.hp, self.player.max_hp, 20, 20, 300, 20, self._hp_labels[0])
+        self._draw_health_bar(self.enemy.hp, self.enemy.max_hp, self.screen_rect.width - 320, 20, 300, 20, self._hp_labels[1])
+        self.screen.blit(self._coin_label.render(self.coins), (20, 50))
 
         weapon_text = self.player.equipped_weapon.name if self.player.equipped_weapon else ("Knife" if self.player.has_knife else "Fist")
-        self.screen.blit(self.font.render(f"Weapon: {weapon_text}  (1:Gun 2:Katana 3:Flail 4:Midnight 0:None)", True, (255,255,255)), (20, 80))
-        cd = max(0, SKILL_COOLDOWN - (pygame.time.get_ticks() - self.player.last_skill_time))
+        self.screen.blit(self._weapon_label.render(weapon_text), (20, 80))
+        cd = max(0, SKILL_COOLDOWN - (self.clock.get_ticks() - self.player.last_skill_time))
         cd_s = f"{cd//1000}.{(cd%1000)//100}s" if cd>0 else "Ready"
-        self.screen.blit(self.font.render(f"Skill (SPACE): Laser - {cd_s}", True, (255,255,255)), (20, 100))
+        self.screen.blit(self._skill_label.render(cd_s), (20, 100))
+        if self.horde is not None:
+            self.screen.blit(self._wave_label.render((self.wave, self.horde.count)), (20, 120))
 
         if self.state == "gameover":
             self._draw_overlay("GAME OVER - Press R to Restart")
 
-    def _draw_health_bar(self, hp, max_hp, x, y, w, h):
+        if self.dirty.mode == "dirty":
+            self._mark_dirty(ar, er)
+
+    def _background_bands(self, w, h):
+        """Screen bands touched by the animated parts of the fire background."""
+        glow_top = int(h * 0.72) - 30 - 100
+        smoke_top = int(h * 0.36) - int(h * 0.35 * (SMOKE_LAYERS - 1) * 0.25) // 2
+        embers_top = int(h * 0.8) - 186
+        top = max(0, min(glow_top, smoke_top, embers_top))
+        bottom = max(int(h * 0.72) + 100, int(h * 0.45) + int(h * 0.45), int(h * 0.8) + 8)
+        return [pygame.Rect(0, top, w, bottom - top)]
+
+    def _mark_dirty(self, ar, er):
+        dirty = self.dirty
+        if self.state != self._drawn_state:
+            # overlays cover the whole screen
+            self._drawn_state = self.state
+            dirty.invalidate()
+        if dirty.frames % max(1, BACKGROUND_BAND_INTERVAL) == 0:
+            dirty.add_all(self._background_bands(self.screen_rect.width, self.screen_rect.height))
+        dirty.add(self.player.draw_rect)
+        dirty.add(self.enemy.draw_bounds())
+        dirty.add_all(spr.rect for spr in self.all_sprites)
+        dirty.add(self.sparks.bounds())
+        if self.horde is not None:
+            dirty.add(self.horde.bounds())
+            if self._wave_label.changed:
+                dirty.add(self._wave_label.surface.get_rect(topleft=(20, 120)))
+        for rect in (ar, er):
+            if rect:
+                dirty.add(rect)
+        # HUD labels only when their text changed (last frame's rect is re-pushed by DirtyRects)
+        for label, pos in ((self._coin_label, (20, 50)), (self._weapon_label, (20, 80)), (self._skill_label, (20, 100))):
+            if label.changed:
+                dirty.add(label.surface.get_rect(topleft=pos))
+        for label, x in zip(self._hp_labels, (20, self.screen_rect.width - 320)):
+            if label.changed:
+                dirty.add((x, 20, 300, 20))
+
+    def _draw_health_bar(self, hp, max_hp, x, y, w, h, label=None):
         pygame.draw.rect(self.screen, HEALTH_BG, (x, y, w, h))
         pct = max(0, hp) / max_hp
         pygame.draw.rect(self.screen, HEALTH_FG, (x, y, int(w * pct), h))
-        txt = self.font.render(f"{hp}/{max_hp}", True, (255,255,255))
+        if label is not None:
+            txt = label.render((hp, max_hp))
+        else:
+            txt = TEXT_CACHE.render(self.font, f"{hp}/{max_hp}", (255,255,255))
         self.screen.blit(txt, (x + w//2 - txt.get_width()//2, y + h//2 - txt.get_height()//2))
 
     def _draw_overlay(self, text):
-        s = pygame.Surface((self.screen_rect.width, self.screen_rect.height), pygame.SRCALPHA)
+        s = SCRATCH.get(self.screen_rect.size, clear=False)
         s.fill((0,0,0,180))
         self.screen.blit(s, (0,0))
-        txt = self.font.render(text, True, (255,255,255))
+        txt = TEXT_CACHE.render(self.font, text, (255,255,255))
         self.screen.blit(txt, (self.screen_rect.width//2 - txt.get_width()//2, self.screen_rect.height//2 - 10))
\ No newline at end of file
@@ -1,3 +1,45 @@
+import pygame
+
+
+class KeyState:
+    """Indexable key snapshot, a stand-in for pygame.key.get_pressed() in scripted play."""
+
+    def __init__(self, pressed=()):
+        self.pressed = frozenset(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+
+NO_KEYS = KeyState()
+
+# keys the simulation reads each tick, in bit order of the recorded input mask
+TRACKED_KEYS = (pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_v, pygame.K_x)
+# one shared KeyState per mask, so per-tick input costs no allocation
+KEYSTATES = tuple(KeyState(k for bit, k in enumerate(TRACKED_KEYS) if mask >> bit & 1)
+                  for mask in range(1 << len(TRACKED_KEYS)))
+
+# discrete commands (KEYDOWN events) the game accepts; recorded alongside the mask
+CMD_UNEQUIP, CMD_GUN, CMD_KATANA, CMD_FLAIL, CMD_MIDNIGHT, CMD_SKILL, CMD_RESTART = range(1, 8)
+KEY_COMMANDS = {
+    pygame.K_0: CMD_UNEQUIP,
+    pygame.K_1: CMD_GUN,
+    pygame.K_2: CMD_KATANA,
+    pygame.K_3: CMD_FLAIL,
+    pygame.K_4: CMD_MIDNIGHT,
+    pygame.K_SPACE: CMD_SKILL,
+    pygame.K_r: CMD_RESTART,
+}
+
+
+def keys_to_mask(keys):
+    mask = 0
+    for bit, k in enumerate(TRACKED_KEYS):
+        if keys[k]:
+            mask |= 1 << bit
+    return mask
+
+
 class Controls:
     def __init__(self):
         self.key_map = {
@@ -1,5 +1,9 @@
+from startup import TIMELINE  # first, so the timeline covers every import below
+import argparse
+import os
 import sys
 import pygame
+TIMELINE.mark("import pygame")
 
 # try to read optional settings; fall back to defaults
 try:
@@ -12,15 +16,55 @@ except Exception:
 
 # import the Game class from game.py
 from game import Game
+TIMELINE.mark("import game")
+from assets import ASSETS, ASSET_BUNDLE
+from replay import InputRecorder
+from netplay import RollbackSession, UdpTransport
+from input.controls import KEY_COMMANDS
+TIMELINE.mark("import replay, netplay")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Street Duel")
+    parser.add_argument("--seed", type=int, default=None, help="match seed (default: random)")
+    parser.add_argument("--record", metavar="PATH", default=None, help="record inputs for replay.py")
+    parser.add_argument("--waves", action="store_true", help="wave mode: hordes of grunts join the enemy")
+    parser.add_argument("--netplay", metavar="HOST:PORT", default=None, help="play a peer over UDP")
+    parser.add_argument("--port", type=int, default=7000, help="local UDP port for --netplay")
+    parser.add_argument("--side", type=int, choices=(0, 1), default=0, help="0 plays the Player, 1 the Enemy")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="print the import / init timeline after the first frame and exit")
+    parser.add_argument("--no-bundle", action="store_true", help="load assets from the package directories")
+    args = parser.parse_args(argv)
+    if args.netplay and args.record:
+        parser.error("--record is not supported with --netplay")
 
-def main():
     pygame.init()
+    TIMELINE.mark("pygame.init")
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
     pygame.display.set_caption("Street Duel")
+    TIMELINE.mark("display")
+    if not args.no_bundle and os.path.exists(ASSET_BUNDLE):
+        ASSETS.mount(ASSET_BUNDLE)
+        TIMELINE.mark("mount bundle")
     clock = pygame.time.Clock()
-    game = Game(screen)
+    session = None
+    if args.netplay:
+        # both peers must simulate the same match: same seed, same world size
+        game = Game(screen, seed=args.seed if args.seed is not None else 0, waves=args.waves)
+        host, _, port = args.netplay.rpartition(":")
+        session = RollbackSession(game, args.side, UdpTransport(("0.0.0.0", args.port), (host, int(port))))
+    else:
+        game = Game(screen, seed=args.seed, waves=args.waves)
+    TIMELINE.mark("Game()")
+    # load times and cache hits of the startup asset loads
+    print(ASSETS.report())
+    if args.record:
+        # chunks are streamed to the file as the match runs
+        game.recorder = InputRecorder(game, args.record)
 
     running = True
+    frames = 0
+    pushed_pixels = 0
     while running: 
         dt = clock.tick(FPS)
         events = pygame.event.get()
@@ -30,10 +74,50 @@ def main():
             elif ev.type == pygame.KEYDOWN and ev.key == pygame.K_ESCAPE:
                 running = False
 
-        game.update(dt, events)
+        if session is None:
+            game.update(dt, events)
+        else:
+            # local commands travel with the input stream instead of the game's queue
+            for ev in events:
+                if ev.type == pygame.KEYDOWN and ev.key in KEY_COMMANDS:
+                    session.command(KEY_COMMANDS[ev.key])
+                elif ev.type == pygame.KEYDOWN and ev.key == pygame.K_F2:
+                    game.dirty.toggle()
+            keys = pygame.key.get_pressed()
+            for _ in range(game.timestep.advance(dt)):
+                session.advance(keys)
+            if frames % FPS == 0:
+                pygame.display.set_caption(f"Street Duel - side {args.side}, rollback {session.last_depth} "
+                                           f"ticks ({session.last_resim_ms:.2f} ms), {session.stalls} stalls")
         game.draw()
-        pygame.display.flip()
+        pushed_pixels += game.dirty.present()
+        frames += 1
+        if frames == 1:
+            TIMELINE.mark("first frame")
+            if args.startup_profile:
+                running = False
 
+    if args.startup_profile:
+        print("\n".join(TIMELINE.lines()))
+        pygame.quit()
+        return
+    if session is not None:
+        stats = session.stats()
+        print(f"netplay: {stats['frames']} ticks, {stats['stalls']} stalls, {stats['rollbacks']} rollbacks "
+              f"(mean depth {stats['mean_depth']:.1f}, max {stats['max_depth']}, "
+              f"mean resim {stats['mean_resim_ms']:.3f} ms)")
+        session.transport.close()
+    if game.recorder is not None:
+        game.recorder.close()
+        print(f"recorded {game.recorder.ticks} ticks to {args.record}")
+    if frames:
+        print(f"render: {game.dirty.mode} mode, {pushed_pixels // frames} pixels pushed per frame")
+    # pool high-water marks, used to size LASER_POOL_SIZE / MEDKIT_POOL_SIZE
+    for name, stats in game.pool_stats().items():
+        print(f"pool {name}: high-water {stats['high_water']}, created {stats['created']}, spawned {stats['spawned']}")
+    stats = game.physics.stats()
+    print(f"physics: {stats['steps']} steps ({stats['substeps']} sub-steps), {stats['bodies']} bodies, "
+          f"mean step {stats['mean_step_ms']:.3f} ms")
     pygame.quit()
     sys.exit()
 
@@ -0,0 +1,425 @@
+"""Rollback netplay for two-player duels.
+
+Both machines run the same seeded Game. Side 0 plays the Player, side 1 the
+Enemy (Game.enemy_source). Every tick each side sends its input for
+``input_delay`` ticks ahead and simulates right away, using a predicted
+input (the last one confirmed) for the remote side. When a remote input
+arrives that differs from the prediction, the session restores the
+Game.snapshot taken before that tick and resimulates up to the present.
+
+Session frames keep counting on the game-over screen, where, as in
+Game.update, the Game does not tick: only a restart command gets through.
+
+An input is one byte per tick: the held-key mask (input.controls.TRACKED_KEYS)
+in the low five bits and an optional command (CMD_*) in the top three. Only
+the Player's commands are applied. The Enemy has no weapons or skill.
+
+Play over UDP, one command per machine::
+
+    python src/main.py --netplay 192.168.1.20:7000 --port 7000 --side 0
+    python src/main.py --netplay 192.168.1.10:7000 --port 7000 --side 1
+
+or try it on one machine over a lossy loopback link::
+
+    python src/netplay.py --latency 80 --jitter 20 --loss 0.05 --seconds 60
+"""
+import argparse
+import heapq
+import itertools
+import random
+import socket
+import struct
+import sys
+import time
+
+from input.controls import KEYSTATES, CMD_SKILL, CMD_GUN, CMD_MIDNIGHT, keys_to_mask
+from snapshot import Snapshot
+
+MAGIC = b"SDNP"
+# magic, first input tick, sender's simulated tick, last remote tick it holds
+# without gaps (ack), sender's frame advantage, input count
+PACKET = struct.Struct("<4sIIIhB")
+MAX_PACKET_INPUTS = 64
+MASK_BITS = 0x1F
+CMD_SHIFT = 5
+
+# in simulation ticks (120 Hz): ~17 ms of input delay, rollbacks up to ~133 ms
+INPUT_DELAY = 2
+MAX_ROLLBACK = 16
+# stall one tick when this many ticks ahead of the remote side (at most every SYNC_INTERVAL)
+SYNC_THRESHOLD = 2
+SYNC_INTERVAL = 10
+
+
+class RollbackSession:
+    """Drives ``game`` for one side of a networked match over ``transport``.
+
+    Call ``advance(keys)`` once per simulation tick with the local keys; it
+    returns False when it stalled instead (too far ahead of the remote
+    side). ``command`` queues a CMD_* for the next local input. After each
+    advance, ``last_depth`` and ``last_resim_ms`` describe the rollback it
+    did; ``stats`` has the totals.
+    """
+
+    def __init__(self, game, side, transport, input_delay=INPUT_DELAY, max_rollback=MAX_ROLLBACK):
+        if side not in (0, 1):
+            raise ValueError("side must be 0 (Player) or 1 (Enemy)")
+        self.game = game
+        self.side = side
+        self.transport = transport
+        self.input_delay = input_delay
+        self.max_rollback = max_rollback
+        # the first input_delay ticks have no input on either side
+        self.local = {t: 0 for t in range(1, input_delay + 1)}
+        self.remote = dict(self.local)
+        self.remote_confirmed = input_delay
+        self.predicted = {}
+        self.remote_frame = 0
+        self.remote_advantage = 0
+        self.remote_ack = 0
+        self._snaps = [Snapshot() for _ in range(max_rollback + 2)]
+        self._rollback_from = None
+        self._command = 0
+        self._inputs = [0, 0]
+        self._last_sync_stall = 0
+        self.frame = 0  # last simulated session frame (game.sim_ticks stops at game over)
+        game.input_source = lambda: KEYSTATES[self._inputs[0] & MASK_BITS]
+        game.enemy_source = lambda: KEYSTATES[self._inputs[1] & MASK_BITS]
+
+        self.frames = 0
+        self.stalls = 0
+        self.rollbacks = 0
+        self.mispredictions = 0
+        self.resim_ticks = 0
+        self.resim_ms = 0.0
+        self.max_depth = 0
+        self.max_resim_ms = 0.0
+        self.last_depth = 0
+        self.last_resim_ms = 0.0
+        self.depth_histogram = [0] * (max_rollback + 2)
+        self.packets_sent = 0
+        self.packets_received = 0
+
+    def command(self, code):
+        """Send a CMD_* with the next local input (one per tick; the latest wins)."""
+        self._command = code
+
+    def advance(self, keys):
+        self.last_depth = 0
+        self.last_resim_ms = 0.0
+        self.poll()
+        frame = self.frame + 1
+        if frame - self.remote_confirmed > self.max_rollback or self._time_sync(frame):
+            self.stalls += 1
+            self._send()
+            return False
+        self.local[frame + self.input_delay] = keys_to_mask(keys) | self._command << CMD_SHIFT
+        self._command = 0
+        self._send()
+        self._simulate(frame)
+        self.frame = frame
+        self.frames += 1
+        self._prune(frame)
+        return True
+
+    def poll(self):
+        """Take in arrived packets and roll back if a prediction was wrong."""
+        for payload in self.transport.receive():
+            self._receive(payload)
+        if self._rollback_from is not None:
+            self._rollback(self._rollback_from)
+            self._rollback_from = None
+
+    def sync(self):
+        """Poll and resend without simulating (waiting for the remote side)."""
+        self.poll()
+        self._send()
+
+    @property
+    def advantage(self):
+        return self.frame - self.remote_frame
+
+    def _time_sync(self, frame):
+        # both sides see the other one a latency behind, so compare the two views
+        if (self.advantage - self.remote_advantage) // 2 < SYNC_THRESHOLD:
+            return False
+        if frame - self._last_sync_stall < SYNC_INTERVAL:
+            return False
+        self._last_sync_stall = frame
+        return True
+
+    def _remote_input(self, tick):
+        value = self.remote.get(tick)
+        if value is None:
+            # predict that the remote side keeps doing what it last did
+            value = self.remote.get(self.remote_confirmed, 0) & MASK_BITS
+            self.predicted[tick] = value
+        return value
+
+    def _simulate(self, tick):
+        game = self.game
+        snap = game.snapshot(self._snaps[tick % len(self._snaps)])
+        snap.tick = tick - 1
+        local = self.local[tick]
+        remote = self._remote_input(tick)
+        self._inputs[self.side] = local
+        self._inputs[1 - self.side] = remote
+        command = self._inputs[0] >> CMD_SHIFT
+        if command:
+            game.apply_command(command)
+        if game.state == "running":
+            game._record_previous()
+            game.tick(game.timestep.tick_ms)
+
+    def _rollback(self, tick):
+        game = self.game
+        current = self.frame
+        snap = self._snaps[tick % len(self._snaps)]
+        if snap.tick != tick - 1:
+            raise RuntimeError(f"no snapshot for tick {tick} (at {current}); max_rollback too small")
+        start = time.perf_counter()
+        game.restore(snap)
+        effects, game.effects = game.effects, False
+        try:
+            for t in range(tick, current + 1):
+                self._simulate(t)
+        finally:
+            game.effects = effects
+        ms = (time.perf_counter() - start) * 1000.0
+        depth = current - tick + 1
+        self.rollbacks += 1
+        self.resim_ticks += depth
+        self.resim_ms += ms
+        self.last_depth = depth
+        self.last_resim_ms = ms
+        self.max_depth = max(self.max_depth, depth)
+        self.max_resim_ms = max(self.max_resim_ms, ms)
+        self.depth_histogram[min(depth, len(self.depth_histogram) - 1)] += 1
+
+    def _receive(self, payload):
+        if len(payload) < PACKET.size:
+            return
+        magic, first, frame, ack, advantage, count = PACKET.unpack_from(payload)
+        if magic != MAGIC:
+            return
+        self.packets_received += 1
+        inputs = payload[PACKET.size:PACKET.size + count]
+        simulated = self.frame
+        for i, value in enumerate(inputs):
+            tick = first + i
+            if tick <= self.remote_confirmed or tick in self.remote:
+                continue
+            self.remote[tick] = value
+            guess = self.predicted.pop(tick, None)
+            if tick <= simulated and guess != value:
+                self.mispredictions += 1
+                if self._rollback_from is None or tick < self._rollback_from:
+                    self._rollback_from = tick
+        while self.remote_confirmed + 1 in self.remote:
+            self.remote_confirmed += 1
+        if frame >= self.remote_frame:
+            self.remote_frame = frame
+            self.remote_advantage = advantage
+        self.remote_ack = max(self.remote_ack, ack)
+
+    def _send(self):
+        first = self.remote_ack + 1
+        last = max(self.local)
+        if last < first:
+            return
+        inputs = bytes(self.local[t] for t in range(first, min(last, first + MAX_PACKET_INPUTS - 1) + 1))
+        header = PACKET.pack(MAGIC, first, self.frame, self.remote_confirmed,
+                             max(-32768, min(32767, self.advantage)), len(inputs))
+        self.transport.send(header + inputs)
+        self.packets_sent += 1
+
+    def _prune(self, frame):
+        # keep what a rollback can still need, and what the remote side has not acked
+        horizon = frame - len(self._snaps)
+        for t in [t for t in self.local if t < horizon and t <= self.remote_ack]:
+            del self.local[t]
+        for t in [t for t in self.remote if t < horizon and t < self.remote_confirmed]:
+            del self.remote[t]
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "stalls": self.stalls,
+            "rollbacks": self.rollbacks,
+            "mispredictions": self.mispredictions,
+            "resim_ticks": self.resim_ticks,
+            "mean_depth": self.resim_ticks / self.rollbacks if self.rollbacks else 0.0,
+            "max_depth": self.max_depth,
+            "resim_ms": self.resim_ms,
+            "mean_resim_ms": self.resim_ms / self.rollbacks if self.rollbacks else 0.0,
+            "max_resim_ms": self.max_resim_ms,
+            "depth_histogram": list(self.depth_histogram),
+            "packets_sent": self.packets_sent,
+            "packets_received": self.packets_received,
+        }
+
+
+class UdpTransport:
+    """Non-blocking UDP socket exchanging datagrams with one peer address."""
+
+    def __init__(self, bind, peer):
+        self.peer = (socket.gethostbyname(peer[0]), peer[1])
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(bind)
+        self.sock.setblocking(False)
+        self.send_errors = 0
+        self.receive_errors = 0
+
+    def send(self, payload):
+        try:
+            self.sock.sendto(payload, self.peer)
+        except OSError:
+            # peer not up yet (ICMP refused) or buffer full: the next packet resends
+            self.send_errors += 1
+
+    def receive(self):
+        packets = []
+        while True:
+            try:
+                payload, addr = self.sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                # e.g. ICMP port unreachable from our last send: retrying at once
+                # would spin on it, so leave the rest for the next poll
+                self.receive_errors += 1
+                break
+            if addr[0] == self.peer[0]:
+                packets.append(payload)
+        return packets
+
+    def close(self):
+        self.sock.close()
+
+
+class LoopbackTransport:
+    """One end of an in-process datagram link with injected latency, jitter and loss.
+
+    ``clock`` returns seconds; pass a simulated one to make runs reproducible.
+    Jitter can reorder packets, as on a real network.
+    """
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, loss=0.0, rng=None, clock=time.perf_counter):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.loss = loss
+        self.rng = rng if rng is not None else random.Random()
+        self.clock = clock
+        self.peer = None
+        self._inbox = []
+        self._seq = itertools.count()
+        self.sent = 0
+        self.dropped = 0
+
+    @classmethod
+    def pair(cls, latency_ms=0.0, jitter_ms=0.0, loss=0.0, seed=None, clock=time.perf_counter):
+        rng = random.Random(seed)
+        a = cls(latency_ms, jitter_ms, loss, rng, clock)
+        b = cls(latency_ms, jitter_ms, loss, rng, clock)
+        a.peer, b.peer = b, a
+        return a, b
+
+    def send(self, payload):
+        self.sent += 1
+        if self.rng.random() < self.loss:
+            self.dropped += 1
+            return
+        delay = max(0.0, self.latency_ms + self.rng.uniform(-self.jitter_ms, self.jitter_ms))
+        heapq.heappush(self.peer._inbox, (self.clock() + delay / 1000.0, next(self._seq), bytes(payload)))
+
+    def receive(self):
+        now = self.clock()
+        packets = []
+        while self._inbox and self._inbox[0][0] <= now:
+            packets.append(heapq.heappop(self._inbox)[2])
+        return packets
+
+
+class Masher:
+    """Scripted input for the loopback harness: holds random keys for a while."""
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.keys = KEYSTATES[0]
+        self.hold = 0
+
+    def __call__(self):
+        if self.hold <= 0:
+            self.keys = KEYSTATES[self.rng.randrange(32)]
+            self.hold = self.rng.randint(6, 60)
+        self.hold -= 1
+        return self.keys
+
+
+def run_loopback(seconds=30.0, latency_ms=60.0, jitter_ms=10.0, loss=0.02, seed=0,
+                 input_delay=INPUT_DELAY, max_rollback=MAX_ROLLBACK, world_size=(900, 520)):
+    """Play two sessions against each other in simulated time; returns (sessions, games, link)."""
+    from game import Game
+
+    games = [Game(None, world_size=world_size, seed=seed) for _ in range(2)]
+    tick_s = games[0].timestep.tick_ms / 1000.0
+    now = [0.0]
+    link = LoopbackTransport.pair(latency_ms, jitter_ms, loss, seed, clock=lambda: now[0])
+    sessions = [RollbackSession(games[i], i, link[i], input_delay, max_rollback) for i in range(2)]
+    bots = [Masher(random.Random(seed * 2 + i)) for i in range(2)]
+    commands = random.Random(seed)
+    end = int(seconds * games[0].timestep.hz)
+
+    while any(s.frame < end for s in sessions):
+        now[0] += tick_s
+        # the Player side switches weapons and fires the skill now and then
+        if commands.random() < 0.005:
+            sessions[0].command(commands.choice([CMD_SKILL, CMD_GUN, CMD_MIDNIGHT]))
+        for session, bot in zip(sessions, bots):
+            if session.frame < end:
+                session.advance(bot())
+            else:
+                session.sync()
+    # let the last inputs arrive so both sides settle on the confirmed result
+    for _ in range(int(10.0 / tick_s)):
+        if all(s.remote_confirmed >= end for s in sessions):
+            break
+        now[0] += tick_s
+        for session in sessions:
+            session.sync()
+    return sessions, games, link
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rollback netplay over a simulated lossy loopback link")
+    parser.add_argument("--seconds", type=float, default=30.0, help="simulated match length")
+    parser.add_argument("--latency", type=float, default=60.0, help="one-way latency in ms")
+    parser.add_argument("--jitter", type=float, default=10.0, help="latency jitter (+/- ms)")
+    parser.add_argument("--loss", type=float, default=0.02, help="packet loss probability")
+    parser.add_argument("--delay", type=int, default=INPUT_DELAY, help="input delay in ticks")
+    parser.add_argument("--max-rollback", type=int, default=MAX_ROLLBACK, help="deepest rollback in ticks")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    sessions, games, link = run_loopback(args.seconds, args.latency, args.jitter, args.loss, args.seed,
+                                         args.delay, args.max_rollback)
+    elapsed = time.perf_counter() - start
+    for i, (session, game) in enumerate(zip(sessions, games)):
+        s = session.stats()
+        print(f"side {i}: {s['frames']} ticks, {s['stalls']} stalls, {s['rollbacks']} rollbacks "
+              f"(mean depth {s['mean_depth']:.1f}, max {s['max_depth']}), "
+              f"resim {s['mean_resim_ms']:.3f} ms mean / {s['max_resim_ms']:.3f} ms max, "
+              f"packets {s['packets_sent']} sent / {s['packets_received']} received")
+        print(f"        depth histogram {s['depth_histogram']}")
+    print(f"link: {link[0].dropped + link[1].dropped} of {link[0].sent + link[1].sent} packets dropped")
+    digests = [g.digest() for g in games]
+    synced = digests[0] == digests[1]
+    print(f"result: player {games[0].player.hp} hp, enemy {games[0].enemy.hp} hp, "
+          f"digests {'match' if synced else 'DIFFER'} ({digests[0]:016x})")
+    print(f"{elapsed:.2f}s wall for {args.seconds:.0f}s simulated")
+    return 0 if synced else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
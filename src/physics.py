@@ -1,27 +1,187 @@
+"""Movement integration for every body in a match.
+
+``Physics.step`` is the one place positions change under velocity and
+gravity: fighters, pickups and lasers registered as bodies, and struct-of-
+arrays batches such as wave-mode hordes. Bodies describe themselves with
+class attributes (``MOVES_X``, ``MOVES_Y``, ``GRAVITY_SCALE``, ``LANDS``,
+``SWEPT``) and carry ``rect`` plus ``vx`` / ``sub_x`` and ``vy`` / ``sub_y``
+for the axes they move on.
+
+Long steps are split into sub-steps of at most ``max_step_ms``, so a match
+running at a low tick rate follows the same trajectories as one at the base
+rate. Swept bodies (lasers) get a ``swept`` rect covering the whole step,
+which collision checks use so fast movers cannot tunnel through a target.
+"""
+from time import perf_counter
+
+import numpy as np
+
+# movement constants (speeds, GRAVITY, jump impulse) are tuned in pixels per 60 Hz frame
+BASE_FRAME_MS = 1000.0 / 60
+
+
+def frame_scale(dt):
+    """Fraction of a 60 Hz frame covered by a dt (ms) step.
+
+    A zero step covers nothing; to move by one legacy frame pass ``BASE_FRAME_MS``.
+    """
+    return dt / BASE_FRAME_MS
+
+
 class Physics:
-    def __init__(self):
-        self.gravity = 0.5
-        self.friction = 0.1
+    """Integrates registered bodies and batches; instrumented per step.
+
+    A step split into ``vector_substeps`` or more sub-steps, over
+    ``vector_min`` or more bodies, gathers the bodies into NumPy arrays once
+    and runs every sub-step on those; otherwise it loops over them. Both do
+    the same float64 arithmetic, so the choice never changes a result. (Copying
+    attributes in and out costs about two loop sub-steps per body, so arrays
+    only pay off over several.) ``stats()`` reports body counts and step times.
+    """
 
-    def apply_gravity(self, entity):
-        if not entity.on_ground:
-            entity.velocity_y += self.gravity
+    def __init__(self, world, gravity, ground_offset, max_step_ms=None, vector_min=32, vector_substeps=3):
+        self.world = world
+        self.gravity = gravity
+        self.ground_offset = ground_offset
+        self.max_step_ms = max_step_ms
+        self.vector_min = vector_min
+        self.vector_substeps = vector_substeps
+        self._bodies = []
+        self._groups = []
+        self._batches = []
+        self.bodies = 0
+        self.steps = 0
+        self.substeps = 0
+        self.vector_steps = 0
+        self.last_step_ms = 0.0
+        self.total_ms = 0.0
+
+    def add(self, body):
+        self._bodies.append(body)
+
+    def add_group(self, group):
+        """Integrate every sprite in group (iterated each step, so spawns join in)."""
+        self._groups.append(group)
+
+    def add_batch(self, batch):
+        """Integrate a struct-of-arrays store: x, y, vx, vy arrays, count rows, a height."""
+        self._batches.append(batch)
+
+    def remove_batch(self, batch):
+        self._batches.remove(batch)
+
+    def step(self, dt):
+        start = perf_counter()
+        bodies = self._bodies.copy()
+        for group in self._groups:
+            bodies += group.spritedict
+        n = 1
+        max_step = self.max_step_ms
+        if max_step and dt > max_step:
+            n = -int(-dt // max_step)
+        k = frame_scale(dt / n)
+        ground = self.world.height - self.ground_offset
+        swept = [b for b in bodies if b.SWEPT]
+        for b in swept:
+            b.swept.update(b.rect)
+        if n >= self.vector_substeps and len(bodies) >= self.vector_min:
+            self._step_arrays(bodies, k, n, ground)
+            self.vector_steps += 1
         else:
-            entity.velocity_y = 0
-
-    def check_collision(self, entity1, entity2):
-        if (entity1.rect.colliderect(entity2.rect)):
-            self.resolve_collision(entity1, entity2)
-
-    def resolve_collision(self, entity1, entity2):
-        # Simple collision resolution logic
-        if entity1.rect.bottom > entity2.rect.top:
-            entity1.rect.bottom = entity2.rect.top
-            entity1.on_ground = True
-        elif entity1.rect.top < entity2.rect.bottom:
-            entity1.rect.top = entity2.rect.bottom
-            entity1.velocity_y = 0
-        elif entity1.rect.right > entity2.rect.left:
-            entity1.rect.right = entity2.rect.left
-        elif entity1.rect.left < entity2.rect.right:
-            entity1.rect.left = entity2.rect.right
\ No newline at end of file
+            for _ in range(n):
+                self._step_bodies(bodies, k, ground)
+        for b in swept:
+            b.swept.union_ip(b.rect)
+        rows = 0
+        for batch in self._batches:
+            for _ in range(n):
+                self._step_batch(batch, k, ground)
+            rows += batch.count
+        self.bodies = len(bodies) + rows
+        self.steps += 1
+        self.substeps += n
+        self.last_step_ms = elapsed = (perf_counter() - start) * 1000.0
+        self.total_ms += elapsed
+
+    def _step_bodies(self, bodies, k, ground):
+        gravity = self.gravity
+        for b in bodies:
+            rect = b.rect
+            # whole pixels move the rect and the sub-pixel rest carries to the next
+            # step, so slow movers still advance at small time steps (inlined: this
+            # loop runs for every body every tick)
+            if b.MOVES_X:
+                total = b.sub_x + b.vx * k
+                whole = int(total)
+                b.sub_x = total - whole
+                rect.x += whole
+            if b.MOVES_Y:
+                b.vy += gravity * b.GRAVITY_SCALE * k
+                total = b.sub_y + b.vy * k
+                whole = int(total)
+                b.sub_y = total - whole
+                rect.y += whole
+                if b.LANDS and rect.bottom >= ground:
+                    rect.bottom = ground
+                    b.vy = 0
+                    b.sub_y = 0.0
+                    b.on_ground = True
+
+    def _step_arrays(self, bodies, k, n, ground):
+        count = len(bodies)
+        moves_x = np.fromiter((b.MOVES_X for b in bodies), bool, count)
+        moves_y = np.fromiter((b.MOVES_Y for b in bodies), bool, count)
+        lands = np.fromiter((b.LANDS for b in bodies), bool, count)
+        accel = np.fromiter((self.gravity * b.GRAVITY_SCALE if b.MOVES_Y else 0.0 for b in bodies), float, count)
+        x = np.fromiter((b.rect.x for b in bodies), float, count)
+        y = np.fromiter((b.rect.y for b in bodies), float, count)
+        h = np.fromiter((b.rect.height for b in bodies), float, count)
+        vx = np.fromiter((b.vx if b.MOVES_X else 0.0 for b in bodies), float, count)
+        sub_x = np.fromiter((b.sub_x if b.MOVES_X else 0.0 for b in bodies), float, count)
+        vy = np.fromiter((b.vy if b.MOVES_Y else 0.0 for b in bodies), float, count)
+        sub_y = np.fromiter((b.sub_y if b.MOVES_Y else 0.0 for b in bodies), float, count)
+        landed = np.zeros(count, bool)
+        for _ in range(n):
+            sub_x += vx * k
+            dx = np.trunc(sub_x)
+            sub_x -= dx
+            x += dx
+            vy += accel * k
+            sub_y += vy * k
+            dy = np.trunc(sub_y)
+            sub_y -= dy
+            y += dy
+            hit = lands & (y + h >= ground)
+            y[hit] = ground - h[hit]
+            vy[hit] = 0.0
+            sub_y[hit] = 0.0
+            landed |= hit
+        for b, bx, by, bsx, bvy, bsy, mx, my, bl in zip(
+                bodies, x.astype(int).tolist(), y.astype(int).tolist(), sub_x.tolist(), vy.tolist(),
+                sub_y.tolist(), moves_x.tolist(), moves_y.tolist(), landed.tolist()):
+            if mx:
+                b.rect.x = bx
+                b.sub_x = bsx
+            if my:
+                b.rect.y = by
+                b.vy = bvy
+                b.sub_y = bsy
+                if bl:
+                    b.on_ground = True
+
+    def _step_batch(self, batch, k, ground):
+        m = batch.count
+        if not m:
+            return
+        x, y, vx, vy = batch.x[:m], batch.y[:m], batch.vx[:m], batch.vy[:m]
+        x += vx * k
+        vy += self.gravity * k
+        y += vy * k
+        landed = y + batch.height >= ground
+        y[landed] = ground - batch.height
+        vy[landed] = 0.0
+
+    def stats(self):
+        return {"bodies": self.bodies, "steps": self.steps, "substeps": self.substeps,
+                "vector_steps": self.vector_steps, "last_step_ms": self.last_step_ms,
+                "mean_step_ms": self.total_ms / self.steps if self.steps else 0.0}
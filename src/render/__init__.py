@@ -0,0 +1,6 @@
+import pygame
+
+
+def display_ready():
+    """True once a display mode is set, so surfaces can be convert()ed to its format."""
+    return pygame.display.get_init() and pygame.display.get_surface() is not None
@@ -0,0 +1,73 @@
+import pygame
+
+from render import display_ready
+
+
+class BackgroundLayers:
+    """Pre-baked static layers of the war background (sky, skyline, ground glow).
+
+    Layers are rebuilt only when the screen size or the fire seed changes, so the
+    per-frame draw is a few blits.
+    """
+
+    def __init__(self):
+        self.key = None
+        self.sky = None
+        self.silhouette = None
+        self.ground_glow = None
+        self.builds = 0
+
+    def invalidate(self):
+        self.key = None
+        self.sky = None
+        self.silhouette = None
+        self.ground_glow = None
+
+    def ensure(self, w, h, seed):
+        key = (w, h, seed)
+        if key != self.key:
+            self._build(w, h, seed)
+            self.key = key
+        return self
+
+    def _finish(self, surf):
+        # store in display format so the per-frame blit needs no conversion
+        return surf.convert_alpha() if display_ready() else surf
+
+    def _build(self, w, h, seed):
+        # 1) dark gradient sky (reddish/orange near horizon -> dark smoky above)
+        sky = pygame.Surface((w, h), pygame.SRCALPHA)
+        for y in range(h):
+            p = y / h
+            r = int(20 + (220 - 20) * (1 - p) * 0.8)
+            g = int(12 + (80 - 12) * (1 - p) * 0.6)
+            b = int(18 + (40 - 18) * (1 - p) * 0.3)
+            a = int(200 * (1 - p))
+            sky.fill((r, g, b, a), rect=pygame.Rect(0, y, w, 1))
+
+        # 2) ruined city silhouette built from rectangles of varying height
+        silhouette = pygame.Surface((w, int(h * 0.45)), pygame.SRCALPHA)
+        sil_h = silhouette.get_height()
+        x = 0
+        rng = int(seed % 97)
+        while x < w:
+            bw = 30 + ((x + rng) % 90)
+            bh = int(sil_h * (0.35 + ((x * 13 + rng) % 60) / 100))
+            rect = pygame.Rect(x, sil_h - bh, bw, bh)
+            pygame.draw.rect(silhouette, (18, 18, 20, 255), rect)
+            # occasional broken tower tops
+            if ((x + rng) % 130) < 20:
+                pygame.draw.rect(silhouette, (34, 20, 20, 255), (x + bw//4, sil_h - bh - 6, bw//2, 6))
+            x += bw + 6
+
+        # 3) ground glow / scorched earth strip
+        glow_h = int(h * 0.12)
+        ground_glow = pygame.Surface((w, glow_h), pygame.SRCALPHA)
+        for y in range(glow_h):
+            a = int(190 * (1 - (y / glow_h)))
+            ground_glow.fill((100 + int(120 * (1 - y/glow_h)), 40, 15, a), rect=pygame.Rect(0, y, w, 1))
+
+        self.sky = self._finish(sky)
+        self.silhouette = self._finish(silhouette)
+        self.ground_glow = self._finish(ground_glow)
+        self.builds += 1
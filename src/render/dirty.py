@@ -0,0 +1,88 @@
+import pygame
+
+RENDER_MODES = ("full", "dirty")
+
+
+def merge_rects(rects):
+    """Union overlapping rects until none of the results overlap."""
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        i = 0
+        while i < len(merged):
+            if merged[i].colliderect(rect):
+                rect.union_ip(merged.pop(i))
+                i = 0
+            else:
+                i += 1
+        merged.append(rect)
+    return merged
+
+
+class DirtyRects:
+    """Collects the screen regions changed by a frame and pushes them to the display.
+
+    In ``"full"`` mode ``present`` is a plain ``display.flip``. In ``"dirty"`` mode
+    only this frame's rects plus last frame's (so vacated areas get repainted)
+    are pushed with ``display.update``. ``pushed_pixels`` and ``pushed_rects``
+    describe the last presented frame.
+    """
+
+    def __init__(self, screen_rect, mode="full"):
+        if mode not in RENDER_MODES:
+            raise ValueError(f"unknown render mode {mode!r}")
+        self.screen_rect = pygame.Rect(screen_rect)
+        self.mode = mode
+        self._rects = []
+        self._prev = []
+        self._full = True
+        self.frames = 0
+        self.pushed_pixels = 0
+        self.pushed_rects = 0
+
+    def set_mode(self, mode):
+        if mode not in RENDER_MODES:
+            raise ValueError(f"unknown render mode {mode!r}")
+        self.mode = mode
+        self.invalidate()
+
+    def toggle(self):
+        self.set_mode("dirty" if self.mode == "full" else "full")
+        return self.mode
+
+    def resize(self, screen_rect):
+        self.screen_rect = pygame.Rect(screen_rect)
+        self.invalidate()
+
+    def invalidate(self):
+        """Push the whole screen on the next present (first frame, resize, overlays)."""
+        self._full = True
+
+    def add(self, rect):
+        if rect is not None and self.mode == "dirty":
+            self._rects.append(pygame.Rect(rect))
+
+    def add_all(self, rects):
+        for rect in rects:
+            self.add(rect)
+
+    def present(self):
+        area = self.screen_rect.width * self.screen_rect.height
+        if self.mode == "full" or self._full:
+            pygame.display.flip()
+            self.pushed_pixels = area
+            self.pushed_rects = 1
+            self._prev = [] if self.mode == "full" else self._rects
+        else:
+            current = self._rects
+            rects = [r.clip(self.screen_rect) for r in current + self._prev]
+            rects = merge_rects([r for r in rects if r.width and r.height])
+            if rects:
+                pygame.display.update(rects)
+            self.pushed_pixels = sum(r.width * r.height for r in rects)
+            self.pushed_rects = len(rects)
+            self._prev = current
+        self._rects = []
+        self._full = False
+        self.frames += 1
+        return self.pushed_pixels
@@ -0,0 +1,71 @@
+import math
+import numpy as np
+import pygame
+
+from render import display_ready
+
+EMBER_COUNT = 42
+_TINTS = 6  # ember i has green 200 - (i % 6) * 20
+_MAX_SIZE = 6  # max(1, int(2 + (sin + 1) * 2)) never exceeds this
+_KEY = (255, 0, 255)
+
+
+class Embers:
+    """Rising embers of the war background, positioned in one NumPy pass per frame.
+
+    Ember motion is a closed-form function of ``t`` (same curves as before).
+    Every ember is one of a few tints and sizes, so each (tint, size) circle is
+    pre-rendered once and a frame is a single blits() batch of them; the
+    result is pixel-identical to ``draw_reference``. (The general
+    ParticleSystem path was slower than that loop at 42 embers: its
+    per-frame colour keys and np.unique cost more than the circles.)
+    """
+
+    def __init__(self, count=EMBER_COUNT):
+        idx = np.arange(count)
+        self.count = count
+        self._phase0 = idx * 0.37
+        self._rate = 0.8 + (idx % 5) * 0.05
+        self._x_frac = ((idx * 23 + 17) % 97) / 100
+        self._idx = idx
+        self._tint = (idx % _TINTS).tolist()
+        self._stamps = None  # [tint][size] -> surface
+
+    def _build_stamps(self):
+        stamps = []
+        for tint in range(_TINTS):
+            row = [None]
+            for size in range(1, _MAX_SIZE + 1):
+                surf = pygame.Surface((size * 2, size * 2))
+                if display_ready():
+                    surf = surf.convert()
+                surf.fill(_KEY)
+                # the display has no alpha, so embers were always drawn opaque
+                pygame.draw.circle(surf, (255, 200 - tint * 20, 60), (size, size), size)
+                surf.set_colorkey(_KEY, pygame.RLEACCEL)
+                row.append(surf)
+            stamps.append(row)
+        return stamps
+
+    def draw(self, surf, w, h, t, seed):
+        if self._stamps is None:
+            self._stamps = self._build_stamps()
+        stamps = self._stamps
+        phase = self._phase0 + t * self._rate + (seed % 13)
+        ex = np.trunc(w * self._x_frac + np.sin(phase) * 90).astype(np.int64) % w
+        ey = np.trunc(h * 0.8 - np.fmod(phase * 10, 300) * 0.6).astype(np.int64)
+        size = np.maximum(1, np.trunc(2 + (np.sin(phase * 3 + self._idx) + 1) * 2)).astype(np.int64)
+        surf.blits([(stamps[tint][s], (x - s, y - s))
+                    for tint, s, x, y in zip(self._tint, size.tolist(), ex.tolist(), ey.tolist())],
+                   doreturn=False)
+
+
+def draw_reference(surf, w, h, t, seed):
+    """The original per-ember draw.circle loop, kept for parity checks."""
+    for i in range(EMBER_COUNT):
+        phase = (i * 0.37 + t * (0.8 + (i % 5) * 0.05) + (seed % 13))
+        ex = int((w * ((i * 23 + 17) % 97)) / 100 + math.sin(phase) * 90) % w
+        ey = int(h * 0.8 - ((math.fmod(phase * 10, 300))) * 0.6)
+        size = max(1, int(2 + (math.sin(phase * 3 + i) + 1) * 2))
+        ember_col = (255, 200 - (i % 6) * 20, 60, 220)
+        pygame.draw.circle(surf, ember_col, (ex, ey), size)
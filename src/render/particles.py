@@ -0,0 +1,176 @@
+import numpy as np
+import pygame
+
+from render import display_ready
+
+# stamp colours are quantised to 5 bits per channel so continuous colour ramps
+# (fading sparks, per-ember tints) still share a small number of sprites
+_COLOR_BITS = 5
+_COLOR_LEVELS = (1 << _COLOR_BITS) - 1
+_MAX_RADIUS = 63
+
+
+class ParticleStamps:
+    """Pre-rendered circle stamps shared by every particle system.
+
+    A stamp is keyed by its quantised RGBA colour and radius and rasterised the
+    first time it is needed; the cache is bounded and simply flushed when full.
+    """
+
+    def __init__(self, max_stamps=1024):
+        self.max_stamps = max_stamps
+        self._stamps = {}
+        self.builds = 0
+
+    def __len__(self):
+        return len(self._stamps)
+
+    def clear(self):
+        self._stamps.clear()
+
+    def get(self, key):
+        spr = self._stamps.get(key)
+        if spr is None:
+            if len(self._stamps) >= self.max_stamps:
+                self._stamps.clear()
+            spr = self._build(key)
+            self._stamps[key] = spr
+        return spr
+
+    def _build(self, key):
+        packed, rad = divmod(key, _MAX_RADIUS + 1)
+        rgba = []
+        for _ in range(4):
+            packed, q = divmod(packed, 1 << _COLOR_BITS)
+            rgba.append(round(q * 255 / _COLOR_LEVELS))
+        a, b, g, r = rgba
+        spr = pygame.Surface((rad * 2, rad * 2), pygame.SRCALPHA)
+        pygame.draw.circle(spr, (r, g, b, a), (rad, rad), rad)
+        self.builds += 1
+        return spr.convert_alpha() if display_ready() else spr
+
+
+STAMPS = ParticleStamps()
+
+
+class ParticleSystem:
+    """Struct-of-arrays particle buffer updated and drawn in NumPy batches.
+
+    Live particles occupy the first ``count`` slots of every array. Positions and
+    velocities are in pixels and pixels per second, ``life`` in seconds.
+    Emitting into a full system drops the overflow and counts it in ``dropped``.
+    ``burst`` draws from the system's own generator, seeded with ``seed``, so
+    a seeded system emits the same sparks every run.
+    """
+
+    def __init__(self, capacity=2048, gravity=0.0, drag=0.0, fade=True, stamps=None, seed=None):
+        self.capacity = capacity
+        self.gravity = gravity
+        self.drag = drag
+        self.fade = fade
+        self.stamps = stamps if stamps is not None else STAMPS
+        self.rng = np.random.default_rng(seed)
+        self.count = 0
+        self.dropped = 0
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.max_life = np.ones(capacity, dtype=np.float32)
+        self.size = np.zeros(capacity, dtype=np.float32)
+        self.color = np.zeros((capacity, 4), dtype=np.uint8)
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def emit(self, x, y, vx=0.0, vy=0.0, life=1.0, size=2.0, color=(255, 255, 255, 255), n=None):
+        """Append particles; every argument may be a scalar or a length-n array."""
+        if n is None:
+            n = max(np.size(x), np.size(y))
+        start = self.count
+        n_fit = min(n, self.capacity - start)
+        self.dropped += n - n_fit
+        if n_fit <= 0:
+            return 0
+        end = start + n_fit
+        for arr, val in ((self.x, x), (self.y, y), (self.vx, vx), (self.vy, vy),
+                         (self.life, life), (self.size, size)):
+            arr[start:end] = np.broadcast_to(val, (n,))[:n_fit]
+        self.max_life[start:end] = self.life[start:end]
+        self.color[start:end] = np.broadcast_to(np.asarray(color, dtype=np.uint8), (n, 4))[:n_fit]
+        self.count = end
+        return n_fit
+
+    def burst(self, n, x, y, speed=(60.0, 240.0), angle=(0.0, 2 * np.pi),
+              life=(0.2, 0.5), size=(1.0, 3.0), color=(255, 255, 255, 255), rng=None):
+        """Emit n particles from one point with random speed/angle/life/size ranges."""
+        rng = rng if rng is not None else self.rng
+        ang = rng.uniform(angle[0], angle[1], n)
+        spd = rng.uniform(speed[0], speed[1], n)
+        return self.emit(x, y, np.cos(ang) * spd, np.sin(ang) * spd,
+                         rng.uniform(life[0], life[1], n), rng.uniform(size[0], size[1], n),
+                         color, n=n)
+
+    def place(self, x, y, size, color):
+        """Replace the live set with procedurally positioned, immortal particles."""
+        self.count = 0
+        self.emit(x, y, 0.0, 0.0, 1.0, size, color)
+
+    def update(self, dt):
+        n = self.count
+        if not n:
+            return
+        vx, vy = self.vx[:n], self.vy[:n]
+        if self.drag:
+            damp = max(0.0, 1.0 - self.drag * dt)
+            vx *= damp
+            vy *= damp
+        if self.gravity:
+            vy += self.gravity * dt
+        self.x[:n] += vx * dt
+        self.y[:n] += vy * dt
+        life = self.life[:n]
+        life -= dt
+        alive = life > 0.0
+        k = int(np.count_nonzero(alive))
+        if k != n:
+            for arr in (self.x, self.y, self.vx, self.vy, self.life, self.max_life, self.size, self.color):
+                arr[:k] = arr[:n][alive]
+            self.count = k
+
+    def bounds(self):
+        """Rect covering every live particle, or None when empty."""
+        n = self.count
+        if not n:
+            return None
+        pad = int(np.ceil(self.size[:n].max())) + 1
+        x0, x1 = int(self.x[:n].min()) - pad, int(self.x[:n].max()) + pad
+        y0, y1 = int(self.y[:n].min()) - pad, int(self.y[:n].max()) + pad
+        return pygame.Rect(x0, y0, x1 - x0, y1 - y0)
+
+    def draw(self, surf, special_flags=0):
+        n = self.count
+        if not n:
+            return
+        rad = np.clip(np.rint(self.size[:n]), 1, _MAX_RADIUS).astype(np.int64)
+        col = self.color[:n].astype(np.int64)
+        if self.fade:
+            frac = np.clip(self.life[:n] / self.max_life[:n], 0.0, 1.0)
+            col[:, 3] = (col[:, 3] * frac).astype(np.int64)
+        q = (col * _COLOR_LEVELS + 127) // 255
+        bits = _COLOR_BITS
+        keys = ((((q[:, 0] << bits | q[:, 1]) << bits | q[:, 2]) << bits | q[:, 3])
+                * (_MAX_RADIUS + 1) + rad)
+        uniq, inv = np.unique(keys, return_inverse=True)
+        sprites = [self.stamps.get(k) for k in uniq.tolist()]
+        xs = (self.x[:n] - rad).astype(np.int64).tolist()
+        ys = (self.y[:n] - rad).astype(np.int64).tolist()
+        if special_flags:
+            batch = [(sprites[i], (px, py), None, special_flags) for i, px, py in zip(inv.tolist(), xs, ys)]
+        else:
+            batch = [(sprites[i], (px, py)) for i, px, py in zip(inv.tolist(), xs, ys)]
+        surf.blits(batch, doreturn=False)
@@ -0,0 +1,159 @@
+import pygame
+
+from render import display_ready
+from render.scratch import SCRATCH
+from render.weapons import WEAPON_SPRITES, draw_tip_glow
+
+# poses are painted with the figure's box this far inside a scratch canvas
+# (room for the longest weapon), then cropped to what was drawn
+_MARGIN = 128
+
+
+def paint_stickman(surf, x, top, size, color, facing_right, attacking, reach=30, weapon=None):
+    """The Enemy's stick figure with its body centre at x and its box's top at top.
+
+    ``weapon`` (a render.weapons.BakedWeapon) is drawn in the hand, without
+    its animated glow; returns the hand position.
+    """
+    w, h = size
+    bottom = top + h
+    head_r = int(w * 0.18)
+    head_center = (x, top + head_r + 2)
+    neck_y = head_center[1] + head_r
+    hip_y = bottom - int(h * 0.2)
+    pygame.draw.circle(surf, color, head_center, head_r, 0)
+    pygame.draw.line(surf, color, (x, neck_y), (x, hip_y), 4)
+    # arms
+    if attacking:
+        pygame.draw.line(surf, color, (x, neck_y), (x + (reach if facing_right else -reach), neck_y + 10), 4)
+    else:
+        pygame.draw.line(surf, color, (x, neck_y), (x - 12, neck_y + 18), 4)
+        pygame.draw.line(surf, color, (x, neck_y), (x + 12, neck_y + 18), 4)
+    hand = (x + (18 if facing_right else -18), neck_y + 10)
+    if weapon is not None:
+        surf.blit(weapon.image, (hand[0] - weapon.anchor[0], hand[1] - weapon.anchor[1]))
+    # legs
+    pygame.draw.line(surf, color, (x, hip_y), (x - 10, bottom), 4)
+    pygame.draw.line(surf, color, (x, hip_y), (x + 10, bottom), 4)
+    return hand
+
+
+class AtlasPose:
+    """One pose's region of an atlas page.
+
+    ``offset`` places the region relative to the figure box's top-left; ``tip``
+    (or None) is where the weapon's animated glow goes, relative to the same.
+    """
+
+    __slots__ = ("page", "area", "offset", "tip", "facing_right")
+
+    def __init__(self, page, area, offset, tip, facing_right):
+        self.page = page
+        self.area = area
+        self.offset = offset
+        self.tip = tip
+        self.facing_right = facing_right
+
+    def draw(self, surf, topleft, animated=True):
+        """Blit with the figure box at topleft (plus any tip glow); returns the rect drawn."""
+        x, y = topleft
+        rect = surf.blit(self.page, (x + self.offset[0], y + self.offset[1]), self.area)
+        if self.tip is not None:
+            draw_tip_glow(surf, (x + self.tip[0], y + self.tip[1]), self.facing_right, 1.0, animated)
+        return rect
+
+
+class PoseAtlas:
+    """Stick figure poses rendered on first use and packed onto one atlas page.
+
+    A pose is keyed by (facing, attacking, weapon) under a style of (size,
+    colour, attack colour): asking for another style (the ENEMY_SIZE /
+    ENEMY_COLOR settings changed) starts a fresh page, as does running out of
+    room, so the atlas never holds more than one ``page_size`` surface. Poses
+    are packed in shelves left to right. A started page is never drawn over,
+    so a pose handed out before a reset stays valid, but callers should ask
+    again each frame rather than keep it.
+    """
+
+    def __init__(self, page_size=(1024, 512)):
+        self.page_size = page_size
+        self.page = None
+        self.style = None
+        self._poses = {}
+        self._x = self._y = self._shelf_h = 0
+        self.builds = 0
+        self.hits = 0
+        self.pages = 0
+
+    def __len__(self):
+        return len(self._poses)
+
+    def clear(self):
+        self.page = None
+        self.style = None
+        self._poses = {}
+
+    def get(self, size, color, attack_color, facing_right, attacking, weapon=None):
+        """The pose for a figure box of size; weapon is a weapon name (or None)."""
+        style = (tuple(size), tuple(color), tuple(attack_color))
+        if style != self.style:
+            self._new_page(style)
+        key = (bool(facing_right), bool(attacking), weapon)
+        pose = self._poses.get(key)
+        if pose is not None:
+            self.hits += 1
+            return pose
+        pose = self._build(key)
+        self._poses[key] = pose
+        return pose
+
+    def _new_page(self, style):
+        self.page = pygame.Surface(self.page_size, pygame.SRCALPHA)
+        if display_ready():
+            self.page = self.page.convert_alpha()
+        # mostly empty, hard-edged figures: RLE skips the transparent runs (several times faster)
+        self.page.set_alpha(255, pygame.RLEACCEL)
+        self.style = style
+        self._poses = {}
+        self._x = self._y = self._shelf_h = 0
+        self.pages += 1
+
+    def _place(self, w, h):
+        # next free spot on the current shelf, a new shelf, or a new page
+        page_w, page_h = self.page_size
+        if self._x + w > page_w:
+            self._x, self._y, self._shelf_h = 0, self._y + self._shelf_h, 0
+        if self._y + h > page_h:
+            self._new_page(self.style)
+        at = (self._x, self._y)
+        self._x += w
+        self._shelf_h = max(self._shelf_h, h)
+        return at
+
+    def _build(self, key):
+        facing_right, attacking, weapon_name = key
+        size, color, attack_color = self.style
+        w, h = size
+        baked = WEAPON_SPRITES.get(weapon_name, facing_right) if weapon_name else None
+        canvas = SCRATCH.get((w + 2 * _MARGIN, h + 2 * _MARGIN))
+        x, top = _MARGIN + w // 2, _MARGIN
+        hand = paint_stickman(canvas, x, top, size, attack_color if attacking else color,
+                              facing_right, attacking, weapon=baked)
+        crop = canvas.get_bounding_rect()
+        at = self._place(crop.width, crop.height)
+        # the page is transparent there, so a max blend copies the pixels as they are
+        self.page.blit(canvas, at, crop, special_flags=pygame.BLEND_RGBA_MAX)
+        SCRATCH.release(canvas)
+        offset = (crop.x - (x - w // 2), crop.y - top)
+        tip = None
+        if baked is not None and baked.tip is not None:
+            tip = (hand[0] + baked.tip[0] - (x - w // 2), hand[1] + baked.tip[1] - top)
+        self.builds += 1
+        return AtlasPose(self.page, pygame.Rect(at, crop.size), offset, tip, facing_right)
+
+    def stats(self):
+        return {"poses": len(self._poses), "builds": self.builds, "hits": self.hits, "pages": self.pages}
+
+
+# the duel Enemy's poses (see game.Enemy.draw)
+ENEMY_POSES = PoseAtlas()
@@ -0,0 +1,94 @@
+import pygame
+
+# scratch sizes round up to this many pixels, so effects that pulse or grow a
+# little each frame keep landing on the same few backing surfaces
+SCRATCH_GRANULE = 64
+
+
+def _bucket(n):
+    return max(SCRATCH_GRANULE, -(-n // SCRATCH_GRANULE) * SCRATCH_GRANULE)
+
+
+class ScratchPool:
+    """Temporary render targets handed out by size and reclaimed at frame end.
+
+    ``get`` lends a cleared surface of exactly the asked size: a subsurface of
+    the smallest free backing surface (same flags) that fits, or of a new one
+    rounded up to ``SCRATCH_GRANULE``. ``end_frame`` takes every loan back, so
+    a surface from ``get`` must not be kept past the frame it was drawn in;
+    ``release`` returns one early, for effects drawn and blitted in a loop.
+    The subsurface for each (backing, size) is made once and handed out
+    again, so callers must not change its alpha or colour key. Backing
+    surfaces and subsurfaces created are both counted per frame
+    (``frame_allocations``); once the sizes in use have been seen a frame
+    creates no Surface at all.
+    """
+
+    def __init__(self, max_free_per_size=8, max_views_per_backing=64):
+        self.max_free_per_size = max_free_per_size
+        self.max_views_per_backing = max_views_per_backing
+        self._free = {}  # (w, h, flags) -> [backing surfaces]
+        self._lent = {}  # backing surface -> key, lent this frame
+        self._views = {}  # backing surface -> {(w, h): subsurface}
+        self.allocations = 0
+        self.views = 0
+        self.reuses = 0
+        self.frame_allocations = 0
+        self.last_frame_allocations = 0
+
+    def get(self, size, flags=pygame.SRCALPHA, clear=True):
+        w, h = size
+        fits = [key for key, free in self._free.items()
+                if free and key[2] == flags and key[0] >= w and key[1] >= h]
+        if fits:
+            key = min(fits, key=lambda k: k[0] * k[1])
+            backing = self._free[key].pop()
+            self.reuses += 1
+        else:
+            key = (_bucket(w), _bucket(h), flags)
+            backing = pygame.Surface(key[:2], flags)
+            self.allocations += 1
+            self.frame_allocations += 1
+        self._lent[backing] = key
+        views = self._views.setdefault(backing, {})
+        surf = views.get((w, h))
+        if surf is None:
+            if len(views) >= self.max_views_per_backing:
+                del views[next(iter(views))]  # the oldest size
+            surf = views[(w, h)] = backing.subsurface((0, 0, w, h))
+            self.views += 1
+            self.frame_allocations += 1
+        if clear:
+            surf.fill((0, 0, 0, 0))
+        return surf
+
+    def release(self, surf):
+        """Hand back a surface from ``get`` before the frame ends."""
+        backing = surf.get_parent()
+        self._reclaim(backing, self._lent.pop(backing))
+
+    def _reclaim(self, backing, key):
+        free = self._free.setdefault(key, [])
+        if len(free) < self.max_free_per_size:
+            free.append(backing)
+        else:
+            self._views.pop(backing, None)
+
+    def end_frame(self):
+        for backing, key in self._lent.items():
+            self._reclaim(backing, key)
+        self._lent.clear()
+        self.last_frame_allocations = self.frame_allocations
+        self.frame_allocations = 0
+
+    def clear(self):
+        self._free.clear()
+        self._views = {backing: views for backing, views in self._views.items() if backing in self._lent}
+
+    def stats(self):
+        return {"allocations": self.allocations, "views": self.views, "reuses": self.reuses,
+                "frame_allocations": self.last_frame_allocations,
+                "free": sum(len(v) for v in self._free.values())}
+
+
+SCRATCH = ScratchPool()
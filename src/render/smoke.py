@@ -0,0 +1,107 @@
+import math
+import numpy as np
+import pygame
+
+from render import display_ready
+
+SMOKE_LAYERS = 3
+PLUMES_PER_LAYER = 12
+# the old renderer faked a blur with three offset, alpha-scaled copies of each layer
+BLUR_TAPS = ((0, 0, 140), (6, -4, 40), (-6, 3, 30))
+_PAD_X = max(abs(ox) for ox, _, _ in BLUR_TAPS)
+_PAD_TOP = max(-oy for _, oy, _ in BLUR_TAPS)
+_PAD_BOTTOM = max(oy for _, oy, _ in BLUR_TAPS)
+SMOKE_RGB = (40, 40, 48)
+
+
+def _plume_alpha(layer):
+    return max(12, 60 - layer * 8)
+
+
+def _plume_radius(layer, i):
+    return int(40 + 30 * layer + (i % 4) * 6)
+
+
+def _layer_offsets(h, layer):
+    """Return (layer height, y offset of plumes inside the layer, layer y on screen)."""
+    layer_h = int(h * 0.35)
+    base_y_off = int(h * 0.35 * layer * 0.25)
+    return layer_h, base_y_off, int(h * 0.36) - base_y_off // 2
+
+
+class SmokeRenderer:
+    """Smoke plumes drawn from pre-blurred sprites.
+
+    Each (layer, radius) plume is rasterised once and the three blur taps are
+    composited into a single sprite with NumPy, so a frame is just a batch of
+    small blits instead of full-width surface copies.
+    """
+
+    def __init__(self):
+        self._sprites = {}
+
+    def clear(self):
+        self._sprites.clear()
+
+    def sprite(self, layer, rad):
+        key = (layer, rad)
+        spr = self._sprites.get(key)
+        if spr is None:
+            spr = self._build_sprite(layer, rad)
+            self._sprites[key] = spr
+        return spr
+
+    def _build_sprite(self, layer, rad):
+        ew, eh = rad, int(rad * 0.7)
+        mask = pygame.Surface((ew, eh), pygame.SRCALPHA)
+        pygame.draw.ellipse(mask, (255, 255, 255, 255), (0, 0, ew, eh))
+        cover = pygame.surfarray.array_alpha(mask).astype(np.float32) / 255.0
+
+        sw, sh = ew + 2 * _PAD_X, eh + _PAD_TOP + _PAD_BOTTOM
+        base = _plume_alpha(layer) / 255.0
+        # "over" of the same colour n times: alpha = 1 - prod(1 - a_i)
+        remain = np.ones((sw, sh), dtype=np.float32)
+        for ox, oy, a in BLUR_TAPS:
+            x0, y0 = _PAD_X + ox, _PAD_TOP + oy
+            remain[x0:x0 + ew, y0:y0 + eh] *= 1.0 - cover * (base * a / 255.0)
+
+        spr = pygame.Surface((sw, sh), pygame.SRCALPHA)
+        spr.fill((*SMOKE_RGB, 0))
+        alpha = pygame.surfarray.pixels_alpha(spr)
+        alpha[...] = np.round((1.0 - remain) * 255.0).astype(np.uint8)
+        del alpha  # release the surface lock
+        if display_ready():
+            spr = spr.convert_alpha()
+        return spr
+
+    def draw(self, surf, w, h, t, seed):
+        old_clip = surf.get_clip()
+        for layer in range(SMOKE_LAYERS):
+            layer_h, base_y_off, layer_y = _layer_offsets(h, layer)
+            batch = []
+            for i in range(PLUMES_PER_LAYER):
+                px = int(((i * 97 + seed * 3) % (w + 200)) - 100 + math.sin(t * (0.3 + layer * 0.15) + i) * 80)
+                py = int(base_y_off + (i % 5) * 18 + math.cos(t * 0.4 + i * 0.6 + layer) * 12)
+                spr = self.sprite(layer, _plume_radius(layer, i))
+                batch.append((spr, (px % w - _PAD_X, layer_y + py - _PAD_TOP)))
+            # plumes used to live on a layer-sized surface; keep that clipping
+            surf.set_clip(pygame.Rect(0, layer_y, w, layer_h).clip(old_clip))
+            surf.blits(batch, doreturn=False)
+        surf.set_clip(old_clip)
+
+
+def draw_reference(surf, w, h, t, seed):
+    """The original copy-and-multiply smoke renderer, kept for parity checks."""
+    for layer in range(SMOKE_LAYERS):
+        layer_surf = pygame.Surface((w, int(h * 0.35)), pygame.SRCALPHA)
+        base_y_off = int(h * 0.35 * layer * 0.25)
+        for i in range(PLUMES_PER_LAYER):
+            px = int(((i * 97 + seed * 3) % (w + 200)) - 100 + math.sin(t * (0.3 + layer * 0.15) + i) * 80)
+            py = int(base_y_off + (i % 5) * 18 + math.cos(t * 0.4 + i * 0.6 + layer) * 12)
+            rad = _plume_radius(layer, i)
+            col = (*SMOKE_RGB, _plume_alpha(layer))
+            pygame.draw.ellipse(layer_surf, col, (px % w, py, rad, int(rad * 0.7)))
+        for ox, oy, a in BLUR_TAPS:
+            tmp = layer_surf.copy()
+            tmp.fill((255, 255, 255, a), special_flags=pygame.BLEND_RGBA_MULT)
+            surf.blit(tmp, (ox, int(h * 0.36) - base_y_off//2 + oy), special_flags=0)
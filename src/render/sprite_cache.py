@@ -0,0 +1,51 @@
+from collections import OrderedDict
+
+import pygame
+
+from render import display_ready
+
+
+class SpriteCache:
+    """Bounded LRU cache of pre-rendered surfaces, shared by reference.
+
+    ``build(*key)`` renders a surface the first time a key is requested; the
+    least recently used entry is evicted once ``max_entries`` is exceeded.
+    Cached surfaces must be treated as read-only by callers.
+    """
+
+    def __init__(self, build, max_entries=64):
+        self.build = build
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def clear(self):
+        self._entries.clear()
+
+    def get(self, *key):
+        surf = self._entries.get(key)
+        if surf is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return surf
+        self.misses += 1
+        surf = self.build(*key)
+        if display_ready():
+            surf = surf.convert_alpha()
+        self._entries[key] = surf
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return surf
+
+    def stats(self):
+        return {"entries": len(self._entries), "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
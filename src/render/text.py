@@ -0,0 +1,69 @@
+from render.sprite_cache import SpriteCache
+
+
+class TextCache(SpriteCache):
+    """LRU cache of rendered text keyed by (font, string, colour, antialias).
+
+    Every actual ``font.render`` call is counted, per frame and in total, so the
+    HUD cost can be watched: ``begin_frame`` rolls the per-frame counters over.
+    """
+
+    def __init__(self, max_entries=256):
+        super().__init__(self._render, max_entries)
+        self.glyphs = 0
+        self.frame_glyphs = 0
+        self.frame_renders = 0
+        self.last_frame_glyphs = 0
+        self.last_frame_renders = 0
+
+    def _render(self, font, text, color, antialias):
+        self.glyphs += len(text)
+        self.frame_glyphs += len(text)
+        self.frame_renders += 1
+        return font.render(text, antialias, color)
+
+    def render(self, font, text, color, antialias=True):
+        return self.get(font, text, tuple(color), antialias)
+
+    def begin_frame(self):
+        self.last_frame_glyphs = self.frame_glyphs
+        self.last_frame_renders = self.frame_renders
+        self.frame_glyphs = 0
+        self.frame_renders = 0
+
+    def stats(self):
+        stats = super().stats()
+        stats.update(glyphs=self.glyphs, frame_glyphs=self.last_frame_glyphs,
+                     frame_renders=self.last_frame_renders)
+        return stats
+
+
+TEXT_CACHE = TextCache()
+
+
+class TextWidget:
+    """A text label that only looks up a new surface when its value changes.
+
+    ``fmt`` is a str.format pattern; tuple values are spread into it. ``changed``
+    is True for the frame in which the value (and so the surface) changed.
+    """
+
+    def __init__(self, font, color, fmt="{}", antialias=True, cache=None):
+        self.font = font
+        self.color = tuple(color)
+        self.fmt = fmt
+        self.antialias = antialias
+        self.cache = cache if cache is not None else TEXT_CACHE
+        self.value = None
+        self.surface = None
+        self.changed = False
+
+    def render(self, value):
+        if self.surface is None or value != self.value:
+            self.value = value
+            text = self.fmt.format(*value) if isinstance(value, tuple) else self.fmt.format(value)
+            self.surface = self.cache.render(self.font, text, self.color, self.antialias)
+            self.changed = True
+        else:
+            self.changed = False
+        return self.surface
@@ -0,0 +1,234 @@
+import math
+
+import pygame
+
+from render import display_ready
+from render.sprite_cache import SpriteCache
+
+# weapons are baked on a square canvas of this size with the hand at its centre,
+# then cropped to what was drawn
+_CANVAS = 256
+
+
+# --- procedural weapon drawings, hand at (x, y); used to bake the sprites ---
+
+def paint_gun(surf, x, y, facing_right):
+    # barrel and grip
+    barrel = pygame.Rect(0, 0, 34, 8)
+    barrel.center = (x + (18 if facing_right else -18), y)
+    grip = pygame.Rect(0, 0, 8, 12)
+    grip.center = (x + (6 if facing_right else -6), y + 8)
+    pygame.draw.rect(surf, (30,30,30), barrel)
+    pygame.draw.rect(surf, (60,60,60), grip)
+    pygame.draw.rect(surf, (200,200,40), barrel.inflate(-10,-2), 0)
+
+
+def paint_katana(surf, x, y, facing_right):
+    # long thin blade
+    blade_len = 60
+    bx = x + (blade_len//2 if facing_right else -blade_len//2)
+    pygame.draw.line(surf, (220,220,255), (x, y), (bx, y-6), 4)
+    pygame.draw.rect(surf, (80,40,20), (x - 6, y - 4, 12, 8))
+
+
+def paint_flail(surf, x, y, facing_right):
+    # chain + ball
+    bx = x + (22 if facing_right else -22)
+    pygame.draw.line(surf, (120,120,120), (x, y), (bx, y+6), 3)
+    pygame.draw.circle(surf, (40,40,40), (int(bx), int(y+8)), 10)
+
+
+def paint_midnight_blade(surf, x, y, facing_right, size=1.0):
+    flip = 1 if facing_right else -1
+    hx, hy = x + 8 * flip, y
+    s = float(size)
+    blade_len = int(78 * s)
+    blade_w = max(6, int(12 * s))
+    tip_x = hx + flip * blade_len
+
+    # build tapered blade polygon (upper edge then lower)
+    segments = 8
+    upper = []
+    lower = []
+    for i in range(segments + 1):
+        t = i / segments
+        bx = int(hx + flip * (t * blade_len))
+        # gentle taper and slight concave profile
+        taper = int((1 - t) * (blade_w // 2))
+        curve = int(math.sin(t * math.pi) * 2 * s)
+        uy = int(hy - taper - curve - t * int(6 * s))
+        ly = int(hy + taper + curve + t * int(6 * s))
+        upper.append((bx, uy))
+        lower.append((bx, ly))
+    blade_poly = upper + lower[::-1]
+
+    # core
+    pygame.draw.polygon(surf, (60, 60, 70), blade_poly)
+    # bevel highlight along upper edge
+    pygame.draw.lines(surf, (200, 200, 220), False, upper, max(1, int(2 * s)))
+    # thin dark edge near lower side
+    pygame.draw.lines(surf, (30,30,36), False, lower, max(1, int(1 * s)))
+
+    # fuller (central groove)
+    fpts = []
+    for i in range(4):
+        tt = i / 3
+        fx = int(hx + flip * (tt * (blade_len - 12 * s)))
+        fy = int(hy + math.sin(tt * math.pi) * int(2 * s))
+        fpts.append((fx, fy))
+    pygame.draw.lines(surf, (30,30,40), False, fpts, max(1, int(2 * s)))
+    pygame.draw.lines(surf, (120,120,140), False, fpts, max(1, int(1 * s)))
+
+    # ornate guard (tsuba)
+    guard_w = int(14 * s)
+    guard_h = int(6 * s)
+    pygame.draw.ellipse(surf, (80,60,55), (hx - guard_w//2, hy - guard_h//2, guard_w, guard_h))
+    pygame.draw.ellipse(surf, (140,110,90), (hx - guard_w//4, hy - guard_h//4, guard_w//2, guard_h//2))
+
+    # handle
+    handle_len = int(20 * s)
+    handle_w = int(8 * s)
+    handle_rect = pygame.Rect(0,0, handle_w, handle_len)
+    handle_rect.center = (int(hx - flip * (handle_w//2 + 2)), int(hy + handle_len/2))
+    pygame.draw.rect(surf, (30,30,36), handle_rect)
+    pygame.draw.rect(surf, (90,60,40), handle_rect, max(1, int(1*s)))
+    # wrap texture
+    step = int(5 * s)
+    for off in range(-step*2, handle_len + step*2, step):
+        sx = handle_rect.left + (off if facing_right else (handle_rect.width - off))
+        pygame.draw.line(surf, (20,20,24), (sx, handle_rect.top + off), (sx + flip * step, handle_rect.bottom + off), max(1, int(1*s)))
+
+    # pommel
+    pom_x = int(handle_rect.centerx - flip * (handle_w//2 + 2))
+    pom_y = int(handle_rect.bottom + int(3 * s))
+    pygame.draw.circle(surf, (120,100,80), (pom_x, pom_y), max(3, int(3 * s)))
+    pygame.draw.circle(surf, (200,180,150), (pom_x, pom_y), max(1, int(1 * s)))
+
+    # subtle purple veins (the tip glow is animated, see draw_tip_glow)
+    vein_col = (160, 60, 180)
+    vx1 = int(hx + flip * int(14 * s))
+    vx2 = int(tip_x - flip * int(18 * s))
+    pygame.draw.aaline(surf, vein_col, (vx1, hy - int(2*s)), (vx2, hy + int(2*s)))
+    return tip_x - x, 0
+
+
+PAINTERS = {
+    "Gun": paint_gun,
+    "Katana": paint_katana,
+    "Flail": paint_flail,
+    "Midnight Blade": paint_midnight_blade,
+}
+
+
+def _build_glow(glow_r, alpha):
+    glow = pygame.Surface((glow_r*4, glow_r*2), pygame.SRCALPHA)
+    pygame.draw.ellipse(glow, (180,70,200,alpha), (0,0, glow.get_width(), glow.get_height()))
+    return glow
+
+
+# the glow only takes a handful of (radius, alpha) values as it pulses
+GLOW_SPRITES = SpriteCache(_build_glow, max_entries=256)
+
+
+def draw_tip_glow(surf, tip, facing_right, size=1.0, animated=True):
+    """The Midnight Blade's pulsing tip glow, centred near ``tip``."""
+    if animated:
+        pulse = 0.5 + 0.5 * abs(math.sin(pygame.time.get_ticks() * 0.006))
+    else:
+        pulse = 0.6
+    glow_r = int(6 * size * pulse)
+    if glow_r <= 0:
+        return
+    glow = GLOW_SPRITES.get(glow_r, int(100 * pulse))
+    surf.blit(glow, (tip[0] - glow.get_width()//2 + (-4 if facing_right else 4), tip[1] - glow.get_height()//2),
+              special_flags=pygame.BLEND_RGBA_ADD)
+
+
+class BakedWeapon:
+    """A weapon pre-rendered for one facing and scale.
+
+    ``anchor`` is the hand's position in ``image``; ``tip`` is the blade tip
+    relative to the hand (where the animated glow goes), or None.
+    """
+
+    __slots__ = ("name", "facing_right", "size", "image", "anchor", "tip")
+
+    def __init__(self, name, facing_right, size, image, anchor, tip):
+        self.name = name
+        self.facing_right = facing_right
+        self.size = size
+        self.image = image
+        self.anchor = anchor
+        self.tip = tip
+
+    def draw(self, surf, hand_pos, animated=True):
+        """Blit at hand_pos (plus the tip glow); returns the rect drawn."""
+        hx, hy = int(hand_pos[0]), int(hand_pos[1])
+        rect = surf.blit(self.image, (hx - self.anchor[0], hy - self.anchor[1]))
+        if self.tip is not None:
+            draw_tip_glow(surf, (hx + self.tip[0], hy + self.tip[1]), self.facing_right, self.size, animated)
+        return rect
+
+
+class WeaponSprites:
+    """Bakes weapon sprites on first use, keyed by (name, facing_right, size).
+
+    Weapons without a painter (fists) give None. The set of weapons is small
+    and fixed, so the cache is bounded only as a guard against a stream of
+    odd sizes: once ``max_entries`` is reached it is flushed.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._baked = {}
+        self.bakes = 0
+        self.hits = 0
+
+    def __len__(self):
+        return len(self._baked)
+
+    def clear(self):
+        self._baked.clear()
+
+    def get(self, name, facing_right, size=1.0):
+        key = (name, bool(facing_right), float(size))
+        baked = self._baked.get(key)
+        if baked is not None:
+            self.hits += 1
+            return baked
+        painter = PAINTERS.get(name)
+        if painter is None:
+            return None
+        if len(self._baked) >= self.max_entries:
+            self._baked.clear()
+        baked = self._bake(name, painter, key[1], key[2])
+        self._baked[key] = baked
+        return baked
+
+    def _bake(self, name, painter, facing_right, size):
+        c = _CANVAS // 2
+        canvas = pygame.Surface((_CANVAS, _CANVAS), pygame.SRCALPHA)
+        if name == "Midnight Blade":
+            tip = painter(canvas, c, c, facing_right, size)
+            scale = 1.0  # drawn at size natively
+        else:
+            painter(canvas, c, c, facing_right)
+            tip = None
+            scale = size
+        crop = canvas.get_bounding_rect()
+        image = canvas.subsurface(crop).copy()
+        anchor = (c - crop.x, c - crop.y)
+        if scale != 1.0:
+            w, h = image.get_size()
+            image = pygame.transform.smoothscale(image, (max(1, round(w * scale)), max(1, round(h * scale))))
+            anchor = (round(anchor[0] * scale), round(anchor[1] * scale))
+        if display_ready():
+            image = image.convert_alpha()
+        self.bakes += 1
+        return BakedWeapon(name, facing_right, size, image, anchor, tip)
+
+    def stats(self):
+        return {"entries": len(self._baked), "bakes": self.bakes, "hits": self.hits}
+
+
+WEAPON_SPRITES = WeaponSprites()
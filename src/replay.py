@@ -0,0 +1,276 @@
+"""Record per-tick inputs of a match and re-simulate it bit-exactly.
+
+A recording is the match seed, tick rate and world size plus, for every
+simulated tick, one byte of held keys (input.controls.TRACKED_KEYS) and any
+discrete commands applied in it. Every ``keyframe_interval`` ticks the full
+game state (Game.get_state) is stored as well, so a viewer can jump to any
+tick by restoring the keyframe before it and simulating only the rest::
+
+    python src/main.py --record match.sdr
+    python src/replay.py match.sdr
+    python src/replay.py match.sdr --seek 360000
+
+File layout: header, then one zlib chunk per keyframe interval (the keyframe
+as JSON followed by that interval's input records), then an index of chunk
+offsets that the header points to. Chunks are written as the match runs and
+read through mmap, so opening a multi-hour trace only parses header and index.
+"""
+import argparse
+import io
+import json
+import mmap
+import struct
+import sys
+import time
+import zlib
+
+MAGIC = b"SDRP"
+VERSION = 5  # 5: melee weapons' cooldown and the Midnight slash apply (outcomes changed)
+# magic, version, seed, hz, world w, world h, ticks, keyframe interval, index offset
+HEADER = struct.Struct("<4sBQHHHIIQ")
+INDEX_COUNT = struct.Struct("<I")
+INDEX_ENTRY = struct.Struct("<QI")  # chunk offset, compressed length
+KEYFRAME_LEN = struct.Struct("<I")
+HAS_COMMANDS = 0x80
+PRE_TICK = 0x80  # command applied while the game was not running, before the tick
+
+# 5 s at 120 Hz: a seek simulates at most this many ticks
+KEYFRAME_INTERVAL = 600
+
+
+class InputRecorder:
+    """Writes the input stream and keyframes of a live ``game``.
+
+    With a ``path`` chunks are streamed to that file as the match runs; without
+    one the recording is kept in memory (``to_bytes``). Install it as
+    ``game.recorder`` before the first tick and ``close`` it when done.
+    """
+
+    def __init__(self, game, path=None, keyframe_interval=KEYFRAME_INTERVAL):
+        if game.sim_ticks:
+            raise ValueError("start recording before the first tick")
+        self.seed = game.seed
+        self.hz = game.timestep.hz
+        self.world_size = tuple(game.screen_rect.size)
+        self.keyframe_interval = keyframe_interval
+        self.path = path
+        self._out = open(path, "wb") if path is not None else io.BytesIO()
+        self._out.write(bytes(HEADER.size))  # rewritten by close()
+        self._index = []
+        self._chunk = None
+        self._pending = []
+        self.ticks = 0
+        self.closed = False
+        self._start_chunk(game.get_state())
+
+    def command(self, code, pre=False):
+        """Record a command applied in the next written tick (pre: before it ran)."""
+        self._pending.append(code | PRE_TICK if pre else code)
+
+    def tick(self, mask):
+        body = self._chunk
+        if self._pending:
+            body.append(mask | HAS_COMMANDS)
+            body.append(len(self._pending))
+            body.extend(self._pending)
+            self._pending.clear()
+        else:
+            body.append(mask)
+        self.ticks += 1
+
+    def end_tick(self, game):
+        """Called after each tick; closes the chunk and keyframes on interval ticks."""
+        if self.ticks % self.keyframe_interval == 0:
+            self._flush_chunk()
+            self._start_chunk(game.get_state())
+
+    def _start_chunk(self, state):
+        keyframe = json.dumps(state, separators=(",", ":")).encode()
+        self._chunk = bytearray(KEYFRAME_LEN.pack(len(keyframe)) + keyframe)
+
+    def _flush_chunk(self):
+        data = zlib.compress(bytes(self._chunk), 6)
+        self._index.append((self._out.tell(), len(data)))
+        self._out.write(data)
+        self._chunk = None
+
+    def close(self):
+        if self.closed:
+            return
+        self._flush_chunk()
+        index_offset = self._out.tell()
+        self._out.write(INDEX_COUNT.pack(len(self._index)))
+        for entry in self._index:
+            self._out.write(INDEX_ENTRY.pack(*entry))
+        w, h = self.world_size
+        self._out.seek(0)
+        self._out.write(HEADER.pack(MAGIC, VERSION, self.seed, self.hz, w, h, self.ticks,
+                                    self.keyframe_interval, index_offset))
+        if self.path is not None:
+            self._out.close()
+        self.closed = True
+
+    def to_bytes(self):
+        self.close()
+        return self._out.getvalue()
+
+
+class Replay:
+    """Random access to a recording; chunks are decoded on demand.
+
+    Ticks are numbered from 1. Chunk c holds the keyframe taken after tick
+    ``c * keyframe_interval`` and the inputs of the ticks that follow it. The
+    last decoded chunk is kept, so sequential playback decodes each once.
+    """
+
+    def __init__(self, data):
+        self._data = data
+        (magic, version, self.seed, self.hz, w, h, self.ticks,
+         self.keyframe_interval, index_offset) = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not a Street Duel replay")
+        if version != VERSION:
+            raise ValueError(f"unsupported replay version {version}")
+        self.world_size = (w, h)
+        (count,) = INDEX_COUNT.unpack_from(data, index_offset)
+        self.index = [INDEX_ENTRY.unpack_from(data, index_offset + INDEX_COUNT.size + i * INDEX_ENTRY.size)
+                      for i in range(count)]
+        self._chunk_no = None
+        self._keyframe = None
+        self._masks = None
+        self._commands = None
+        self.chunks_decoded = 0
+
+    def __len__(self):
+        return self.ticks
+
+    @classmethod
+    def from_bytes(cls, data):
+        return cls(data)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
+    def _decode(self, c):
+        if c == self._chunk_no:
+            return
+        offset, length = self.index[c]
+        body = zlib.decompress(self._data[offset:offset + length])
+        (n,) = KEYFRAME_LEN.unpack_from(body)
+        pos = KEYFRAME_LEN.size + n
+        first = c * self.keyframe_interval
+        count = min(self.keyframe_interval, self.ticks - first)
+        masks = bytearray(count)
+        commands = {}
+        for k in range(count):
+            b = body[pos]
+            pos += 1
+            masks[k] = b & ~HAS_COMMANDS
+            if b & HAS_COMMANDS:
+                n_cmd = body[pos]
+                commands[first + k + 1] = [(code & ~PRE_TICK, bool(code & PRE_TICK))
+                                           for code in body[pos + 1:pos + 1 + n_cmd]]
+                pos += 1 + n_cmd
+        self._keyframe = bytes(body[KEYFRAME_LEN.size:KEYFRAME_LEN.size + n])
+        self._masks = masks
+        self._commands = commands
+        self._chunk_no = c
+        self.chunks_decoded += 1
+
+    def _tick_chunk(self, tick):
+        if not 1 <= tick <= self.ticks:
+            raise IndexError(f"tick {tick} outside 1..{self.ticks}")
+        self._decode((tick - 1) // self.keyframe_interval)
+
+    def mask(self, tick):
+        self._tick_chunk(tick)
+        return self._masks[tick - 1 - self._chunk_no * self.keyframe_interval]
+
+    def pre_commands(self, tick):
+        self._tick_chunk(tick)
+        return [code for code, pre in self._commands.get(tick, ()) if pre]
+
+    def tick_commands(self, tick):
+        self._tick_chunk(tick)
+        return [code for code, pre in self._commands.get(tick, ()) if not pre]
+
+    def keyframe_before(self, tick):
+        """Index of the chunk whose keyframe is the latest one at or before tick."""
+        return min(max(tick, 0) // self.keyframe_interval, len(self.index) - 1)
+
+    def keyframe(self, c):
+        """Decoded game state stored at the start of chunk c."""
+        self._decode(c)
+        return json.loads(self._keyframe)
+
+
+def play(replay, until=None, game=None):
+    """Re-simulate a replay headless (as fast as possible); returns the Game."""
+    from game import Game
+
+    if game is None:
+        game = Game(None, world_size=replay.world_size, seed=replay.seed)
+    if game.timestep.hz != replay.hz:
+        raise ValueError(f"replay recorded at {replay.hz} Hz, game runs at {game.timestep.hz} Hz")
+    if game.sim_ticks == 0:
+        # the first keyframe carries what the header does not, such as wave mode
+        game.set_state(replay.keyframe(0))
+    game.replay = replay
+    last = len(replay) if until is None else min(until, len(replay))
+    for k in range(game.sim_ticks + 1, last + 1):
+        for code in replay.pre_commands(k):
+            game.apply_command(code)
+        game.tick(game.timestep.tick_ms)
+    return game
+
+
+def seek(replay, tick, game=None):
+    """Jump to tick: restore the nearest earlier keyframe, then simulate the rest."""
+    from game import Game
+
+    if game is None:
+        game = Game(None, world_size=replay.world_size, seed=replay.seed)
+    game.set_state(replay.keyframe(replay.keyframe_before(tick)))
+    return play(replay, tick, game)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="recorded match")
+    parser.add_argument("--until", type=int, default=None, help="re-simulate from tick 0 up to this tick")
+    parser.add_argument("--seek", type=int, default=None, help="jump to this tick via the nearest keyframe")
+    args = parser.parse_args(argv)
+    from game import Game
+
+    start = time.perf_counter()
+    replay = Replay.load(args.path)
+    opened = time.perf_counter()
+    game = Game(None, world_size=replay.world_size, seed=replay.seed)
+    created = time.perf_counter()
+    if args.seek is not None:
+        game = seek(replay, args.seek, game)
+    else:
+        game = play(replay, args.until, game)
+    elapsed = time.perf_counter() - created
+    print(f"file       {len(replay)} ticks, {len(replay.index)} chunks, "
+          f"keyframe every {replay.keyframe_interval} ticks (opened in {(opened - start) * 1000:.2f} ms)")
+    print(f"ticks      {game.sim_ticks} ({game.clock.get_ticks() / 1000.0:.1f}s simulated)")
+    if args.seek is not None:
+        print(f"seek       {elapsed * 1000:.2f} ms, {replay.chunks_decoded} chunks decoded")
+    else:
+        print(f"speed      {game.sim_ticks / max(elapsed, 1e-9):.0f} ticks/s")
+    print(f"result     player {game.player.hp} hp, enemy {game.enemy.hp} hp, "
+          f"coins {game.coins}, kills {game.kills}, state {game.state}")
+    print(f"digest     {game.digest():016x}")
+    replay.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,542 @@
+"""Asyncio match server: many headless duels ticking in one process.
+
+Every match is a headless Game. One scheduler task ticks all of them each
+round and then broadcasts state deltas to connected clients. Clients speak
+a small framed protocol over TCP. Inputs may also arrive as UDP datagrams
+on the same port number. These must carry the token that the side's
+WELCOME handed out and come from the host of its TCP connection; anything
+else is dropped::
+
+    python src/server.py serve --port 7100
+    python src/server.py bench --matches 300 --seconds 10
+
+Side 0 of a match plays the Player and side 1 the Enemy. The Enemy is
+AI-controlled while no client holds side 1, and side -1 only spectates. An
+input is one byte: the key mask (input.controls.TRACKED_KEYS) plus an
+optional CMD_* in the top three bits. It is held until the next one.
+
+When a round takes longer than its period, every match drops to half the
+tick rate, down to MIN_HZ. Games scale timers and movement by the tick
+length, so matches stay in real time, only more coarsely. The rate comes
+back up once the load has stayed low for a while.
+"""
+import argparse
+import asyncio
+import json
+import random
+import secrets
+import struct
+import sys
+import time
+
+from entities.state import ATTACK_NAMES
+from input.controls import KEYSTATES, CMD_SKILL
+
+# message frame: payload length, message type
+FRAME = struct.Struct("<IB")
+MSG_HELLO, MSG_WELCOME, MSG_INPUT, MSG_STATE, MSG_DELTA, MSG_ERROR = range(1, 7)
+HELLO = struct.Struct("<Ib")  # match id (0: create one), side (0, 1, -1 spectate)
+WELCOME = struct.Struct("<IbQHQ")  # match id, side, seed, tick rate, UDP input token (0: spectator)
+UDP_INPUT = struct.Struct("<4sIbBQ")  # magic, match id, side, input, token
+SIDES = (0, 1, -1)
+UDP_MAGIC = b"SDIN"
+MASK_BITS = 0x1F
+CMD_SHIFT = 5
+
+BASE_HZ = 120
+MIN_HZ = 30
+BROADCAST_HZ = 30
+WORLD_SIZE = (900, 520)
+# scheduler load (busy time / round period) that triggers, and then allows undoing, a rate cut
+OVERLOAD = 0.9
+UNDERLOAD = 0.35
+RECOVER_SECONDS = 3.0
+LOAD_SMOOTHING = 0.05
+# clients with more unsent bytes than this skip deltas and get a full state later
+MAX_CLIENT_BUFFER = 256 * 1024
+
+
+def frame(kind, payload=b""):
+    return FRAME.pack(len(payload), kind) + payload
+
+
+def view(game):
+    """What spectators see: positions, health, attacks, projectiles, score."""
+    p, e = game.player, game.enemy
+    return {
+        "tick": game.sim_ticks,
+        "state": game.state,
+        "coins": game.coins,
+        "kills": game.kills,
+        "player": [p.rect.x, p.rect.y, p.hp, p.facing_right, ATTACK_NAMES[p.attack_type],
+                   p.equipped_weapon.name if p.equipped_weapon else None],
+        "enemy": [e.rect.x, e.rect.y, e.hp, e.facing_right, ATTACK_NAMES[e.attack_type]],
+        "lasers": [[s.rect.x, s.rect.y] for s in game.projectiles],
+        "medkits": [[s.rect.x, s.rect.y] for s in game.items],
+    }
+
+
+def delta(old, new):
+    return {k: v for k, v in new.items() if old.get(k) != v}
+
+
+class Client:
+    def __init__(self, writer, side, host=None, token=0):
+        self.writer = writer
+        self.side = side
+        self.host = host  # UDP inputs for this side must come from here
+        self.token = token
+        self.stale = True  # needs a full state before deltas make sense
+        self.skipped = 0
+
+    def send(self, data):
+        self.writer.write(data)
+
+    @property
+    def backlogged(self):
+        return self.writer.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER
+
+
+class Match:
+    """One headless Game plus its clients and tick / CPU accounting."""
+
+    def __init__(self, match_id, seed, hz=BASE_HZ, world_size=WORLD_SIZE):
+        from game import Game
+
+        self.id = match_id
+        self.seed = seed
+        self.game = Game(None, world_size=world_size, seed=seed)
+        self.game.set_tick_rate(hz)
+        self.inputs = [0, 0]
+        self.game.input_source = lambda: KEYSTATES[self.inputs[0]]
+        self.clients = []
+        self.players = [None, None]
+        self.last_view = {}
+        self.ticks = 0
+        self.cpu = 0.0
+        self.finished = 0
+        self._window_start = time.perf_counter()
+        self._window_ticks = 0
+        self.tps = 0.0
+
+    def join(self, client):
+        if client.side in (0, 1):
+            if self.players[client.side] is not None:
+                raise ValueError(f"side {client.side} of match {self.id} is taken")
+            self.players[client.side] = client
+            if client.side == 1:
+                self.game.enemy_source = lambda: KEYSTATES[self.inputs[1]]
+        self.clients.append(client)
+
+    def leave(self, client):
+        if client in self.clients:
+            self.clients.remove(client)
+        if client.side in (0, 1) and self.players[client.side] is client:
+            self.players[client.side] = None
+            self.inputs[client.side] = 0
+            if client.side == 1:
+                self.game.enemy_source = None  # back to the AI
+
+    def set_input(self, side, value):
+        if side not in (0, 1):
+            return
+        self.inputs[side] = value & MASK_BITS
+        command = value >> CMD_SHIFT
+        if command and side == 0:
+            self.game.command(command)
+
+    def step(self, elapsed_ms):
+        game = self.game
+        n = game.timestep.advance(elapsed_ms)
+        if not n:
+            return 0
+        cpu = time.thread_time()
+        for _ in range(n):
+            game.tick(game.timestep.tick_ms)
+            if game.state != "running":
+                # ladder matches run back to back
+                self.finished += 1
+                game.restart()
+        self.cpu += time.thread_time() - cpu
+        self.ticks += n
+        self._window_ticks += n
+        return n
+
+    def sample_rate(self, now):
+        span = now - self._window_start
+        if span > 0:
+            self.tps = self._window_ticks / span
+        self._window_start = now
+        self._window_ticks = 0
+
+    def broadcast(self):
+        if not self.clients:
+            return
+        current = view(self.game)
+        changed = delta(self.last_view, current)
+        self.last_view = current
+        full = None
+        data = frame(MSG_DELTA, json.dumps(changed, separators=(",", ":")).encode()) if changed else None
+        for client in self.clients:
+            if client.backlogged:
+                # a slow reader skips deltas and resynchronises with a full state
+                client.stale = True
+                client.skipped += 1
+            elif client.stale:
+                if full is None:
+                    full = frame(MSG_STATE, json.dumps(current, separators=(",", ":")).encode())
+                client.send(full)
+                client.stale = False
+            elif data is not None:
+                client.send(data)
+
+    def stats(self):
+        return {"id": self.id, "hz": self.game.timestep.hz, "ticks": self.ticks, "tps": self.tps,
+                "cpu_s": self.cpu, "cpu_us_per_tick": self.cpu / self.ticks * 1e6 if self.ticks else 0.0,
+                "clients": len(self.clients), "finished": self.finished}
+
+
+class _InputDatagrams(asyncio.DatagramProtocol):
+    def __init__(self, server):
+        self.server = server
+        self.received = 0
+        self.rejected = 0
+
+    def datagram_received(self, data, addr):
+        if len(data) != UDP_INPUT.size:
+            self.rejected += 1
+            return
+        magic, match_id, side, value, token = UDP_INPUT.unpack(data)
+        match = self.server.matches.get(match_id)
+        # only the client holding that side, from its own host, may steer it
+        owner = match.players[side] if match is not None and side in (0, 1) else None
+        if magic != UDP_MAGIC or owner is None or token != owner.token or addr[0] != owner.host:
+            self.rejected += 1
+            return
+        self.received += 1
+        match.set_input(side, value)
+
+
+class MatchServer:
+    """Hosts matches on a shared scheduler; ``start`` listens, ``run`` ticks."""
+
+    def __init__(self, host="127.0.0.1", port=7100, base_hz=BASE_HZ, min_hz=MIN_HZ,
+                 broadcast_hz=BROADCAST_HZ, seed=None):
+        self.host = host
+        self.port = port
+        self.base_hz = base_hz
+        self.min_hz = min_hz
+        self.hz = base_hz
+        self.broadcast_hz = broadcast_hz
+        self.rng = random.Random(seed)
+        self.matches = {}
+        self._next_id = 1
+        self.rounds = 0
+        self.load = 0.0
+        self.rate_changes = 0
+        self._calm_since = None
+        self._last_change = 0.0
+        self._tcp = None
+        self._udp = None
+        self._udp_protocol = None
+        self._running = False
+
+    def create_match(self, seed=None):
+        match = Match(self._next_id, seed if seed is not None else self.rng.randrange(1 << 31), self.hz)
+        self.matches[match.id] = match
+        self._next_id += 1
+        return match
+
+    def close_match(self, match_id):
+        match = self.matches.pop(match_id, None)
+        if match is not None:
+            for client in list(match.clients):
+                client.writer.close()
+
+    async def start(self):
+        self._tcp = await asyncio.start_server(self._serve_client, self.host, self.port)
+        self.port = self._tcp.sockets[0].getsockname()[1]
+        loop = asyncio.get_running_loop()
+        self._udp, self._udp_protocol = await loop.create_datagram_endpoint(
+            lambda: _InputDatagrams(self), local_addr=(self.host, self.port))
+
+    async def stop(self):
+        self._running = False
+        if self._tcp is not None:
+            self._tcp.close()
+            await self._tcp.wait_closed()
+        if self._udp is not None:
+            self._udp.close()
+        for match_id in list(self.matches):
+            self.close_match(match_id)
+
+    async def _serve_client(self, reader, writer):
+        match = client = None
+        try:
+            length, kind = FRAME.unpack(await reader.readexactly(FRAME.size))
+            payload = await reader.readexactly(length)
+            if kind != MSG_HELLO or length != HELLO.size:
+                raise ValueError("expected HELLO")
+            match_id, side = HELLO.unpack(payload)
+            if side not in SIDES:
+                raise ValueError(f"bad side {side}")
+            match = self.matches.get(match_id) if match_id else self.create_match()
+            if match is None:
+                raise ValueError(f"no match {match_id}")
+            token = secrets.randbits(64) if side in (0, 1) else 0
+            client = Client(writer, side, writer.get_extra_info("peername")[0], token)
+            match.join(client)
+            writer.write(frame(MSG_WELCOME, WELCOME.pack(match.id, side, match.seed, match.game.timestep.hz,
+                                                         token)))
+            while True:
+                length, kind = FRAME.unpack(await reader.readexactly(FRAME.size))
+                payload = await reader.readexactly(length)
+                if kind == MSG_INPUT and payload:
+                    match.set_input(side, payload[-1])
+        except ValueError as e:
+            writer.write(frame(MSG_ERROR, str(e).encode()))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if match is not None and client is not None:
+                match.leave(client)
+            writer.close()
+
+    def _adapt(self, busy, period, now):
+        # smoothed, so one slow round (a broadcast, a GC pause) does not cut the rate
+        self.load += (busy / period - self.load) * LOAD_SMOOTHING
+        if self.load > OVERLOAD and self.hz > self.min_hz and now - self._last_change > 1.0:
+            self._set_rate(max(self.min_hz, self.hz // 2), now)
+        elif self.load < UNDERLOAD and self.hz < self.base_hz:
+            if self._calm_since is None:
+                self._calm_since = now
+            elif now - self._calm_since > RECOVER_SECONDS:
+                self._set_rate(min(self.base_hz, self.hz * 2), now)
+        else:
+            self._calm_since = None
+
+    def _set_rate(self, hz, now):
+        self.hz = hz
+        for match in self.matches.values():
+            match.game.set_tick_rate(hz)
+        self.rate_changes += 1
+        self._last_change = now
+        self._calm_since = None
+
+    async def run(self, duration=None):
+        """Tick every match once per round (1 / hz) until stopped or duration passes."""
+        loop = asyncio.get_running_loop()
+        self._running = True
+        start = last = last_sample = loop.time()
+        next_broadcast = start
+        while self._running and (duration is None or last - start < duration):
+            period = 1.0 / self.hz
+            now = loop.time()
+            elapsed_ms = (now - last) * 1000.0
+            last = now
+            busy_start = time.perf_counter()
+            for match in list(self.matches.values()):
+                match.step(elapsed_ms)
+            if now >= next_broadcast:
+                for match in self.matches.values():
+                    match.broadcast()
+                next_broadcast = now + 1.0 / self.broadcast_hz
+            busy = time.perf_counter() - busy_start
+            self.rounds += 1
+            self._adapt(busy, period, now)
+            if now - last_sample >= 1.0:
+                wall = time.perf_counter()
+                for match in self.matches.values():
+                    match.sample_rate(wall)
+                last_sample = now
+            # always yield, so client reads and writes keep flowing under overload
+            await asyncio.sleep(max(0.0, period - (loop.time() - now)))
+
+    def stats(self):
+        matches = [m.stats() for m in self.matches.values()]
+        tps = [m["tps"] for m in matches]
+        return {
+            "matches": len(matches),
+            "hz": self.hz,
+            "load": self.load,
+            "rounds": self.rounds,
+            "rate_changes": self.rate_changes,
+            "mean_tps": sum(tps) / len(tps) if tps else 0.0,
+            "min_tps": min(tps) if tps else 0.0,
+            "cpu_s": sum(m["cpu_s"] for m in matches),
+            "clients": sum(m["clients"] for m in matches),
+            "udp_inputs": self._udp_protocol.received if self._udp_protocol else 0,
+            "udp_rejected": self._udp_protocol.rejected if self._udp_protocol else 0,
+        }
+
+
+class BotClient:
+    """Local stand-in for a game client: joins a match, sends inputs, reads states.
+
+    Inputs go over TCP, or as UDP datagrams with ``udp=True``. Received
+    deltas are applied to ``state`` so it mirrors the server's view.
+    """
+
+    def __init__(self, host, port, match_id=0, side=0, input_hz=30, udp=False, seed=None):
+        self.host = host
+        self.port = port
+        self.match_id = match_id
+        self.side = side
+        self.input_hz = input_hz
+        self.udp = udp
+        self.rng = random.Random(seed)
+        self.state = {}
+        self.messages = 0
+        self.bytes = 0
+        self.inputs_sent = 0
+        self.token = 0
+        self.error = None
+
+    async def run(self, duration):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        writer.write(frame(MSG_HELLO, HELLO.pack(self.match_id, self.side)))
+        length, kind = FRAME.unpack(await reader.readexactly(FRAME.size))
+        payload = await reader.readexactly(length)
+        if kind != MSG_WELCOME:
+            self.error = payload.decode(errors="replace")
+            writer.close()
+            return self
+        self.match_id, _, _, _, self.token = WELCOME.unpack(payload)
+        tasks = [asyncio.ensure_future(self._read(reader))]
+        if self.side in (0, 1):
+            tasks.append(asyncio.ensure_future(self._send_inputs(writer, duration)))
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+        return self
+
+    async def _read(self, reader):
+        while True:
+            length, kind = FRAME.unpack(await reader.readexactly(FRAME.size))
+            payload = await reader.readexactly(length)
+            self.messages += 1
+            self.bytes += FRAME.size + length
+            if kind == MSG_STATE:
+                self.state = json.loads(payload)
+            elif kind == MSG_DELTA:
+                self.state.update(json.loads(payload))
+
+    async def _send_inputs(self, writer, duration):
+        udp = None
+        if self.udp:
+            loop = asyncio.get_running_loop()
+            udp, _ = await loop.create_datagram_endpoint(asyncio.DatagramProtocol,
+                                                         remote_addr=(self.host, self.port))
+        try:
+            mask, hold = 0, 0
+            while True:
+                if hold <= 0:
+                    # hold random keys for a while, firing the skill now and then
+                    mask, hold = self.rng.randrange(32), self.rng.randint(3, 15)
+                    if self.rng.random() < 0.05:
+                        mask |= CMD_SKILL << CMD_SHIFT
+                hold -= 1
+                if udp is not None:
+                    udp.sendto(UDP_INPUT.pack(UDP_MAGIC, self.match_id, self.side, mask, self.token))
+                else:
+                    writer.write(frame(MSG_INPUT, bytes((mask,))))
+                self.inputs_sent += 1
+                mask &= MASK_BITS
+                await asyncio.sleep(1.0 / self.input_hz)
+        finally:
+            if udp is not None:
+                udp.close()
+
+
+async def _bench(args):
+    server = MatchServer("127.0.0.1", 0, seed=args.seed)
+    await server.start()
+    matches = [server.create_match() for _ in range(args.matches)]
+    clients = []
+    for i, match in enumerate(matches):
+        for side in range(args.players):
+            clients.append(BotClient("127.0.0.1", server.port, match.id, side, udp=args.udp, seed=i * 4 + side))
+        for _ in range(args.spectators):
+            clients.append(BotClient("127.0.0.1", server.port, match.id, -1))
+    started = time.perf_counter()
+    cpu = time.process_time()
+    runner = asyncio.ensure_future(server.run())
+    await asyncio.gather(*(c.run(args.seconds) for c in clients)) if clients else await asyncio.sleep(args.seconds)
+    server._running = False
+    await runner
+    wall = time.perf_counter() - started
+    cpu = time.process_time() - cpu
+    stats = server.stats()
+    per_match = [m.stats() for m in matches]
+    await server.stop()
+
+    print(f"matches                {stats['matches']} ({len(clients)} clients, "
+          f"{'udp' if args.udp else 'tcp'} inputs)")
+    if args.udp:
+        print(f"udp inputs             {stats['udp_inputs']} accepted, {stats['udp_rejected']} rejected")
+    print(f"tick rate              {stats['hz']} Hz now, {stats['rate_changes']} rate changes, "
+          f"load {stats['load']:.2f}")
+    print(f"ticks / s per match    mean {stats['mean_tps']:.1f}, min {stats['min_tps']:.1f}")
+    print(f"total ticks / s        {sum(m['ticks'] for m in per_match) / wall:.0f}")
+    cpu_us = [m["cpu_us_per_tick"] for m in per_match]
+    print(f"cpu per match          {stats['cpu_s'] / max(len(per_match), 1) * 1000:.1f} ms total, "
+          f"{sum(cpu_us) / max(len(cpu_us), 1):.1f} us per tick")
+    print(f"process cpu            {cpu:.2f} s over {wall:.2f} s wall ({cpu / wall * 100:.0f}%)")
+    received = [c for c in clients if c.messages]
+    if clients:
+        print(f"client messages        {sum(c.messages for c in clients)} "
+              f"({sum(c.bytes for c in clients) / max(len(clients), 1) / wall:.0f} B/s per client), "
+              f"{len(received)}/{len(clients)} clients received state")
+        errors = [c.error for c in clients if c.error]
+        if errors:
+            print(f"client errors          {len(errors)}: {errors[0]}")
+    return 0
+
+
+async def _serve(args):
+    server = MatchServer(args.host, args.port, seed=args.seed)
+    await server.start()
+    for _ in range(args.matches):
+        server.create_match()
+    print(f"listening on {server.host}:{server.port} (tcp + udp), {len(server.matches)} matches")
+    runner = asyncio.ensure_future(server.run())
+    try:
+        while True:
+            await asyncio.sleep(args.report)
+            s = server.stats()
+            print(f"{s['matches']} matches, {s['clients']} clients, {s['hz']} Hz, load {s['load']:.2f}, "
+                  f"{s['mean_tps']:.1f} ticks/s per match (min {s['min_tps']:.1f}), cpu {s['cpu_s']:.1f} s")
+    finally:
+        runner.cancel()
+        await server.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="mode", required=True)
+    serve = sub.add_parser("serve", help="host matches until interrupted")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=7100)
+    serve.add_argument("--matches", type=int, default=0, help="matches to open up front")
+    serve.add_argument("--report", type=float, default=5.0, help="seconds between status lines")
+    serve.add_argument("--seed", type=int, default=None)
+    bench = sub.add_parser("bench", help="server plus local client stand-ins in one process")
+    bench.add_argument("--matches", type=int, default=100)
+    bench.add_argument("--seconds", type=float, default=10.0)
+    bench.add_argument("--players", type=int, choices=(0, 1, 2), default=1, help="bot clients per match")
+    bench.add_argument("--spectators", type=int, default=0, help="spectating clients per match")
+    bench.add_argument("--udp", action="store_true", help="send bot inputs over UDP")
+    bench.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    try:
+        return asyncio.run(_bench(args) if args.mode == "bench" else _serve(args))
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""Flat binary snapshots of a Game's simulation state.
+
+``Game.snapshot()`` packs everything the simulation reads (player, enemy,
+lasers, medkits, wave-mode grunts, coins, timers, clock and rng) into one preallocated
+bytearray with ``struct.pack_into``; ``Game.restore()`` unpacks it in place.
+No Python objects are copied, so a snapshot / restore pair costs a few tens
+of microseconds and several fit in a frame (rollback, AI lookahead, instant
+replays). ``python src/bench.py snapshot`` measures it.
+
+Snapshots are for the running process: the world size, settings and
+render-only state (sparks, interpolation) are not included. Use
+Game.get_state for something that is saved to disk.
+"""
+import itertools
+import random
+import struct
+
+# string-valued state is packed as its index in these tables (attack / anim states are ints already)
+GAME_STATES = ("running", "gameover")
+WEAPON_NAMES = (None, "Gun", "Katana", "Flail", "Midnight Blade")
+NO_TIMER = -(1 << 62)  # Enemy.attack_end_timer of None
+
+# sim ticks, clock ms, state, coins, kills, damage dealt / taken, last medkit time,
+# medkit delay, fire seed, rng generation, rng has gauss, rng gauss, laser count, medkit count
+GAME = struct.Struct("<QdBqqddqqqQ?dHH")
+RNG = struct.Struct("<625I")
+# rect, vx, vy, sub_x, sub_y, on_ground, facing_right, hp, attacking, attack type,
+# attack duration (a double: tuning can make it fractional) / start, last attack / skill /
+# weapon time, knife, width mult, anim, weapon
+PLAYER = struct.Struct("<4idddd??d?Bdqqqq?dBB")
+# rect, vx, vy, sub_x, sub_y, on_ground, facing_right, hp, attacking, attack type,
+# last action time, action delay, attack end timer, weapon
+ENEMY = struct.Struct("<4idddd??d?BqqqB")
+LASER = struct.Struct("<4iddqqd")  # rect, vx, sub_x, life, spawn time, damage
+MEDKIT = struct.Struct("<4idd")  # rect, vy, sub_y
+HORDE = struct.Struct("<IQI")  # wave, grunts spawned, grunt count; the horde's arrays follow
+
+FIXED_SIZE = GAME.size + RNG.size + PLAYER.size + ENEMY.size
+
+
+_generations = itertools.count(1)
+
+
+class TrackedRandom(random.Random):
+    """random.Random that tags every state it passes through with a generation.
+
+    Equal generations mean equal states, so snapshots only serialise the
+    Mersenne Twister state (the bulk of a snapshot's cost) after it was drawn
+    from, and restore skips ``setstate`` when it is already in place. The
+    number streams are exactly those of random.Random.
+    """
+
+    generation = 0
+
+    def seed(self, *args, **kwargs):
+        super().seed(*args, **kwargs)
+        self.generation = next(_generations)
+        self._packed_generation = None
+
+    def setstate(self, state):
+        super().setstate(state)
+        self.generation = next(_generations)
+
+    def random(self):
+        self.generation = next(_generations)
+        return super().random()
+
+    def getrandbits(self, k):
+        self.generation = next(_generations)
+        return super().getrandbits(k)
+
+    def packed_state(self):
+        """(RNG-packed internal state, gauss_next), cached per generation."""
+        if self._packed_generation != self.generation:
+            _, internal, gauss = self.getstate()
+            self._packed = RNG.pack(*internal)
+            self._gauss = gauss
+            self._packed_generation = self.generation
+        return self._packed, self._gauss
+
+    def restore_packed(self, buf, offset, gauss, generation):
+        if generation == self.generation:
+            return
+        super().setstate((3, RNG.unpack_from(buf, offset), gauss))
+        # the state is the one that had this generation, so keep its tag
+        self.generation = generation
+        self._packed = bytes(buf[offset:offset + RNG.size])
+        self._gauss = gauss
+        self._packed_generation = generation
+
+
+def _num(value):
+    # ints and floats pack as doubles; give back ints where they were ints
+    return int(value) if value.is_integer() else value
+
+
+class Snapshot:
+    """A reusable buffer for Game.snapshot; grows only if more sprites are live."""
+
+    def __init__(self, lasers=32, medkits=4):
+        self.data = bytearray(FIXED_SIZE + lasers * LASER.size + medkits * MEDKIT.size)
+        self.size = 0
+        self.tick = None
+
+    def reserve(self, nbytes):
+        if len(self.data) < nbytes:
+            self.data.extend(bytes(nbytes - len(self.data)))
+
+    def copy(self):
+        other = Snapshot.__new__(Snapshot)
+        other.data = bytearray(self.data[:self.size])
+        other.size = self.size
+        other.tick = self.tick
+        return other
+
+
+def pack(game, snap):
+    lasers = game.projectiles.sprites()
+    medkits = game.items.sprites()
+    horde = game.horde
+    snap.reserve(FIXED_SIZE + len(lasers) * LASER.size + len(medkits) * MEDKIT.size
+                 + (HORDE.size + horde.count * horde.row_size if horde is not None else 0))
+    buf = snap.data
+    rng = game.rng
+    packed, gauss = rng.packed_state()
+    GAME.pack_into(buf, 0, game.sim_ticks, game.clock.ms, GAME_STATES.index(game.state), game.coins,
+                   game.kills, game.damage_dealt, game.damage_taken, game.last_medkit_time,
+                   game.next_medkit_delay, game._fire_seed, rng.generation, gauss is not None,
+                   gauss if gauss is not None else 0.0, len(lasers), len(medkits))
+    offset = GAME.size
+    buf[offset:offset + RNG.size] = packed
+    offset += RNG.size
+    p = game.player
+    PLAYER.pack_into(buf, offset, *p.rect, p.vx, p.vy, p.sub_x, p.sub_y, p.on_ground, p.facing_right,
+                     p.hp, p.attacking, p.attack_type, p.attack_duration,
+                     p.attack_start, p.last_attack_time, p.last_skill_time, p.last_weapon_time,
+                     p.has_knife, p.attack_width_multiplier, p.anim_state,
+                     WEAPON_NAMES.index(p.equipped_weapon.name if p.equipped_weapon else None))
+    offset += PLAYER.size
+    e = game.enemy
+    ENEMY.pack_into(buf, offset, *e.rect, e.vx, e.vy, e.sub_x, e.sub_y, e.on_ground, e.facing_right,
+                    e.hp, e.attacking, e.attack_type, e.last_action_time,
+                    e.next_action_delay, NO_TIMER if e.attack_end_timer is None else e.attack_end_timer,
+                    WEAPON_NAMES.index(e.equipped_weapon.name if e.equipped_weapon else None))
+    offset += ENEMY.size
+    for s in lasers:
+        LASER.pack_into(buf, offset, *s.rect, s.vx, s.sub_x, s.life, s.spawn_time, s.damage)
+        offset += LASER.size
+    for s in medkits:
+        MEDKIT.pack_into(buf, offset, *s.rect, s.vy, s.sub_y)
+        offset += MEDKIT.size
+    if horde is not None:
+        HORDE.pack_into(buf, offset, game.wave, horde.spawned, horde.count)
+        offset = horde.pack_into(buf, offset + HORDE.size)
+    snap.size = offset
+    snap.tick = game.sim_ticks
+    return snap
+
+
+def _weapon(current, code, make):
+    # weapons are stateless, so the equipped instance is kept when the type matches
+    name = WEAPON_NAMES[code]
+    if (current.name if current else None) == name:
+        return current
+    return make(name)
+
+
+def unpack(game, snap, make_weapon):
+    buf = snap.data
+    (game.sim_ticks, game.clock.ms, state, game.coins, game.kills, dealt, taken,
+     game.last_medkit_time, game.next_medkit_delay, game._fire_seed, generation, has_gauss, gauss,
+     n_lasers, n_medkits) = GAME.unpack_from(buf, 0)
+    game.state = GAME_STATES[state]
+    game.damage_dealt = _num(dealt)
+    game.damage_taken = _num(taken)
+    offset = GAME.size
+    game.rng.restore_packed(buf, offset, gauss if has_gauss else None, generation)
+    offset += RNG.size
+
+    p = game.player
+    (x, y, w, h, vx, vy, p.sub_x, p.sub_y, p.on_ground, p.facing_right, hp, p.attacking, p.attack_type,
+     duration, p.attack_start, p.last_attack_time, p.last_skill_time, p.last_weapon_time,
+     p.has_knife, width, p.anim_state, weapon) = PLAYER.unpack_from(buf, offset)
+    p.rect.update(x, y, w, h)
+    p.vx, p.vy, p.hp, p.attack_duration = _num(vx), _num(vy), _num(hp), _num(duration)
+    weapon = _weapon(p.equipped_weapon, weapon, make_weapon)
+    if weapon is not p.equipped_weapon:
+        p.equip(weapon)
+    p.attack_width_multiplier = width
+    offset += PLAYER.size
+
+    e = game.enemy
+    (x, y, w, h, vx, vy, e.sub_x, e.sub_y, e.on_ground, e.facing_right, hp, e.attacking, e.attack_type,
+     e.last_action_time, e.next_action_delay, timer, weapon) = ENEMY.unpack_from(buf, offset)
+    e.rect.update(x, y, w, h)
+    e.vx, e.vy, e.hp = _num(vx), _num(vy), _num(hp)
+    e.attack_end_timer = None if timer == NO_TIMER else timer
+    e.equipped_weapon = _weapon(e.equipped_weapon, weapon, make_weapon)
+    offset += ENEMY.size
+
+    # reuse live sprites in group order (which is collision order), then top up / trim
+    offset = _unpack_sprites(game.laser_pool, ((0, 0), 1), game.projectiles.sprites(), n_lasers,
+                             buf, offset, _unpack_laser)
+    offset = _unpack_sprites(game.medkit_pool, (0,), game.items.sprites(), n_medkits, buf, offset,
+                             _unpack_medkit)
+    if game.horde is not None:
+        game.wave, game.horde.spawned, count = HORDE.unpack_from(buf, offset)
+        game.horde.unpack_from(buf, offset + HORDE.size, count)
+
+
+def _unpack_sprites(pool, spawn_args, live, count, buf, offset, unpack_one):
+    for s in live[count:]:
+        s.kill()
+    for i in range(count):
+        s = live[i] if i < len(live) else pool.spawn(*spawn_args)
+        offset = unpack_one(s, buf, offset)
+    return offset
+
+
+def _unpack_laser(s, buf, offset):
+    x, y, w, h, vx, s.sub_x, s.life, s.spawn_time, damage = LASER.unpack_from(buf, offset)
+    s.rect.update(x, y, w, h)
+    s.vx = _num(vx)
+    damage = _num(damage)
+    if damage != s.damage:
+        s.damage = damage
+        s.refresh_image()
+    return offset + LASER.size
+
+
+def _unpack_medkit(s, buf, offset):
+    x, y, w, h, vy, s.sub_y = MEDKIT.unpack_from(buf, offset)
+    s.rect.update(x, y, w, h)
+    s.vy = _num(vy)
+    return offset + MEDKIT.size
@@ -0,0 +1,51 @@
+"""Launch timeline for ``python src/main.py --startup-profile``.
+
+main.py imports this module first and marks each import and init stage on
+``TIMELINE``; with ``--startup-profile`` it prints the timeline once the
+first frame is on screen and exits, and ``python src/bench.py startup``
+tracks time-to-first-frame against ``STARTUP_BUDGET_MS``. Times count from
+this module's import, so interpreter start-up itself is not included (the
+benchmark measures it from outside).
+"""
+import time
+try:
+    import settings
+except Exception:
+    settings = None
+
+def cfg_get(name, default):
+    if settings is None:
+        return default
+    return getattr(settings, name, default)
+STARTUP_BUDGET_MS = cfg_get("STARTUP_BUDGET_MS", 800)
+
+
+class Timeline:
+    """Named marks in milliseconds since ``start``."""
+
+    def __init__(self, start=None):
+        self.start = start if start is not None else time.perf_counter()
+        self.marks = []
+
+    def mark(self, label):
+        self.marks.append((label, (time.perf_counter() - self.start) * 1000.0))
+
+    def elapsed(self, label):
+        for name, at in self.marks:
+            if name == label:
+                return at
+        raise KeyError(label)
+
+    def lines(self, budget_ms=STARTUP_BUDGET_MS):
+        out = []
+        last = 0.0
+        for label, at in self.marks:
+            out.append(f"{at:9.2f} ms  +{at - last:8.2f}  {label}")
+            last = at
+        if self.marks:
+            verdict = "within" if last <= budget_ms else "OVER"
+            out.append(f"{last:9.2f} ms  {verdict} the {budget_ms} ms budget")
+        return out
+
+
+TIMELINE = Timeline()
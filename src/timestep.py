@@ -0,0 +1,77 @@
+import pygame
+
+
+class FixedStep:
+    """Accumulator for a fixed-rate simulation driven by variable frame times.
+
+    ``advance(frame_ms)`` returns how many ticks to simulate this frame. Frame
+    times are clamped to ``max_frame_ms`` and at most ``max_ticks`` ticks run per
+    frame (spiral-of-death guard); time beyond that is dropped and counted in
+    ``dropped_ms`` rather than replayed later. ``alpha`` is the fraction of a
+    tick left in the accumulator, used to interpolate rendering.
+    """
+
+    def __init__(self, hz=120, max_ticks=8, max_frame_ms=250):
+        self.hz = hz
+        self.tick_ms = 1000.0 / hz
+        self.max_ticks = max_ticks
+        self.max_frame_ms = max_frame_ms
+        self.accumulator = 0.0
+        self.ticks = 0
+        self.last_ticks = 0
+        self.dropped_ms = 0.0
+
+    @property
+    def alpha(self):
+        return self.accumulator / self.tick_ms
+
+    def reset(self):
+        self.accumulator = 0.0
+
+    def advance(self, frame_ms):
+        frame_ms = max(0.0, float(frame_ms))
+        if frame_ms > self.max_frame_ms:
+            self.dropped_ms += frame_ms - self.max_frame_ms
+            frame_ms = self.max_frame_ms
+        self.accumulator += frame_ms
+        n = int(self.accumulator // self.tick_ms)
+        if n > self.max_ticks:
+            self.dropped_ms += (n - self.max_ticks) * self.tick_ms
+            self.accumulator -= (n - self.max_ticks) * self.tick_ms
+            n = self.max_ticks
+        self.accumulator -= n * self.tick_ms
+        self.ticks += n
+        self.last_ticks = n
+        return n
+
+    def base_frames(self, tick, base_hz=60):
+        """Whole ``base_hz`` frames completed by ``tick`` (for per-frame tuned rules)."""
+        return (tick * base_hz) // self.hz - ((tick - 1) * base_hz) // self.hz
+
+
+class WallClock:
+    """Clock reading pygame's wall time (ms since pygame.init)."""
+
+    def get_ticks(self):
+        return pygame.time.get_ticks()
+
+
+class SimClock:
+    """Simulation time in ms, advanced by fixed ticks instead of read from the wall.
+
+    Gameplay timers (attack windows, cooldowns, laser life, AI delays) read this
+    clock, so they behave identically whether ticks run in real time or as
+    fast as the CPU allows.
+    """
+
+    def __init__(self, start_ms=0):
+        self.ms = float(start_ms)
+
+    def advance(self, ms):
+        self.ms += ms
+
+    def get_ticks(self):
+        return int(self.ms)
+
+
+WALL_CLOCK = WallClock()
@@ -1,17 +1,21 @@
+import pygame
+
+from render.text import TextWidget
+
+
 class HUD:
     def __init__(self, screen, player_health, enemy_health):
         self.screen = screen
         self.player_health = player_health
         self.enemy_health = enemy_health
         self.font = pygame.font.Font(None, 36)
+        self.player_label = TextWidget(self.font, (255, 255, 255), 'Player Health: {}')
+        self.enemy_label = TextWidget(self.font, (255, 255, 255), 'Enemy Health: {}')
 
     def draw(self):
-        player_health_text = self.font.render(f'Player Health: {self.player_health}', True, (255, 255, 255))
-        enemy_health_text = self.font.render(f'Enemy Health: {self.enemy_health}', True, (255, 255, 255))
-        
-        self.screen.blit(player_health_text, (10, 10))
-        self.screen.blit(enemy_health_text, (10, 50))
+        self.screen.blit(self.player_label.render(self.player_health), (10, 10))
+        self.screen.blit(self.enemy_label.render(self.enemy_health), (10, 50))
 
     def update_health(self, player_health, enemy_health):
         self.player_health = player_health
-        self.enemy_health = enemy_health
\ No newline at end of file
+        self.enemy_health = enemy_health
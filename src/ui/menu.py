@@ -1,3 +1,8 @@
+import pygame
+
+from render.text import TEXT_CACHE
+
+
 class Menu:
     def __init__(self, screen):
         self.screen = screen
@@ -9,9 +14,9 @@ class Menu:
         self.screen.fill((0, 0, 0))
         for index, option in enumerate(self.options):
             if index == self.selected_option:
-                text = self.font.render(option, True, (255, 0, 0))
+                text = TEXT_CACHE.render(self.font, option, (255, 0, 0))
             else:
-                text = self.font.render(option, True, (255, 255, 255))
+                text = TEXT_CACHE.render(self.font, option, (255, 255, 255))
             text_rect = text.get_rect(center=(self.screen.get_width() // 2, 200 + index * 100))
             self.screen.blit(text, text_rect)
         pygame.display.flip()
@@ -1,11 +1,9 @@
+from assets import ASSETS
+
+
 def load_image(file_path):
-    """Load an image from the specified file path."""
-    try:
-        image = pygame.image.load(file_path)
-        return image.convert_alpha()  # Use convert_alpha for transparency
-    except pygame.error as e:
-        print(f"Unable to load image at {file_path}: {e}")
-        return None
+    """Load an image (a path relative to the package, or absolute) through the shared asset cache."""
+    return ASSETS.image(file_path)
 
 def clamp(value, min_value, max_value):
     """Clamp a value between a minimum and maximum value."""
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# the game imports its modules from src/ as top-level names; run without a window or audio device
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
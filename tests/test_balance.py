@@ -0,0 +1,44 @@
+import pytest
+
+import balance
+import entities.player
+import game
+from entities.flail import Flail
+
+
+def sweep(weapon, grid, matches=3):
+    return balance.run_sweep([weapon], balance.parse_grid(grid), matches, seed=7, workers=1, max_seconds=20.0)
+
+
+def outcome(row):
+    return {k: v for k, v in row.items() if k != "overrides"}
+
+
+def test_flail_cooldown_changes_results():
+    fast, slow = sweep("flail", ["Flail.cooldown=50,5000"])
+    assert outcome(fast) != outcome(slow)
+
+
+def test_midnight_duration_changes_results():
+    short, long = sweep("midnight", ["MidnightBlade.duration=100,2000"])
+    assert outcome(short) != outcome(long)
+
+
+def test_overrides_are_restored():
+    sweep("flail", ["Flail.cooldown=50", "player.PUNCH_COOLDOWN=10"], matches=1)
+    assert Flail.cooldown == 400
+    assert entities.player.PUNCH_COOLDOWN == 300
+
+
+@pytest.mark.parametrize("key", ["Flail.price", "Gun.duration", "Player", "game.PUNCH", "game.PUNCH_DURATION",
+                                 "PUNCH_COOLDOWN", "Sword.cooldown", "nope.LASER_DAMAGE"])
+def test_rejects_overrides_gameplay_does_not_read(key):
+    with pytest.raises(ValueError):
+        balance.resolve_target(key)
+
+
+def test_resolves_qualified_and_unique_names():
+    assert balance.resolve_target("LASER_DAMAGE") == (game, "LASER_DAMAGE")
+    assert balance.resolve_target("player.PUNCH_COOLDOWN") == (entities.player, "PUNCH_COOLDOWN")
+    assert balance.resolve_target("game.PUNCH_COOLDOWN") == (game, "PUNCH_COOLDOWN")
+    assert balance.resolve_target("Katana.melee_bonus") == (balance.Katana, "melee_bonus")
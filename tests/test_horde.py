@@ -0,0 +1,36 @@
+import random
+
+import numpy as np
+import pygame
+
+from entities.horde import Horde
+
+
+def first_along(horde, rect, vx):
+    # the per-laser test first_hits replaces
+    hit = horde.overlapping(rect)
+    if not hit.size:
+        return -1
+    x = horde.x[hit]
+    return int(hit[np.argmin(x) if vx > 0 else np.argmax(x)])
+
+
+def test_first_hits_matches_per_laser_passes():
+    rng = random.Random(5)
+    horde = Horde(capacity=256, seed=5)
+    horde.spawn([rng.randrange(0, 1200) for _ in range(200)], 480, 0)
+    horde.x[:horde.count] += [rng.randrange(-30, 30) for _ in range(horde.count)]
+    horde.y[:horde.count] -= [rng.randrange(0, 60) for _ in range(horde.count)]
+    shots = [pygame.Rect(rng.randrange(-50, 1250), rng.randrange(380, 480), rng.randrange(8, 90), 8)
+             for _ in range(100)]
+    vxs = [rng.choice((-12, 0, 12)) for _ in shots]
+    expected = [first_along(horde, rect, vx) for rect, vx in zip(shots, vxs)]
+    assert horde.first_hits(shots, vxs).tolist() == expected
+    assert any(i >= 0 for i in expected) and any(i < 0 for i in expected)
+
+
+def test_first_hits_empty():
+    horde = Horde(capacity=8)
+    assert horde.first_hits([pygame.Rect(0, 0, 10, 10)], [1]).tolist() == [-1]
+    horde.spawn([100], 480, 0)
+    assert horde.first_hits([], []).tolist() == []
@@ -0,0 +1,99 @@
+import random
+import time
+
+import pytest
+
+import game
+from input.controls import CMD_RESTART
+from netplay import MAX_ROLLBACK, LoopbackTransport, Masher, RollbackSession, UdpTransport, run_loopback
+
+
+@pytest.mark.parametrize("seed, latency_ms, jitter_ms, loss", [
+    (0, 60.0, 10.0, 0.02),
+    (1, 100.0, 40.0, 0.10),
+    (2, 30.0, 30.0, 0.25),
+])
+def test_loopback_sides_agree_under_loss(seed, latency_ms, jitter_ms, loss):
+    sessions, games, link = run_loopback(8.0, latency_ms, jitter_ms, loss, seed)
+    assert link[0].dropped + link[1].dropped > 0
+    assert all(s.rollbacks > 0 for s in sessions)
+    assert all(s.max_depth <= MAX_ROLLBACK for s in sessions)
+    assert games[0].sim_ticks == games[1].sim_ticks
+    assert games[0].digest() == games[1].digest()
+
+
+def test_loopback_is_reproducible():
+    digests = [run_loopback(4.0, 80.0, 20.0, 0.1, seed=5)[1][0].digest() for _ in range(2)]
+    assert digests[0] == digests[1]
+
+
+def test_game_over_holds_the_match_until_a_restart():
+    now = [0.0]
+    link = LoopbackTransport.pair(40.0, 10.0, 0.1, seed=3, clock=lambda: now[0])
+    games = [game.Game(None, world_size=(900, 520), seed=4) for _ in range(2)]
+    sessions = [RollbackSession(games[i], i, link[i]) for i in range(2)]
+    bots = [Masher(random.Random(i)) for i in range(2)]
+    tick_s = games[0].timestep.tick_ms / 1000.0
+
+    def run(frames):
+        for _ in range(frames):
+            now[0] += tick_s
+            for session, bot in zip(sessions, bots):
+                session.advance(bot())
+
+    for match in games:
+        match.player.hp = 0
+    run(60)
+    assert all(match.state == "gameover" for match in games)
+    held = [(match.sim_ticks, match.kills, match.coins, match.digest()) for match in games]
+    run(300)
+    assert [(match.sim_ticks, match.kills, match.coins, match.digest()) for match in games] == held
+    assert all(session.frame >= 300 for session in sessions)
+
+    sessions[0].command(CMD_RESTART)
+    run(120)
+    assert all(match.state == "running" for match in games)
+    assert all(match.sim_ticks > held[0][0] for match in games)
+    for _ in range(240):  # let the last inputs arrive
+        now[0] += tick_s
+        for session in sessions:
+            session.sync()
+    assert games[0].digest() == games[1].digest()
+
+
+class FailingSocket:
+    def __init__(self):
+        self.calls = 0
+
+    def recvfrom(self, size):
+        self.calls += 1
+        raise ConnectionRefusedError("port unreachable")
+
+    def close(self):
+        pass
+
+
+def test_udp_receive_error_does_not_spin():
+    transport = UdpTransport(("127.0.0.1", 0), ("127.0.0.1", 9))
+    transport.sock.close()
+    transport.sock = FailingSocket()
+    assert transport.receive() == []
+    assert transport.sock.calls == 1 and transport.receive_errors == 1
+
+
+def test_udp_exchanges_with_its_peer():
+    a = UdpTransport(("127.0.0.1", 0), ("127.0.0.1", 9))
+    b = UdpTransport(("127.0.0.1", 0), ("127.0.0.1", a.sock.getsockname()[1]))
+    a.peer = b.sock.getsockname()
+    try:
+        a.send(b"ping")
+        b.send(b"pong")
+        got_a, got_b = [], []
+        deadline = time.monotonic() + 2.0
+        while (not got_a or not got_b) and time.monotonic() < deadline:
+            got_a += a.receive()
+            got_b += b.receive()
+        assert got_a == [b"pong"] and got_b == [b"ping"]
+    finally:
+        a.close()
+        b.close()
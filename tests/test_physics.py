@@ -0,0 +1,41 @@
+import pygame
+import pytest
+
+import game
+from physics import BASE_FRAME_MS, Physics, frame_scale
+from timestep import SimClock
+
+WORLD = pygame.Rect(0, 0, 900, 520)
+
+
+def test_frame_scale():
+    assert frame_scale(0) == 0.0
+    assert frame_scale(BASE_FRAME_MS) == 1.0
+    assert frame_scale(1000.0 / 120) == pytest.approx(0.5)
+
+
+def bodies():
+    clock = SimClock()
+    ground_y = WORLD.height - game.GROUND_Y_OFFSET
+    laser = game.Laser((200, 200), 1, clock=clock, world=WORLD)
+    enemy = game.Enemy((400, ground_y - 200), clock=clock, world=WORLD)
+    return laser, enemy
+
+
+def test_zero_step_moves_nothing():
+    laser, enemy = bodies()
+    physics = Physics(WORLD, game.GRAVITY, game.GROUND_Y_OFFSET, game.PHYSICS_MAX_STEP_MS)
+    physics.add(laser)
+    physics.add(enemy)
+    before = [tuple(laser.rect), tuple(enemy.rect), enemy.vy]
+    physics.step(0.0)
+    assert [tuple(laser.rect), tuple(enemy.rect), enemy.vy] == before
+
+
+def test_one_legacy_frame_moves_by_the_tuned_speed():
+    laser, _ = bodies()
+    physics = Physics(WORLD, game.GRAVITY, game.GROUND_Y_OFFSET, game.PHYSICS_MAX_STEP_MS)
+    physics.add(laser)
+    x = laser.rect.x
+    physics.step(BASE_FRAME_MS)
+    assert laser.rect.x - x == int(game.LASER_SPEED)
@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+import game
+import replay
+from ai.pilot import DuelPilot
+from input.controls import CMD_FLAIL, CMD_GUN, CMD_RESTART
+
+WORLD = (900, 520)
+TICKS = 3000
+INTERVAL = 250
+
+
+def record(seed=42, waves=False):
+    """A piloted match recorded in memory; returns (replay bytes, {tick: digest}, final game)."""
+    match = game.Game(None, world_size=WORLD, seed=seed, waves=waves)
+    match.recorder = replay.InputRecorder(match, keyframe_interval=INTERVAL)
+    match.input_source = DuelPilot(match, rng=random.Random(1))
+    digests = {}
+    for k in range(1, TICKS + 1):
+        if k == 100:
+            match.command(CMD_GUN)
+        elif k == 1400:
+            match.command(CMD_FLAIL)
+        if match.state == "gameover":
+            match.command(CMD_RESTART)
+        match.tick(match.timestep.tick_ms)
+        if k % 97 == 0:
+            digests[match.sim_ticks] = match.digest()
+    return match.recorder.to_bytes(), digests, match
+
+
+@pytest.fixture(scope="module")
+def duel():
+    return record()
+
+
+def test_playback_reaches_the_live_digest(duel):
+    data, _, live = duel
+    played = replay.play(replay.Replay.from_bytes(data))
+    assert played.sim_ticks == live.sim_ticks
+    assert played.digest() == live.digest()
+    assert (played.coins, played.kills) == (live.coins, live.kills)
+
+
+def test_seek_matches_every_sampled_tick(duel):
+    data, digests, _ = duel
+    assert len(digests) > 20
+    for tick, digest in digests.items():
+        rep = replay.Replay.from_bytes(data)
+        assert replay.seek(rep, tick).digest() == digest, tick
+        # a seek replays from the nearest keyframe, never the whole match
+        assert rep.chunks_decoded <= 2
+
+
+def test_wave_mode_comes_back_from_the_first_keyframe():
+    data, digests, live = record(seed=9, waves=True)
+    rep = replay.Replay.from_bytes(data)
+    assert replay.play(rep).digest() == live.digest()
+    tick = max(digests)
+    assert replay.seek(replay.Replay.from_bytes(data), tick).digest() == digests[tick]
+
+
+def test_rejects_other_versions(duel):
+    data = bytearray(duel[0])
+    data[4] = replay.VERSION - 1
+    with pytest.raises(ValueError):
+        replay.Replay.from_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        replay.Replay.from_bytes(b"NOPE" + bytes(data[4:]))
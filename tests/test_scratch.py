@@ -0,0 +1,43 @@
+import pygame
+
+from render.scratch import ScratchPool
+
+
+def test_same_size_hands_back_the_same_surface():
+    pool = ScratchPool()
+    first = pool.get((100, 40))
+    first.fill((255, 0, 0, 255))
+    pool.end_frame()
+    assert pool.last_frame_allocations == 2  # the backing surface and its view
+    again = pool.get((100, 40))
+    assert again is first and again.get_at((0, 0)) == (0, 0, 0, 0)
+    pool.end_frame()
+    assert pool.last_frame_allocations == 0
+
+
+def test_views_are_counted_and_backings_shared():
+    pool = ScratchPool()
+    a = pool.get((100, 40))
+    pool.release(a)
+    b = pool.get((90, 50))
+    assert b is not a and b.get_parent() is a.get_parent()
+    pool.end_frame()
+    assert pool.stats()["allocations"] == 1 and pool.stats()["views"] == 2
+    assert pool.last_frame_allocations == 3
+
+
+def test_views_per_backing_are_bounded():
+    pool = ScratchPool(max_views_per_backing=4)
+    for w in range(10, 20):
+        pool.release(pool.get((w, 10)))
+    surf = pool.get((10, 10))
+    assert surf.get_size() == (10, 10) and pool.views == 11
+    assert len(pool._views[surf.get_parent()]) == 4
+
+
+def test_dropped_backings_take_their_views():
+    pool = ScratchPool(max_free_per_size=1)
+    lent = [pool.get((64, 64)) for _ in range(3)]
+    pool.end_frame()
+    assert len(pool._views) == 1
+    assert pool.get((64, 64)).get_parent() in {s.get_parent() for s in lent}
@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+import server
+from input.controls import CMD_GUN
+
+
+def play(match, inputs, rounds=120, elapsed_ms=1000 / 60):
+    for i in range(rounds):
+        match.set_input(0, inputs[i % len(inputs)])
+        match.step(elapsed_ms)
+    return match.game.digest()
+
+
+def test_step_runs_ticks_for_the_elapsed_time():
+    match = server.Match(1, seed=4)
+    assert sum(match.step(1000 / 60) for _ in range(60)) == server.BASE_HZ
+    assert match.game.sim_ticks == match.ticks == server.BASE_HZ
+    # at half rate a second is half as many, longer, ticks
+    match.game.set_tick_rate(server.BASE_HZ // 2)
+    assert sum(match.step(1000 / 60) for _ in range(60)) == server.BASE_HZ // 2
+    assert match.step(0.0) == 0
+    # a stalled round catches up only so far
+    assert match.step(1000.0) < server.BASE_HZ // 2
+
+
+def test_matches_with_the_same_seed_and_inputs_agree():
+    inputs = [0b00001, 0b01000, 0b00010 | CMD_GUN << server.CMD_SHIFT, 0b00110, 0]
+    one, two = server.Match(1, seed=8), server.Match(2, seed=8)
+    assert play(one, inputs) == play(two, inputs)
+    assert one.game.player.equipped_weapon is not None
+    other = server.Match(3, seed=8)
+    assert play(other, inputs[::-1]) != one.game.digest()
+
+
+def test_finished_matches_restart():
+    match = server.Match(1, seed=2)
+    match.game.player.hp = 0
+    match.step(100.0)
+    assert match.finished == 1 and match.game.state == "running"
+
+
+def test_joining_the_enemy_side_takes_it_from_the_ai():
+    match = server.Match(1, seed=1)
+    enemy = server.Client(None, 1)
+    match.join(enemy)
+    assert match.game.enemy_source is not None
+    with pytest.raises(ValueError):
+        match.join(server.Client(None, 1))
+    match.set_input(1, 0b00001)
+    assert match.inputs[1] == 0b00001
+    match.leave(enemy)
+    assert match.game.enemy_source is None and match.inputs[1] == 0
+
+
+def test_view_and_delta():
+    match = server.Match(1, seed=3)
+    first = server.view(match.game)
+    match.step(500.0)
+    second = server.view(match.game)
+    changed = server.delta(first, second)
+    assert changed["tick"] == second["tick"] and "coins" not in changed
+    assert {**first, **changed} == second
+
+
+def datagram(match_id, side, value, token, magic=server.UDP_MAGIC):
+    return server.UDP_INPUT.pack(magic, match_id, side, value, token)
+
+
+def test_udp_inputs_need_the_sides_token_and_host():
+    host = server.MatchServer(seed=0)
+    match = host.create_match()
+    match.join(server.Client(None, 0, "10.0.0.5", 1234))
+    udp = server._InputDatagrams(host)
+    owner = ("10.0.0.5", 50000)
+    for data, addr in [
+        (datagram(match.id, 0, 0b00001, 999), owner),  # wrong token
+        (datagram(match.id, 0, 0b00001, 1234), ("10.0.0.6", 50000)),  # someone else's host
+        (datagram(match.id, 1, 0b00001, 0), owner),  # side nobody holds
+        (datagram(match.id, 5, 0b00001, 1234), owner),  # no such side
+        (datagram(match.id + 1, 0, 0b00001, 1234), owner),  # no such match
+        (datagram(match.id, 0, 0b00001, 1234, b"XXXX"), owner),
+        (b"short", owner),
+    ]:
+        udp.datagram_received(data, addr)
+    assert udp.rejected == 7 and udp.received == 0 and match.inputs == [0, 0]
+    udp.datagram_received(datagram(match.id, 0, 0b00011, 1234), owner)
+    assert udp.received == 1 and match.inputs == [0b00011, 0]
+
+
+async def hello(port, match_id, side):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(server.frame(server.MSG_HELLO, server.HELLO.pack(match_id, side)))
+    length, kind = server.FRAME.unpack(await reader.readexactly(server.FRAME.size))
+    payload = await reader.readexactly(length)
+    writer.close()
+    return kind, payload
+
+
+def test_served_match_over_tcp_and_udp():
+    async def scenario():
+        host = server.MatchServer("127.0.0.1", 0, seed=1)
+        await host.start()
+        match = host.create_match()
+        runner = asyncio.ensure_future(host.run())
+        try:
+            kind, payload = await hello(host.port, match.id, 3)
+            assert kind == server.MSG_ERROR and b"side" in payload
+            bot = server.BotClient("127.0.0.1", host.port, match.id, 0, input_hz=60, udp=True, seed=2)
+            watcher = server.BotClient("127.0.0.1", host.port, match.id, -1)
+            await asyncio.gather(bot.run(0.5), watcher.run(0.5))
+        finally:
+            host._running = False
+            await runner
+            stats = host.stats()
+            await host.stop()
+        return bot, watcher, match, stats
+
+    bot, watcher, match, stats = asyncio.run(scenario())
+    assert bot.error is None and bot.token and watcher.token == 0
+    assert stats["udp_inputs"] > 0
+    assert match.ticks > 0 and watcher.state["tick"] > 0
@@ -0,0 +1,99 @@
+import random
+
+import pygame
+import pytest
+
+import game
+import snapshot
+from entities.state import MIDNIGHT
+from input.controls import CMD_GUN, CMD_KATANA, CMD_MIDNIGHT, CMD_SKILL, KEYSTATES, KeyState
+
+WORLD = (900, 520)
+
+
+def scripted(match):
+    """Pseudo-random input that also fires the skill and switches weapons now and then."""
+    def source():
+        r = random.Random(match.sim_ticks * 7919)
+        if match.sim_ticks % 97 == 0:
+            match.command(CMD_SKILL)
+        if match.sim_ticks % 1201 == 0:
+            match.command(r.choice([CMD_GUN, CMD_KATANA, CMD_MIDNIGHT]))
+        return KEYSTATES[r.randrange(32) & (0b11110 if match.sim_ticks % 500 < 250 else 0b11101)]
+    return source
+
+
+@pytest.mark.parametrize("waves", [False, True])
+def test_restore_round_trip_and_resimulation(waves):
+    match = game.Game(None, world_size=WORLD, seed=7, waves=waves)
+    match.input_source = scripted(match)
+    snap = None
+    lasers_seen = 0
+    for i in range(40):
+        match.run_ticks(random.Random(i).randrange(10, 300))
+        if match.state != "running":
+            match.restart()
+        snap = match.snapshot(snap)  # the buffer is reused
+        before, state = match.digest(), match.get_state()
+        match.run_ticks(120)
+        after = match.digest()
+        lasers_seen = max(lasers_seen, len(match.projectiles))
+        match.restore(snap)
+        assert match.digest() == before and match.get_state() == state
+        match.run_ticks(120)
+        assert match.digest() == after
+    assert lasers_seen, "no lasers were in flight to round-trip"
+
+
+def test_copy_survives_reuse_of_the_buffer():
+    match = game.Game(None, world_size=WORLD, seed=3)
+    match.input_source = scripted(match)
+    match.run_ticks(200)
+    snap = match.snapshot()
+    kept, digest = snap.copy(), match.digest()
+    match.run_ticks(200)
+    match.snapshot(snap)
+    match.restore(kept)
+    assert match.digest() == digest
+
+
+def test_buffer_grows_for_more_sprites():
+    snap = snapshot.Snapshot(lasers=0, medkits=0)
+    assert len(snap.data) == snapshot.FIXED_SIZE
+    match = game.Game(None, world_size=WORLD, seed=5)
+    match.player.equip(game.Gun())
+    match.input_source = lambda: KeyState([pygame.K_v])
+    match.run_ticks(120)
+    assert match.projectiles
+    match.snapshot(snap)
+    assert snap.size > snapshot.FIXED_SIZE and len(snap.data) >= snap.size
+
+
+def test_tracked_random_streams_and_restore():
+    tracked, plain = snapshot.TrackedRandom(9), random.Random(9)
+    assert [tracked.random() for _ in range(5)] == [plain.random() for _ in range(5)]
+    packed, gauss = tracked.packed_state()
+    generation = tracked.generation
+    expected = [tracked.randrange(1000) for _ in range(5)]
+    tracked.restore_packed(packed, 0, gauss, generation)
+    assert tracked.generation == generation
+    assert [tracked.randrange(1000) for _ in range(5)] == expected
+
+
+@pytest.mark.parametrize("duration", [187.5, 200.0, 180])
+def test_fractional_attack_duration_round_trips(duration):
+    # balance tuning can hand start_attack a float (MidnightBlade.duration=187.5)
+    match = game.Game(None, world_size=WORLD, seed=6)
+    match.input_source = lambda: KEYSTATES[0]
+    match.run_ticks(10)
+    match.player.start_attack(MIDNIGHT, duration)
+    snap = match.snapshot()
+    state, digest = match.get_state(), match.digest()
+    match.run_ticks(60)
+    later = match.digest()
+    match.player.attack_duration = 0
+    match.restore(snap)
+    assert match.player.attack_duration == duration
+    assert match.get_state() == state and match.digest() == digest
+    match.run_ticks(60)
+    assert match.digest() == later
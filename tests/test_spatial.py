@@ -0,0 +1,59 @@
+import random
+
+import pygame
+import pytest
+
+from spatial import SpatialHash
+
+
+class Box:
+    def __init__(self, rect):
+        self.rect = pygame.Rect(rect)
+
+
+def scatter(rng, n):
+    return [Box((rng.randrange(-50, 1200), rng.randrange(-50, 700), rng.randrange(1, 90), rng.randrange(1, 90)))
+            for _ in range(n)]
+
+
+def brute(objects, rect):
+    return [obj for obj in objects if obj.rect.colliderect(rect)]
+
+
+@pytest.mark.parametrize("n", [0, 1, 5, 40, 300])
+def test_linear_and_grid_answer_alike(n):
+    rng = random.Random(n)
+    objects = scatter(rng, n)
+    linear = SpatialHash(64, linear_max=10 ** 6)
+    grid = SpatialHash(64, linear_max=0)
+    linear.rebuild(objects)
+    grid.rebuild(objects)
+    for probe in scatter(rng, 50):
+        expected = brute(objects, probe.rect)
+        assert linear.query(probe.rect) == expected
+        assert grid.query(probe.rect) == expected
+
+
+def test_insert_and_remove_across_linear_max():
+    rng = random.Random(1)
+    objects = scatter(rng, 12)
+    grid = SpatialHash(64, linear_max=4)
+    for obj in objects:
+        grid.insert(obj)
+    assert len(grid) == 12 and all(obj in grid for obj in objects)
+    for obj in objects[::2]:
+        grid.remove(obj)
+    kept = objects[1::2]
+    assert len(grid) == len(kept) and objects[0] not in grid
+    everything = pygame.Rect(-100, -100, 2000, 2000)
+    assert grid.query(everything) == kept
+    grid.rebuild(kept[:3])
+    assert grid.query(everything) == kept[:3]
+
+
+def test_swept_rect_attr():
+    obj = Box((0, 0, 10, 10))
+    obj.swept = pygame.Rect(0, 0, 200, 10)
+    grid = SpatialHash(64, rect_attr="swept")
+    grid.rebuild([obj])
+    assert grid.query(pygame.Rect(150, 0, 5, 5)) == [obj]
@@ -0,0 +1,141 @@
+import tracemalloc
+
+import pygame
+import pytest
+
+import game
+from entities.player import Player
+from entities.pool import PooledSprite, SpritePool
+from entities.sprite import CompactSprite
+from input.controls import KeyState
+from timestep import SimClock
+
+WORLD = pygame.Rect(0, 0, 900, 520)
+
+
+class Dot(CompactSprite):
+    __slots__ = ("image", "rect")
+
+    def __init__(self, x=0, *groups):
+        super().__init__(*groups)
+        self.image = pygame.Surface((4, 4))
+        self.rect = self.image.get_rect(topleft=(x, 0))
+
+
+class PlainDot(pygame.sprite.Sprite):
+    def __init__(self, x=0):
+        super().__init__()
+        self.image = pygame.Surface((4, 4))
+        self.rect = self.image.get_rect(topleft=(x, 0))
+
+
+class PooledDot(PooledSprite):
+    __slots__ = ("image", "rect")
+
+    def __init__(self):
+        super().__init__()
+        self.image = pygame.Surface((4, 4))
+        self.rect = self.image.get_rect()
+
+    def reset(self, x):
+        self.rect.topleft = (x, 0)
+
+
+GROUPS = [pygame.sprite.Group, pygame.sprite.RenderUpdates, pygame.sprite.LayeredUpdates]
+
+
+@pytest.mark.parametrize("group_type", GROUPS)
+def test_membership_both_ways(group_type):
+    a, b = group_type(), group_type()
+    s = Dot()
+    a.add(s)
+    s.add(b)
+    assert s.alive() and set(s.groups()) == {a, b}
+    assert s in a and s in b and a.sprites() == [s]
+    a.add(s)  # adding twice changes nothing
+    assert s.groups().count(a) == 1 and len(a) == 1
+    s.remove(a)
+    assert s not in a and s.groups() == [b]
+    b.remove(s)
+    assert not s.alive() and len(b) == 0
+
+
+@pytest.mark.parametrize("group_type", GROUPS)
+def test_kill_empty_and_constructor_groups(group_type):
+    a, b = group_type(), group_type()
+    s, t = Dot(0, a, b), Dot(1, [a])
+    assert len(a) == 2 and len(b) == 1
+    s.kill()
+    assert not s.alive() and s not in a and s not in b
+    a.empty()
+    assert not t.alive() and len(a) == 0
+
+
+def test_layered_updates_orders_by_layer():
+    layered = pygame.sprite.LayeredUpdates()
+    low, high = Dot(0), Dot(1)
+    layered.add(high, layer=2)
+    layered.add(low)
+    assert layered.sprites() == [low, high]
+    assert layered.get_layer_of_sprite(low) == 0
+    layered.change_layer(low, 5)
+    assert layered.sprites() == [high, low]
+    low.kill()
+    assert layered.sprites() == [high]
+
+
+def test_spritecollide_dokill_returns_to_pool():
+    group = pygame.sprite.Group()
+    pool = SpritePool(PooledDot, groups=(group,), size=2)
+    dots = [pool.spawn(x) for x in (0, 100)]
+    probe = Dot(0)
+    hit = pygame.sprite.spritecollide(probe, group, dokill=True)
+    assert hit == [dots[0]]
+    assert not dots[0].alive() and len(pool) == 1 and pool.free == 1
+    assert pool.spawn(50) is dots[0] and dots[0] in group
+
+
+def test_game_entities_keep_attributes_in_slots():
+    match = game.Game(None, world_size=WORLD.size, seed=3)
+    match.player.equip(game.Gun())
+    match.input_source = lambda: KeyState([pygame.K_v])
+    for _ in range(240):
+        match.tick(match.timestep.tick_ms)
+    sprites = [match.player, match.enemy, *match.projectiles, *match.items]
+    assert match.projectiles, "the gun should have fired"
+    for sprite in sprites:
+        assert vars(sprite) == {}, type(sprite).__name__
+
+
+def bytes_per_instance(make, n=1000):
+    make()  # warm shared caches
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    made = [make() for _ in range(n)]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del made
+    return used / n
+
+
+def test_compact_sprite_is_smaller_than_sprite():
+    # the same two attributes: slots plus a tuple against a dict plus a set
+    compact = bytes_per_instance(Dot)
+    plain = bytes_per_instance(PlainDot)
+    assert plain - compact >= 200
+
+
+def test_laser_memory_per_instance():
+    # bench.py entities measures about 260 bytes
+    clock = SimClock()
+    used = bytes_per_instance(lambda: game.Laser((100, 100), 1, clock=clock, world=WORLD))
+    assert used < 260
+
+
+def test_players_share_their_pose_cache_and_sparks():
+    clock = SimClock()
+    a, b = (Player((100, 400), clock=clock, world=WORLD, headless=True) for _ in range(2))
+    assert a.pose_cache is b.pose_cache is Player.pose_cache
+    assert a.slash_sparks is b.slash_sparks
+    # bench.py entities measures about 490 bytes (3018 with a cache and particle system each)
+    assert bytes_per_instance(lambda: Player((100, 400), clock=clock, world=WORLD, headless=True)) < 600